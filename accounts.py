@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Summary: Manages the Garmin Connect accounts used by multi-account batch runs.
+Author: github.com/bshreyas13
+
+Example:
+    python accounts.py add alice --email alice@example.com
+    python accounts.py list
+    python accounts.py remove alice
+"""
+import argparse
+import logging
+import sys
+from modules.accounts import AccountRegistry
+from modules.interface import CredentialsManager
+from rich.console import Console
+from rich.table import Table
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+console = Console()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Manage Garmin Connect accounts.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="Register an account, store its credentials and log in once")
+    add.add_argument("name", help="Short account name, e.g. alice")
+    add.add_argument("--email", help="Login e-mail, prompted for if missing")
+    add.add_argument("--rate-limits", help="Request budgets for this account, e.g. activities=1:3")
+    add.add_argument("--no-login", action="store_true", help="Only store the credentials")
+    commands.add_parser("list", help="List the registered accounts")
+    remove = commands.add_parser("remove", help="Remove an account and its stored credentials")
+    remove.add_argument("name")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    registry = AccountRegistry()
+
+    if args.command == "list":
+        table = Table(title="Accounts")
+        table.add_column("Name", style="cyan")
+        table.add_column("E-mail", style="magenta")
+        table.add_column("Rate limits", style="green")
+        table.add_column("Token store", style="yellow")
+        for account in registry:
+            table.add_row(account.name, account.email or "", account.rate_limits or "", account.tokenstore)
+        console.print(table)
+        return 0
+
+    if args.command == "remove":
+        if registry.get(args.name) is None:
+            console.print(f"Account '{args.name}' not found.", style="bold red")
+            return 1
+        CredentialsManager(args.name).delete_credentials()
+        registry.remove(args.name)
+        console.print(f"Account '{args.name}' removed.", style="bold green")
+        return 0
+
+    creds = CredentialsManager(args.name)
+    creds.email = args.email
+    email, _ = creds.get_credentials()
+    account = registry.add(args.name, email, args.rate_limits)
+    console.print(f"Account '{account.name}' registered.", style="bold green")
+    if args.no_login:
+        return 0
+
+    # Log in once so that batch runs can start from stored tokens.
+    account.activate()
+    from modules.client import GarminConnectClient
+
+    client = GarminConnectClient(creds.email, creds.password)
+    if not client.login():
+        console.print("Could not login to Garmin Connect, the account is registered nonetheless.", style="bold red")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
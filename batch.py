@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Summary: Headless batch runner for Garmin Connect plugins, streams results as NDJSON.
+Author: github.com/bshreyas13
+
+Example:
+    python batch.py R --start 2024-01-01 --end 2024-06-30 -o activities.ndjson
+    python batch.py 3 4 8 --date 2024-05-01
+    python batch.py 3 8 --date 2024-05-01 --accounts all -o team.ndjson
+"""
+import argparse
+import contextlib
+import logging
+import os
+import sys
+from modules.accounts import AccountRegistry
+from modules.batch import run_batch
+from modules.client import GarminConnectClient
+from modules.interface import CredentialsManager
+from modules.metrics import metrics
+from modules.plugin_manifest import load_plugins
+from modules.profiling import profile_run
+
+# Configure logging, stdout is reserved for records
+logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run Garmin Connect plugins without the interactive menu.")
+    parser.add_argument("keys", nargs="+", help="Command keys of the plugins to run, e.g. R 3 4")
+    parser.add_argument("--start", dest="start_date", help="Start date (YYYY-MM-DD) for range plugins")
+    parser.add_argument("--end", dest="end_date", help="End date (YYYY-MM-DD) for range plugins")
+    parser.add_argument("--type", dest="activity_type", help="Activity type filter for range plugins")
+    parser.add_argument("--date", help="Date (YYYY-MM-DD) for daily plugins, defaults to today")
+    parser.add_argument("--limit", type=int, help="Number of activities for list plugins")
+    parser.add_argument("--endpoints", help="Wellness endpoints for the backfill plugin (comma separated)")
+    parser.add_argument("--concurrency", type=int, help="Concurrent requests for the backfill plugin")
+    parser.add_argument("--query", help="Query for the activity query plugin, e.g. \"running, 2023, top 10 by pace\"")
+    parser.add_argument("-o", "--output", help="Write NDJSON to this file instead of stdout")
+    parser.add_argument("--profile", metavar="DIR", help="Profile the run with cProfile and tracemalloc, write reports to DIR")
+    parser.add_argument("--metrics", metavar="FILE", help="Write timing and traffic metrics to FILE (.json or .prom)")
+    parser.add_argument("--accounts", help="Run for these registered accounts (comma separated, or 'all') in parallel")
+    parser.add_argument("--workers", type=int, help="Number of processes for --accounts, defaults to the CPU count")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    params = {
+        "start_date": args.start_date,
+        "end_date": args.end_date,
+        "activity_type": args.activity_type,
+        "date": args.date,
+        "limit": args.limit,
+        "endpoints": args.endpoints,
+        "concurrency": args.concurrency,
+        "query": args.query,
+    }
+
+    plugin_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plugins")
+    if args.accounts:
+        return run_for_accounts(args, plugin_dir, params)
+
+    client = GarminConnectClient(credentials_provider=CredentialsManager().load_credentials)
+    if not client.login():
+        logger.error("Could not login to Garmin Connect.")
+        return 1
+
+    plugins = load_plugins(plugin_dir)
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    profiled = profile_run("_".join(args.keys), args.profile) if args.profile else contextlib.nullcontext()
+    try:
+        with profiled:
+            counts = run_batch(client.api, plugins, args.keys, params, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    for key, count in counts.items():
+        logger.info(f"Plugin '{key}': {count} records")
+    if args.metrics:
+        write_metrics(args.metrics)
+    return 0
+
+
+def write_metrics(path: str) -> None:
+    registry = metrics()
+    with open(path, "w") as f:
+        f.write(registry.to_prometheus() if path.endswith(".prom") else registry.to_json())
+    logger.info(f"Metrics written to {path}")
+
+
+def run_for_accounts(args, plugin_dir: str, params: dict) -> int:
+    from modules.fanout import run_accounts
+
+    try:
+        accounts = AccountRegistry().select(args.accounts.split(","))
+    except KeyError as err:
+        logger.error(err.args[0])
+        return 1
+    if not accounts:
+        logger.error("No accounts registered, add them with 'python accounts.py add'.")
+        return 1
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        results = run_accounts(accounts, plugin_dir, args.keys, params, out, workers=args.workers)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    failed = 0
+    for name, result in results.items():
+        if "error" in result:
+            failed += 1
+        else:
+            logger.info(f"Account '{name}': " + ", ".join(f"{key}={count}" for key, count in result["counts"].items()))
+    return 1 if failed == len(results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
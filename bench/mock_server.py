@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Summary: A local stand-in for the Garmin Connect API serving synthetic or recorded responses.
+Author: github.com/bshreyas13
+
+Example:
+    python bench/mock_server.py --port 8765 --activities 10000 --latency 0.05
+    AsyncGarminConnectClient(api, base_url="http://127.0.0.1:8765")
+"""
+import argparse
+import bisect
+import datetime
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+ACTIVITY_TYPES = ["running", "cycling", "swimming", "walking", "hiking", "strength_training"]
+
+
+def synthetic_activities(count: int, end: datetime.date, seed: int = 0, padding: int = 0) -> List[dict]:
+    """
+    Generates activity summaries shaped like `get_activities` results, newest first.
+
+    Args:
+        count (int): The number of activities.
+        end (datetime.date): The date of the newest activity. Activities are spread over the preceding days.
+        seed (int, optional): The random seed. Defaults to 0.
+        padding (int, optional): Extra characters per activity, to emulate larger payloads. Defaults to 0.
+
+    Returns:
+        List[dict]: The activities.
+    """
+    rng = random.Random(seed)
+    start = datetime.datetime.combine(end, datetime.time(18, 0))
+    activities = []
+    for i in range(count):
+        # Roughly 1.3 activities per day.
+        started = start - datetime.timedelta(hours=i * 18 + rng.randint(0, 6))
+        type_key = ACTIVITY_TYPES[i % len(ACTIVITY_TYPES)]
+        duration = rng.uniform(900, 7200)
+        distance = duration * rng.uniform(1.5, 8.0)
+        activity = {
+            "activityId": 10_000_000_000 + count - i,
+            "activityName": f"{type_key.replace('_', ' ').title()} {i}",
+            "activityType": {"typeId": i % len(ACTIVITY_TYPES) + 1, "typeKey": type_key},
+            "startTimeLocal": started.strftime("%Y-%m-%d %H:%M:%S"),
+            "startTimeGMT": (started - datetime.timedelta(hours=2)).strftime("%Y-%m-%d %H:%M:%S"),
+            "duration": round(duration, 1),
+            "movingDuration": round(duration * 0.95, 1),
+            "distance": round(distance, 1),
+            "averageSpeed": round(distance / duration, 3),
+            "averageHR": rng.randint(110, 170),
+            "maxHR": rng.randint(160, 195),
+            "calories": round(duration / 60 * rng.uniform(7, 14)),
+            "elevationGain": round(rng.uniform(0, 600), 1),
+            "elevationLoss": round(rng.uniform(0, 600), 1),
+            "deviceId": 3_000_000_000 + i % 3,
+            "summarizedExerciseSets": [],
+        }
+        if padding:
+            activity["description"] = "x" * padding
+        activities.append(activity)
+    return activities
+
+
+def synthetic_hrv(date: str, points: int, seed: int = 0) -> dict:
+    """
+    Generates an HRV day shaped like `get_hrv_data`, with `points` 5 minute readings.
+    """
+    rng = random.Random(f"{seed}{date}")
+    start = datetime.datetime.fromisoformat(date)
+    readings = [
+        {"hrvValue": rng.randint(20, 90),
+         "readingTimeGMT": (start + datetime.timedelta(minutes=5 * i)).strftime("%Y-%m-%dT%H:%M:%S.0")}
+        for i in range(points)
+    ]
+    return {
+        "hrvSummary": {"calendarDate": date, "weeklyAvg": 55, "lastNightAvg": 52, "status": "BALANCED"},
+        "hrvReadings": readings,
+    }
+
+
+def synthetic_summary(date: str, seed: int = 0) -> dict:
+    rng = random.Random(f"{seed}{date}")
+    return {
+        "calendarDate": date,
+        "privacyProtected": False,
+        "totalSteps": rng.randint(2000, 20000),
+        "totalKilocalories": rng.randint(1800, 3500),
+        "activeKilocalories": rng.randint(200, 1500),
+        "restingHeartRate": rng.randint(45, 65),
+        "averageStressLevel": rng.randint(15, 50),
+        "bodyBatteryHighestValue": rng.randint(50, 100),
+        "floorsAscended": rng.randint(0, 30),
+    }
+
+
+def synthetic_body_composition(start: str, end: str, seed: int = 0) -> dict:
+    rng = random.Random(f"{seed}{start}")
+    weight = rng.uniform(60000, 80000)
+    return {
+        "startDate": start,
+        "endDate": end,
+        "dateWeightList": [{"calendarDate": start, "weight": round(weight), "bmi": 22.4, "bodyFat": 15.2}],
+        "totalAverage": {"weight": round(weight), "bmi": 22.4, "bodyFat": 15.2},
+    }
+
+
+class MockGarminServer:
+    """
+    A threaded HTTP server answering Garmin Connect API paths with synthetic data.
+
+    Activity lists are pre-encoded so that range queries cost the server a slice and a join.
+    A directory of recorded responses can override any path: `<fixtures>/hrv-service/hrv.json`
+    answers every request below `/hrv-service/hrv`, a more specific file wins.
+
+    Args:
+        port (int, optional): The port, 0 picks a free one. Defaults to 0.
+        latency (float, optional): Seconds added to every response. Defaults to 0.
+        activities (int, optional): The number of synthetic activities. Defaults to 10000.
+        hrv_points (int, optional): Readings per HRV day. Defaults to 288 (one day of 5 minute readings).
+        padding (int, optional): Extra characters per activity. Defaults to 0.
+        fixtures (str, optional): A directory of recorded JSON responses.
+        end_date (datetime.date, optional): The date of the newest activity. Defaults to today.
+        seed (int, optional): The random seed. Defaults to 0.
+    """
+
+    def __init__(self, port: int = 0, latency: float = 0.0, activities: int = 10000, hrv_points: int = 288,
+                 padding: int = 0, fixtures: Optional[str] = None, end_date: Optional[datetime.date] = None,
+                 seed: int = 0):
+        self.latency = latency
+        self.hrv_points = hrv_points
+        self.fixtures = fixtures
+        self.seed = seed
+        self.requests = 0
+        self.activities = synthetic_activities(activities, end_date or datetime.date.today(), seed, padding)
+        self._encoded = [json.dumps(activity, separators=(",", ":")).encode() for activity in self.activities]
+        self._ascending_dates = [activity["startTimeLocal"][:10] for activity in reversed(self.activities)]
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def start(self) -> "MockGarminServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockGarminServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _fixture(self, path: str) -> Optional[bytes]:
+        if not self.fixtures:
+            return None
+        parts = path.strip("/").split("/")
+        while parts:
+            candidate = os.path.join(self.fixtures, *parts) + ".json"
+            if os.path.isfile(candidate):
+                with open(candidate, "rb") as f:
+                    return f.read()
+            parts.pop()
+        return None
+
+    def _activity_list(self, query: dict) -> bytes:
+        count = len(self.activities)
+        indexes = range(count)
+        if "startDate" in query:
+            # Activities are newest first, bisect the ascending dates and map back.
+            lo = bisect.bisect_left(self._ascending_dates, query["startDate"])
+            hi = bisect.bisect_right(self._ascending_dates, query.get("endDate", "9999-12-31"))
+            indexes = range(count - hi, count - lo)
+        type_key = query.get("activityType")
+        if type_key:
+            indexes = [i for i in indexes if self.activities[i]["activityType"]["typeKey"] == type_key]
+        first = int(query.get("start", 0))
+        limit = int(query.get("limit", 20))
+        return b"[" + b",".join(self._encoded[i] for i in indexes[first:first + limit]) + b"]"
+
+    def respond(self, path: str, query: dict) -> Optional[bytes]:
+        """
+        Returns the response body for a request as bytes, or None for unknown paths.
+        """
+        recorded = self._fixture(path)
+        if recorded is not None:
+            return recorded
+        if path.startswith("/activitylist-service/activities/search/activities"):
+            return self._activity_list(query)
+        if path.startswith("/hrv-service/hrv/"):
+            body = synthetic_hrv(path.rsplit("/", 1)[1], self.hrv_points, self.seed)
+        elif path.startswith("/usersummary-service/usersummary/daily/"):
+            body = synthetic_summary(query.get("calendarDate", ""), self.seed)
+        elif path.startswith("/weight-service/weight/dateRange"):
+            body = synthetic_body_composition(query.get("startDate", ""), query.get("endDate", ""), self.seed)
+        elif path.startswith("/device-service/deviceregistration/devices"):
+            body = [{"deviceId": 3_000_000_000 + i, "productDisplayName": f"Watch {i}"} for i in range(3)]
+        elif path.startswith("/goal-service/goal/goals"):
+            # Paged like activity lists, the client stops at the first empty page.
+            body = [{"goalType": "steps", "goalValue": 10000}] if int(query.get("start", 1)) <= 1 else []
+        elif path.startswith("/userprofile-service/userprofile/user-settings"):
+            body = {"userData": {"measurementSystem": "metric"}}
+        else:
+            return None
+        return json.dumps(body, separators=(",", ":")).encode()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, Nagle would delay every keep-alive response.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                parts = urlsplit(self.path)
+                query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+                body = server.respond(parts.path, query)
+                if body is None:
+                    self.send_response(404)
+                    body = b'{"message":"Not found"}'
+                else:
+                    self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve synthetic Garmin Connect API responses locally.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--activities", type=int, default=10000, help="Number of synthetic activities")
+    parser.add_argument("--hrv-points", type=int, default=288, help="Readings per HRV day")
+    parser.add_argument("--padding", type=int, default=0, help="Extra characters per activity")
+    parser.add_argument("--fixtures", help="Directory of recorded JSON responses")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = MockGarminServer(args.port, args.latency, args.activities, args.hrv_points, args.padding, args.fixtures)
+    print(f"Serving {len(server.activities)} activities on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
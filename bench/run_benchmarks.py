@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+"""
+Summary: Benchmarks the client, plugins and viewer against a local mock Garmin Connect server.
+Author: github.com/bshreyas13
+
+Example:
+    python bench/run_benchmarks.py --activities 10000 --latency 0.02
+    python bench/run_benchmarks.py --compare bench/results/3418bbb.json
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.mock_server import MockGarminServer  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+# Budgets high enough that the limiter never paces the benchmark, unless --real-limits is given.
+UNLIMITED = "activities=10000:10000,activity_details=10000:10000,downloads=10000:10000,wellness=10000:10000,default=10000:10000"
+STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from modules.interface import GarminConnectInterface
+GarminConnectInterface().menu.display()
+print(f"BENCH {time.perf_counter() - start}", file=sys.stderr)
+"""
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Reduces repeated measurements to median, p95, min and max.
+    """
+    ordered = sorted(samples)
+    return {
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "min": ordered[0],
+        "max": ordered[-1],
+        "n": len(ordered),
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def mock_api(tmpdir: str, api_url: str):
+    """
+    Builds a `Garmin` API object that talks to the mock server through the shared session.
+
+    A `CountingHTTPAdapter` subclass mounted on the shared session sends Connect API requests to
+    `api_url`, so they are paced and counted like real ones. The tokens are fake and never
+    expire, so no login request is made. The response cache is bypassed to measure the full
+    request path.
+    """
+    from urllib.parse import urlsplit
+
+    from garminconnect import Garmin
+    from garth.auth_tokens import OAuth1Token, OAuth2Token
+    from modules.cache import CachedGarminApi, ResponseCache
+    from modules.http_session import DEFAULT_POOL_SIZE, CountingHTTPAdapter, attach_shared_session
+    from modules.rate_limit import endpoint_family
+
+    class MockServerAdapter(CountingHTTPAdapter):
+        def send(self, request, **kwargs):
+            if endpoint_family(request.url):
+                parts = urlsplit(request.url)
+                request.url = api_url.rstrip("/") + parts.path + (f"?{parts.query}" if parts.query else "")
+            return super().send(request, **kwargs)
+
+    api = Garmin()
+    attach_shared_session(api)
+    adapter = MockServerAdapter(pool_connections=DEFAULT_POOL_SIZE, pool_maxsize=DEFAULT_POOL_SIZE, pool_block=True)
+    api.garth.sess.mount("https://", adapter)
+    api.garth.sess.mount("http://", adapter)
+    far = int(time.time()) + 10 * 365 * 86400
+    api.garth.oauth1_token = OAuth1Token(oauth_token="bench", oauth_token_secret="bench")
+    api.garth.oauth2_token = OAuth2Token(scope="", jti="", token_type="Bearer", access_token="bench",
+                                         refresh_token="bench", expires_in=far, expires_at=far,
+                                         refresh_token_expires_in=far, refresh_token_expires_at=far)
+    api.display_name = "bench"
+    api.full_name = "Bench User"
+    api.unit_system = "metric"
+    cached = CachedGarminApi(api, ResponseCache(os.path.join(tmpdir, "cache.sqlite")))
+    cached.bypass = True
+    return cached
+
+
+def bench_startup(repeat: int, env: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Measures process start until the menu is displayed, without login.
+    """
+    process, in_process = [], []
+    # The first run writes the plugin manifest, measure warm starts.
+    runs = repeat + 1
+    for i in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=ROOT, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+        elapsed = time.perf_counter() - start
+        if i == 0:
+            continue
+        process.append(elapsed)
+        line = [l for l in result.stderr.splitlines() if l.startswith("BENCH ")][-1]
+        in_process.append(float(line.split()[1]))
+    return {"startup.process_s": summarize(process), "startup.import_and_menu_s": summarize(in_process)}
+
+
+def bench_plugins(api, keys: List[str], repeat: int, date: str) -> Dict[str, Any]:
+    from modules.batch import plugin_params
+    from modules.plugin_manifest import load_plugins
+
+    plugins = load_plugins(os.path.join(ROOT, "plugins"))
+    results = {}
+    for key in keys:
+        plugin = plugins.get(key)
+        if plugin is None:
+            continue
+        params = plugin_params(plugin, {"date": date})
+        try:
+            samples = measure(lambda: plugin.fetch(api, **params), repeat)
+        except Exception as err:
+            results[f"plugin.{key}.error"] = str(err)
+            continue
+        results[f"plugin.{key}.latency_s"] = summarize(samples)
+    return results
+
+
+def bench_range_fetch(api, start: str, end: str, repeat: int) -> Dict[str, Any]:
+    from modules.activity_fetch import fetch_activities_by_date
+    from modules.http_session import connection_stats
+
+    before = connection_stats()["requests"]
+    counts = []
+    samples = measure(lambda: counts.append(len(fetch_activities_by_date(api, start, end))), repeat)
+    requests = (connection_stats()["requests"] - before) / repeat
+    activities = counts[-1]
+    return {
+        "range_fetch.seconds": summarize(samples),
+        "range_fetch.activities_per_s": summarize([activities / s for s in samples]),
+        "range_fetch.activities": activities,
+        "range_fetch.requests": requests,
+    }
+
+
+def bench_sync(api, repeat: int, tmpdir: str) -> Dict[str, Any]:
+    """
+    Measures a full initial sync into empty local stores, then an incremental no-op sync.
+    """
+    from modules.activity_store import ActivityStore
+    from modules.columnar_store import ColumnarActivityStore
+    from modules.rollups import RollupStore
+    from modules.sync import ActivitySync
+
+    full, incremental = [], []
+    for i in range(repeat):
+        path = os.path.join(tmpdir, f"sync{i}")
+        os.makedirs(path)
+        sync = ActivitySync(api, ActivityStore(os.path.join(path, "activities.sqlite")),
+                            ColumnarActivityStore(os.path.join(path, "columnar")),
+                            RollupStore(os.path.join(path, "rollups.sqlite")))
+        full += measure(lambda: sync.sync(force=True), 1)
+        incremental += measure(lambda: sync.sync(force=True), 1)
+    return {"sync.full_s": summarize(full), "sync.incremental_s": summarize(incremental)}
+
+
+def _quiet_console(*args, **kwargs):
+    from rich.console import Console
+
+    return Console(file=io.StringIO(), width=120, force_terminal=False)
+
+
+def bench_render(activities: List[dict], hrv_days: List[dict], repeat: int) -> Dict[str, Any]:
+    """
+    Measures DataViewer rendering into an in-memory, non-interactive console.
+    """
+    import modules.data_viewer as data_viewer
+
+    original = data_viewer.Console
+    data_viewer.Console = _quiet_console
+    try:
+        viewer = data_viewer.DataViewer(activities)
+        pages = max(1, -(-len(activities) // 10))
+        results = {
+            "render.page_table_s": summarize(measure(
+                lambda: viewer.console.print(viewer._page_table(0, 10, pages)), repeat)),
+            "render.all_pages_s": summarize(measure(viewer.view_data, max(1, repeat // 2))),
+            "render.single_activity_s": summarize(measure(
+                lambda: data_viewer.DataViewer(activities[:1]).view_data(), repeat)),
+            "render.hrv_day_s": summarize(measure(
+                lambda: data_viewer.DataViewer.display_rich_output("HRV Data:", hrv_days[0]), repeat)),
+            "render.hrv_days_s": summarize(measure(
+                lambda: data_viewer.DataViewer.display_rich_output("HRV Data:", hrv_days), repeat)),
+        }
+    finally:
+        data_viewer.Console = original
+    return results
+
+
+def bench_memory(api, start: str, end: str) -> Dict[str, Any]:
+    """
+    Measures the peak Python heap of fetching a range and rendering its first page.
+    """
+    import modules.data_viewer as data_viewer
+    from modules.activity_fetch import fetch_activities_by_date
+
+    original = data_viewer.Console
+    data_viewer.Console = _quiet_console
+    tracemalloc.start()
+    try:
+        activities = fetch_activities_by_date(api, start, end)
+        viewer = data_viewer.DataViewer(activities)
+        viewer.console.print(viewer._page_table(0, 10, 1))
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        data_viewer.Console = original
+    return {"memory.range_fetch_render.peak_mb": peak / 2 ** 20, "memory.range_fetch_render.retained_mb": current / 2 ** 20}
+
+
+def bench_records(activities: List[dict]) -> Dict[str, Any]:
+    """
+    Measures the heap held by stored activity summaries as parsed dicts and as ActivityRecords.
+    """
+    from modules.activity_record import ActivityRecord
+
+    texts = [json.dumps(activity) for activity in activities]
+    results = {}
+    for name, load in (("dicts", json.loads), ("records", ActivityRecord.from_json)):
+        tracemalloc.start()
+        try:
+            start = time.perf_counter()
+            loaded = [load(text) for text in texts]
+            elapsed = time.perf_counter() - start
+            current = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        del loaded
+        results[f"memory.activities_as_{name}_mb"] = current / 2 ** 20
+        results[f"records.load_{name}_per_s"] = len(texts) / elapsed if elapsed else 0.0
+    return results
+
+
+def git_revision() -> str:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return f"{rev}-dirty" if dirty else rev
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float) -> int:
+    """
+    Prints the change of every metric present in both result files.
+
+    Returns:
+        int: The number of metrics that regressed by more than `threshold`.
+    """
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title=f"{old['meta']['revision']} -> {new['meta']['revision']}")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Before", justify="right")
+    table.add_column("After", justify="right")
+    table.add_column("Change", justify="right")
+    regressions = 0
+    for name, value in new["results"].items():
+        before = old["results"].get(name)
+        if isinstance(value, dict):
+            value = value.get("median")
+            before = before.get("median") if isinstance(before, dict) else None
+        if not isinstance(value, (int, float)) or not isinstance(before, (int, float)) or not before:
+            continue
+        change = value / before - 1
+        # Throughput and counts of work done are better when higher, everything else when lower.
+        worse = -change if name.endswith("_per_s") else change
+        style = "red" if worse > threshold else "green" if worse < -threshold else ""
+        regressions += worse > threshold
+        table.add_row(name, f"{before:.4g}", f"{value:.4g}", f"[{style}]{change:+.1%}[/{style}]" if style else f"{change:+.1%}")
+    Console().print(table)
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark against a local mock Garmin Connect server.")
+    parser.add_argument("--activities", type=int, default=10000, help="Number of synthetic activities")
+    parser.add_argument("--hrv-points", type=int, default=288, help="Readings per HRV day")
+    parser.add_argument("--padding", type=int, default=0, help="Extra characters per activity")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--fixtures", help="Directory of recorded JSON responses")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per measurement")
+    parser.add_argument("--plugins", default="0,3,4,5,7,8,9", help="Command keys for plugin latency")
+    parser.add_argument("--skip", default="", help="Comma separated groups to skip: startup,plugins,range,sync,render,memory")
+    parser.add_argument("--real-limits", action="store_true", help="Keep the default request rate limits")
+    parser.add_argument("-o", "--output", help="Result file, defaults to bench/results/<revision>.json")
+    parser.add_argument("--compare", help="A previous result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change reported as a regression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    skip = set(filter(None, args.skip.split(",")))
+    tmpdir = tempfile.mkdtemp(prefix="garmin_bench_")
+    end = datetime.date.today()
+
+    with MockGarminServer(latency=args.latency, activities=args.activities, hrv_points=args.hrv_points,
+                          padding=args.padding, fixtures=args.fixtures, end_date=end) as server:
+        os.environ["GARMINDATA"] = tmpdir
+        if not args.real_limits:
+            os.environ["GARMIN_RATE_LIMITS"] = UNLIMITED
+        start = server.activities[-1]["startTimeLocal"][:10]
+        date = (end - datetime.timedelta(days=1)).isoformat()
+
+        results: Dict[str, Any] = {}
+        if "startup" not in skip:
+            results.update(bench_startup(args.repeat, dict(os.environ)))
+        api = mock_api(tmpdir, server.url)
+        if "plugins" not in skip:
+            results.update(bench_plugins(api, args.plugins.split(","), args.repeat, date))
+        if "range" not in skip:
+            results.update(bench_range_fetch(api, start, end.isoformat(), args.repeat))
+        if "sync" not in skip:
+            results.update(bench_sync(api, args.repeat, tmpdir))
+        if "render" not in skip:
+            hrv_days = [api.get_hrv_data((end - datetime.timedelta(days=i)).isoformat()) for i in range(30)]
+            results.update(bench_render(server.activities, hrv_days, args.repeat))
+        if "memory" not in skip:
+            results.update(bench_memory(api, start, end.isoformat()))
+            results.update(bench_records(server.activities))
+        results["server.requests"] = server.requests
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['meta']['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            return 1 if compare(json.load(f), report, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,42 @@
-# -*- coding: utf-8 -*-
-"""
-Created on Sun Sep 16 12:34:56 2024
-Summary: Terminal App for using Garmin connect API.
-Author: github.com/bshreyas13
-"""
-import logging
-from modules.menu import Menu
-from modules.interface import GarminConnectInterface, CredentialsManager
-from rich.console import Console
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-console = Console()
-
-
-if __name__ == "__main__":
-    creds = CredentialsManager()
-
-    email, password = creds.get_credentials()
-
-    demo = GarminConnectInterface(email, password)
-    demo.run()
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Sep 16 12:34:56 2024
+Summary: Terminal App for using Garmin connect API.
+Author: github.com/bshreyas13
+"""
+import argparse
+import logging
+from modules.accounts import AccountRegistry
+from modules.menu import Menu
+from modules.profiling import default_profile_dir
+from modules.interface import GarminConnectInterface, CredentialsManager
+from rich.console import Console
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+console = Console()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Terminal app for the Garmin Connect API.")
+    parser.add_argument("--account", help="Use a registered account instead of the default one")
+    parser.add_argument("--profile", nargs="?", const="", metavar="DIR",
+                        help="Profile every selection with cProfile and tracemalloc, reports go to DIR "
+                             "(default: profiles in the data directory)")
+    args = parser.parse_args()
+
+    if args.account:
+        account = AccountRegistry().get(args.account)
+        if account is None:
+            parser.error(f"Unknown account '{args.account}', register it with 'python accounts.py add'.")
+        account.activate()
+    creds = CredentialsManager(args.account)
+
+    # Credentials are only looked up (or prompted for) if the stored tokens cannot be used.
+    profile_dir = None
+    if args.profile is not None:
+        profile_dir = args.profile or default_profile_dir()
+        console.print(f"Profiling enabled, reports are written to {profile_dir}", style="bold yellow")
+    demo = GarminConnectInterface(credentials_provider=creds.get_credentials, profile_dir=profile_dir)
+    demo.run()
@@ -0,0 +1,151 @@
+import json
+import logging
+import os
+import re
+from typing import Dict, List, Optional
+
+from modules.paths import data_path
+
+logger = logging.getLogger(__name__)
+
+_NAME_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+# Roots captured before any account is activated, since activating one rewrites the variables.
+# Account tokens live outside the default token store, so logging out of the default account
+# does not remove them.
+_DEFAULT_TOKENS = os.getenv("GARMINTOKENS") or "~/.garminconnect"
+_TOKENS_ROOT = _DEFAULT_TOKENS.rstrip("/\\") + "_accounts"
+_DATA_ROOT = os.path.expanduser(os.getenv("GARMINDATA") or "~/.garminconnect_data")
+_BASE_RATE_LIMITS = os.getenv("GARMIN_RATE_LIMITS")
+
+
+class Account:
+    """
+    A Garmin Connect account known to the registry.
+
+    Each account keeps its tokens and its local data (response cache, activity store) in its
+    own directories, and its credentials under its own keyring service.
+
+    Args:
+        name (str): A short, file system safe name, e.g. "alice".
+        email (str, optional): The login e-mail, for display.
+        rate_limits (str, optional): Request budgets for this account in GARMIN_RATE_LIMITS syntax.
+    """
+
+    __slots__ = ("name", "email", "rate_limits")
+
+    def __init__(self, name: str, email: Optional[str] = None, rate_limits: Optional[str] = None):
+        if not _NAME_RE.match(name):
+            raise ValueError(f"Invalid account name '{name}', use letters, digits, '.', '_' or '-'.")
+        self.name = name
+        self.email = email
+        self.rate_limits = rate_limits
+
+    @property
+    def tokenstore(self) -> str:
+        return os.path.join(_TOKENS_ROOT, self.name)
+
+    @property
+    def data_dir(self) -> str:
+        return os.path.join(_DATA_ROOT, "accounts", self.name)
+
+    def environment(self) -> Dict[str, str]:
+        """
+        Returns the environment variables that point the client and the local stores to this account.
+
+        Returns:
+            Dict[str, str]: GARMINTOKENS, GARMINDATA and GARMIN_RATE_LIMITS, which is None when
+                neither the account nor the original environment sets budgets.
+        """
+        return {
+            "GARMINTOKENS": self.tokenstore,
+            "GARMINDATA": self.data_dir,
+            "GARMIN_RATE_LIMITS": self.rate_limits or _BASE_RATE_LIMITS,
+        }
+
+    def activate(self) -> None:
+        """
+        Switches the current process to this account. Must be called before logging in or opening stores.
+
+        The shared HTTP session and rate limiter are dropped as well, so no cookies, tokens or
+        budgets of a previously active account carry over.
+        """
+        from modules.http_session import reset_shared_session
+        from modules.rate_limit import reset_shared_limiter
+
+        env = self.environment()
+        os.makedirs(env["GARMINDATA"], exist_ok=True)
+        legacy = os.path.expanduser(os.path.join(_DEFAULT_TOKENS, self.name))
+        tokenstore = os.path.expanduser(self.tokenstore)
+        if os.path.isdir(legacy) and not os.path.exists(tokenstore):
+            # Tokens of accounts registered before they had their own root.
+            os.makedirs(os.path.dirname(tokenstore), exist_ok=True)
+            os.replace(legacy, tokenstore)
+        for key, value in env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        reset_shared_session()
+        reset_shared_limiter()
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        return {"name": self.name, "email": self.email, "rate_limits": self.rate_limits}
+
+
+class AccountRegistry:
+    """
+    The list of configured accounts, stored as JSON in the data directory.
+
+    Args:
+        path (str, optional): The registry file. Defaults to `accounts.json` in the data directory.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or data_path("accounts.json")
+        self._accounts: Dict[str, Account] = {}
+        try:
+            with open(self.path) as f:
+                for item in json.load(f):
+                    account = Account(**item)
+                    self._accounts[account.name] = account
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as err:
+            logger.error(f"Could not read account registry '{self.path}': {err}")
+
+    def save(self) -> None:
+        with open(self.path, "w") as f:
+            json.dump([account.to_dict() for account in self._accounts.values()], f, indent=2)
+
+    def add(self, name: str, email: Optional[str] = None, rate_limits: Optional[str] = None) -> Account:
+        account = Account(name, email, rate_limits)
+        self._accounts[name] = account
+        self.save()
+        return account
+
+    def remove(self, name: str) -> None:
+        if self._accounts.pop(name, None) is not None:
+            self.save()
+
+    def get(self, name: str) -> Optional[Account]:
+        return self._accounts.get(name)
+
+    def select(self, names: Optional[List[str]] = None) -> List[Account]:
+        """
+        Returns the accounts with the given names, or all accounts if no names are given.
+
+        Raises:
+            KeyError: If a name is not registered.
+        """
+        if not names or names == ["all"]:
+            return list(self._accounts.values())
+        missing = [name for name in names if name not in self._accounts]
+        if missing:
+            raise KeyError(f"Unknown accounts: {', '.join(missing)}")
+        return [self._accounts[name] for name in names]
+
+    def __iter__(self):
+        return iter(list(self._accounts.values()))
+
+    def __len__(self) -> int:
+        return len(self._accounts)
@@ -0,0 +1,159 @@
+import datetime
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_MONTHS = 1
+DEFAULT_MAX_WORKERS = 4
+
+
+def split_date_range(start_date: str, end_date: str, window_months: int = DEFAULT_WINDOW_MONTHS) -> List[Tuple[str, str]]:
+    """
+    Splits an inclusive date range into consecutive windows aligned to calendar months.
+
+    Args:
+        start_date (str): The first day of the range, in YYYY-MM-DD format.
+        end_date (str): The last day of the range, in YYYY-MM-DD format.
+        window_months (int, optional): The number of calendar months per window. Defaults to 1.
+
+    Returns:
+        List[Tuple[str, str]]: Inclusive (start, end) date pairs in chronological order.
+    """
+    start = datetime.date.fromisoformat(start_date)
+    end = datetime.date.fromisoformat(end_date)
+    if start > end:
+        start, end = end, start
+
+    windows = []
+    window_start = start
+    while window_start <= end:
+        month = window_start.month - 1 + window_months
+        next_start = datetime.date(window_start.year + month // 12, month % 12 + 1, 1)
+        window_end = min(next_start - datetime.timedelta(days=1), end)
+        windows.append((window_start.isoformat(), window_end.isoformat()))
+        window_start = next_start
+    return windows
+
+
+def merge_activities(chunks: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Merges activity lists, dropping duplicate activityIds and ordering by start time.
+
+    Args:
+        chunks (List[List[Dict[str, Any]]]): Activity lists as returned by the API.
+
+    Returns:
+        List[Dict[str, Any]]: The merged activities, oldest first.
+    """
+    seen = {}
+    for chunk in chunks:
+        for activity in chunk or []:
+            activity_id = activity.get("activityId")
+            key = activity_id if activity_id is not None else id(activity)
+            if key not in seen:
+                seen[key] = activity
+    return sorted(seen.values(), key=lambda a: a.get("startTimeGMT") or a.get("startTimeLocal") or "")
+
+
+def fetch_activities_by_date(
+    api,
+    start_date: str,
+    end_date: str,
+    activity_type: Optional[str] = None,
+    window_months: int = DEFAULT_WINDOW_MONTHS,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    on_chunk: Optional[Callable[[Tuple[str, str], List[Dict[str, Any]]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetches activities for a date range by querying month windows concurrently.
+
+    The range is split with `split_date_range` and every window is requested with
+    `api.get_activities_by_date` on a bounded thread pool. Past windows are served from the
+    response cache on repeated calls, so only windows touching today go to the network again.
+
+    Args:
+        api: The Garmin API object (or a proxy of it).
+        start_date (str): The first day of the range, in YYYY-MM-DD format.
+        end_date (str): The last day of the range, in YYYY-MM-DD format.
+        activity_type (str, optional): Restrict results to this activity type.
+        window_months (int, optional): The number of calendar months per request. Defaults to 1.
+        max_workers (int, optional): The maximum number of concurrent requests. Defaults to 4.
+        on_chunk (Callable, optional): Called with the window and its activities as each window completes.
+
+    Returns:
+        List[Dict[str, Any]]: The activities in the range, oldest first, without duplicates.
+    """
+    windows = split_date_range(start_date, end_date, window_months)
+
+    def fetch(window: Tuple[str, str]) -> List[Dict[str, Any]]:
+        if activity_type:
+            return api.get_activities_by_date(window[0], window[1], activity_type) or []
+        return api.get_activities_by_date(window[0], window[1]) or []
+
+    if len(windows) == 1:
+        chunk = fetch(windows[0])
+        if on_chunk:
+            on_chunk(windows[0], chunk)
+        return merge_activities([chunk])
+
+    chunks = []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(windows))) as executor:
+        futures = {executor.submit(fetch, window): window for window in windows}
+        for future in as_completed(futures):
+            window = futures[future]
+            chunk = future.result()
+            logger.debug(f"Fetched {len(chunk)} activities for {window[0]} to {window[1]}.")
+            chunks.append(chunk)
+            if on_chunk:
+                on_chunk(window, chunk)
+    return merge_activities(chunks)
+
+
+def iter_activities_by_date(
+    api,
+    start_date: str,
+    end_date: str,
+    activity_type: Optional[str] = None,
+    window_months: int = DEFAULT_WINDOW_MONTHS,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streams activities for a date range, window by window in chronological order.
+
+    Up to `max_workers` windows are requested ahead of the one being yielded, so memory is
+    bounded by a few windows regardless of the length of the range. Duplicates across windows
+    are dropped by activityId.
+
+    Args:
+        api: The Garmin API object (or a proxy of it).
+        start_date (str): The first day of the range, in YYYY-MM-DD format.
+        end_date (str): The last day of the range, in YYYY-MM-DD format.
+        activity_type (str, optional): Restrict results to this activity type.
+        window_months (int, optional): The number of calendar months per request. Defaults to 1.
+        max_workers (int, optional): The maximum number of concurrent requests. Defaults to 4.
+
+    Yields:
+        Dict[str, Any]: Activity summaries, oldest first.
+    """
+    windows = deque(split_date_range(start_date, end_date, window_months))
+
+    def fetch(window: Tuple[str, str]) -> List[Dict[str, Any]]:
+        if activity_type:
+            return api.get_activities_by_date(window[0], window[1], activity_type) or []
+        return api.get_activities_by_date(window[0], window[1]) or []
+
+    seen = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        while windows or pending:
+            while windows and len(pending) < max_workers:
+                pending.append(executor.submit(fetch, windows.popleft()))
+            for activity in merge_activities([pending.popleft().result()]):
+                activity_id = activity.get("activityId")
+                if activity_id in seen:
+                    continue
+                seen.add(activity_id)
+                yield activity
@@ -0,0 +1,254 @@
+import calendar
+import datetime
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Sort keys and whether "top N by <key>" ranks high values first.
+SORT_KEYS = {
+    "date": ("start", True),
+    "start": ("start", True),
+    "distance": ("distance", True),
+    "duration": ("duration", True),
+    "time": ("duration", True),
+    "pace": ("pace", False),
+    "speed": ("speed", True),
+}
+_OPERATORS = {"=": "=", "==": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+_DISTANCE_UNITS = {"m": 1.0, "km": 1000.0, "mi": 1609.344, "mile": 1609.344, "miles": 1609.344}
+_DURATION_UNITS = {"s": 1.0, "sec": 1.0, "m": 60.0, "min": 60.0, "h": 3600.0, "hr": 3600.0, "hours": 3600.0}
+_SPEED_UNITS = {"km/h": 1 / 3.6, "kph": 1 / 3.6, "mph": 1609.344 / 3600, "m/s": 1.0}
+_PERIOD_DAYS = {"day": 1, "week": 7}
+
+_NUMBER = r"(\d+(?:\.\d+)?)"
+_DATE = r"\d{4}(?:-\d{2}(?:-\d{2})?)?"
+_COMPARISON = re.compile(r"^(distance|duration|time|pace|speed)\s*(>=|<=|!=|==|>|<|=)\s*(.+)$")
+_TOP = re.compile(r"^(?:top|first|limit)\s+(\d+)(?:\s+by\s+(\w+)(?:\s+(asc|desc))?)?$")
+_SORT = re.compile(r"^(?:(?:sort|sorted|order|ordered)\s+)?by\s+(\w+)(?:\s+(asc|desc))?$")
+_RANGE = re.compile(rf"^({_DATE})\s*(?:\.\.|to)\s*({_DATE})$")
+_SINCE = re.compile(rf"^(?:since|after|from)\s+({_DATE})$")
+_UNTIL = re.compile(rf"^(before|until)\s+({_DATE})$")
+_LAST = re.compile(r"^last\s+(\d+)\s+(day|week|month|year)s?$")
+_DEVICE = re.compile(r"^device\s*=?\s*(.+)$")
+_TYPE = re.compile(r"^type\s*=?\s*(.+)$")
+
+
+def _period(text: str) -> Tuple[datetime.date, datetime.date]:
+    """Returns the first and last day of a year, month or day written as YYYY[-MM[-DD]]."""
+    parts = [int(part) for part in text.split("-")]
+    if len(parts) == 1:
+        return datetime.date(parts[0], 1, 1), datetime.date(parts[0], 12, 31)
+    if len(parts) == 2:
+        return datetime.date(parts[0], parts[1], 1), datetime.date(parts[0], parts[1], calendar.monthrange(*parts)[1])
+    day = datetime.date(*parts)
+    return day, day
+
+
+def _clock(text: str) -> float:
+    """Returns seconds of a h:mm:ss or mm:ss string."""
+    seconds = 0.0
+    for part in text.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def _value(field: str, text: str) -> float:
+    """Converts a comparison value to the unit stored for `field` (m, s, s/km or m/s)."""
+    text = text.strip().lower()
+    if field == "pace":
+        match = re.fullmatch(r"(\d+(?::\d{1,2})?(?:\.\d+)?)\s*(?:min)?\s*(?:/\s*(km|mi))?", text)
+        if not match:
+            raise ValueError(f"Could not read the pace '{text}', use e.g. 5:30 or 8:45/mi.")
+        seconds = _clock(match.group(1)) if ":" in match.group(1) else float(match.group(1)) * 60
+        return seconds / 1.609344 if match.group(2) == "mi" else seconds
+    if field == "duration" and ":" in text:
+        parts = text.split(":")
+        # h:mm or h:mm:ss, a duration of minutes and seconds is written as 45min.
+        return _clock(text) * (60 if len(parts) == 2 else 1)
+    match = re.fullmatch(rf"{_NUMBER}\s*([a-z/]*)", text)
+    units = {"distance": _DISTANCE_UNITS, "duration": _DURATION_UNITS, "speed": _SPEED_UNITS}[field]
+    default = {"distance": "km", "duration": "min", "speed": "km/h"}[field]
+    if not match or (match.group(2) or default) not in units:
+        raise ValueError(f"Could not read the {field} '{text}', units are {', '.join(units)}.")
+    return float(match.group(1)) * units[match.group(2) or default]
+
+
+class ActivityQuery:
+    """
+    A parsed activity query, answered by `ActivityStore.select`.
+
+    Attributes:
+        activity_types (List[str]): Matching typeKeys, any type if empty.
+        device_ids (List[int]): Matching device ids, any device if empty.
+        start_date (str): The first day (YYYY-MM-DD), or None.
+        end_date (str): The last day (YYYY-MM-DD), or None.
+        conditions (List[Tuple[str, str, float]]): (field, operator, value) filters on distance (m),
+            duration (s), pace (s/km) and speed (m/s).
+        order_by (str): The sort field, a value of SORT_KEYS.
+        descending (bool): Whether to sort in descending order.
+        limit (int): The maximum number of activities, or None.
+    """
+
+    __slots__ = ("activity_types", "device_ids", "start_date", "end_date", "conditions", "order_by", "descending", "limit")
+
+    def __init__(self):
+        self.activity_types: List[str] = []
+        self.device_ids: List[int] = []
+        self.start_date: Optional[str] = None
+        self.end_date: Optional[str] = None
+        self.conditions: List[Tuple[str, str, float]] = []
+        self.order_by = "start"
+        self.descending = True
+        self.limit: Optional[int] = None
+
+    def where(self) -> List[Tuple[str, str, Any]]:
+        """
+        Returns the filters as `ActivityStore.select` conditions.
+        """
+        where: List[Tuple[str, str, Any]] = []
+        if self.activity_types:
+            where.append(("type", "in", self.activity_types))
+        if self.device_ids:
+            where.append(("device", "in", self.device_ids))
+        if self.start_date:
+            where.append(("start", ">=", self.start_date))
+        if self.end_date:
+            end_exclusive = datetime.date.fromisoformat(self.end_date) + datetime.timedelta(days=1)
+            where.append(("start", "<", end_exclusive.isoformat()))
+        where.extend(self.conditions)
+        return where
+
+    def describe(self) -> Dict[str, str]:
+        """
+        Returns the parts of the query in words, for display.
+        """
+        parts = {}
+        if self.activity_types:
+            parts["Types"] = ", ".join(self.activity_types)
+        if self.start_date or self.end_date:
+            parts["Dates"] = f"{self.start_date or 'start'} to {self.end_date or 'today'}"
+        if self.device_ids:
+            parts["Devices"] = ", ".join(str(device_id) for device_id in self.device_ids)
+        units = {"distance": ("km", 1000), "duration": ("min", 60), "pace": ("s/km", 1), "speed": ("km/h", 1 / 3.6)}
+        filters = []
+        for field, operator, value in self.conditions:
+            unit, scale = units[field]
+            filters.append(f"{field} {operator} {value / scale:.4g} {unit}")
+        if filters:
+            parts["Filters"] = "; ".join(filters)
+        parts["Order"] = f"{self.order_by} {'descending' if self.descending else 'ascending'}"
+        if self.limit:
+            parts["Limit"] = str(self.limit)
+        return parts
+
+
+def parse_query(text: str, activity_types: List[str],
+                resolve_device: Optional[Callable[[str], List[int]]] = None,
+                today: Optional[datetime.date] = None) -> ActivityQuery:
+    """
+    Parses a comma separated activity query such as "running, distance > 20km, 2023, top 10 by pace".
+
+    Clauses:
+        - An activity type, e.g. `running` or `type = trail running`. A word that is not a stored
+          typeKey matches every type containing it. Several types are combined.
+        - A date: `2023`, `2023-05`, `2023-05-01`, a range `2023-01..2023-06`, `since 2023-03`,
+          `before 2024`, `until 2024-06-30` or `last 4 weeks`.
+        - A comparison on distance (m, km, mi; km by default), duration (s, min, h or h:mm[:ss];
+          minutes by default), pace (mm:ss per km, or /mi) or speed (km/h, mph, m/s).
+        - `device = <id or name>`.
+        - `top 10`, `top 10 by pace`, `sort by distance asc` or `limit 5`. "top" ranks the best
+          first: the fastest pace, otherwise the largest value. Without a sort the newest come first.
+
+    Args:
+        text (str): The query.
+        activity_types (List[str]): The typeKeys present in the store.
+        resolve_device (Callable[[str], List[int]], optional): Returns the device ids of a device name.
+        today (datetime.date, optional): The reference day for `last N days`. Defaults to today.
+
+    Returns:
+        ActivityQuery: The parsed query.
+
+    Raises:
+        ValueError: If a clause cannot be understood.
+    """
+    query = ActivityQuery()
+    today = today or datetime.date.today()
+    known_types = {activity_type.lower(): activity_type for activity_type in activity_types}
+    clauses = [clause.strip().lower() for clause in re.split(r",|;|\band\b", text) if clause.strip()]
+
+    def restrict(start: Optional[datetime.date], end: Optional[datetime.date]):
+        if start and (query.start_date is None or start.isoformat() > query.start_date):
+            query.start_date = start.isoformat()
+        if end and (query.end_date is None or end.isoformat() < query.end_date):
+            query.end_date = end.isoformat()
+
+    for clause in clauses:
+        match = _TOP.match(clause)
+        if match:
+            query.limit = int(match.group(1))
+            if match.group(2):
+                clause = f"by {match.group(2)}" + (f" {match.group(3)}" if match.group(3) else "")
+            else:
+                continue
+        match = _SORT.match(clause)
+        if match:
+            if match.group(1) not in SORT_KEYS:
+                raise ValueError(f"Cannot sort by '{match.group(1)}', choose from {', '.join(SORT_KEYS)}.")
+            query.order_by, query.descending = SORT_KEYS[match.group(1)]
+            if match.group(2):
+                query.descending = match.group(2) == "desc"
+            continue
+        match = _COMPARISON.match(clause)
+        if match:
+            field = "duration" if match.group(1) == "time" else match.group(1)
+            query.conditions.append((field, _OPERATORS[match.group(2)], _value(field, match.group(3))))
+            continue
+        try:
+            if re.fullmatch(_DATE, clause):
+                restrict(*_period(clause))
+                continue
+            match = _RANGE.match(clause)
+            if match:
+                restrict(_period(match.group(1))[0], _period(match.group(2))[1])
+                continue
+            match = _SINCE.match(clause)
+            if match:
+                restrict(_period(match.group(1))[0], None)
+                continue
+            match = _UNTIL.match(clause)
+            if match:
+                first, last = _period(match.group(2))
+                restrict(None, first - datetime.timedelta(days=1) if match.group(1) == "before" else last)
+                continue
+        except ValueError:
+            raise ValueError(f"'{clause}' is not a valid date.") from None
+        match = _LAST.match(clause)
+        if match:
+            count, unit = int(match.group(1)), match.group(2)
+            if unit in _PERIOD_DAYS:
+                start = today - datetime.timedelta(days=count * _PERIOD_DAYS[unit] - 1)
+            else:
+                months = count * (12 if unit == "year" else 1)
+                month = today.month - 1 - months
+                year = today.year + month // 12
+                month = month % 12 + 1
+                start = today.replace(year=year, month=month, day=min(today.day, calendar.monthrange(year, month)[1]))
+            restrict(start, None)
+            continue
+        match = _DEVICE.match(clause)
+        if match:
+            device = match.group(1).strip()
+            ids = [int(device)] if device.isdigit() else (resolve_device(device) if resolve_device else [])
+            if not ids:
+                raise ValueError(f"Unknown device '{device}', use the device id or the name shown by the devices option.")
+            query.device_ids.extend(ids)
+            continue
+        match = _TYPE.match(clause)
+        name = (match.group(1) if match else clause).strip().replace(" ", "_")
+        if name in known_types:
+            query.activity_types.append(known_types[name])
+            continue
+        partial = [value for key, value in known_types.items() if name in key]
+        if not partial:
+            raise ValueError(f"Could not understand '{clause}'. It is not a filter, a sort or a stored activity type.")
+        query.activity_types.extend(partial)
+    return query
@@ -0,0 +1,176 @@
+import json
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Summary fields decoded when a record is built, keyed by JSON name. These are the fields the
+# activity tables, sorting and merging read for every activity.
+HOT_FIELDS = {
+    "activityId": "activity_id",
+    "activityName": "activity_name",
+    "activityType": "activity_type",
+    "startTimeLocal": "start_time_local",
+    "startTimeGMT": "start_time_gmt",
+    "duration": "duration",
+    "distance": "distance",
+    "averageSpeed": "average_speed",
+}
+_MISSING = object()
+# activityType objects repeat across activities, equal ones are shared instead of copied.
+_activity_types: Dict[bytes, Dict[str, Any]] = {}
+_MAX_ACTIVITY_TYPES = 1024
+
+
+def loads(raw: Union[bytes, str]) -> Any:
+    """Parses JSON, with orjson if it is installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def dumps(value: Any) -> bytes:
+    """Serializes to compact UTF-8 JSON, with orjson if it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def _shared_activity_type(activity_type: Any) -> Any:
+    if not isinstance(activity_type, dict):
+        return activity_type
+    key = dumps(activity_type)
+    shared = _activity_types.get(key)
+    if shared is None:
+        # A fresh copy, so later changes to the caller's dict do not leak into records.
+        shared = loads(key)
+        if len(_activity_types) < _MAX_ACTIVITY_TYPES:
+            _activity_types[key] = shared
+    return shared
+
+
+class ActivityRecord(Mapping):
+    """
+    A compact, read-only activity summary.
+
+    The fields in HOT_FIELDS are decoded once into slots. The complete summary is kept as
+    compact JSON bytes and parsed again whenever another field is read, so a record costs
+    little more than its JSON text instead of a tree of dicts. Records behave like the summary
+    dict: `record["activityName"]`, `record.get("maxHR")`, `"laps" in record` and iteration all
+    work. Values are shared and must not be modified; `to_dict()` returns a private copy.
+
+    Args:
+        raw (bytes): The activity summary as UTF-8 JSON.
+        fields (Dict[str, Any]): The parsed summary, the hot fields are taken from it.
+    """
+
+    __slots__ = tuple(HOT_FIELDS.values()) + ("_raw",)
+
+    def __init__(self, raw: bytes, fields: Dict[str, Any]):
+        for key, slot in HOT_FIELDS.items():
+            value = fields.get(key, _MISSING)
+            if key == "activityType":
+                value = _shared_activity_type(value)
+            object.__setattr__(self, slot, value)
+        object.__setattr__(self, "_raw", raw)
+
+    @classmethod
+    def from_json(cls, raw: Union[bytes, str]) -> "ActivityRecord":
+        """
+        Builds a record from a stored JSON summary.
+
+        Args:
+            raw (Union[bytes, str]): The activity summary as JSON.
+        """
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        return cls(raw, loads(raw))
+
+    @classmethod
+    def from_dict(cls, activity: Dict[str, Any]) -> "ActivityRecord":
+        """
+        Builds a record from a summary as returned by the API.
+
+        Args:
+            activity (Dict[str, Any]): The activity summary.
+        """
+        return cls(dumps(activity), activity)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ActivityRecord is read-only.")
+
+    def __reduce__(self):
+        return ActivityRecord.from_json, (self._raw,)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the complete summary as a new dict.
+        """
+        return loads(self._raw)
+
+    @property
+    def raw(self) -> bytes:
+        """The complete summary as compact UTF-8 JSON."""
+        return self._raw
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._raw)
+
+    def __getitem__(self, key: str) -> Any:
+        slot = HOT_FIELDS.get(key)
+        if slot is not None:
+            value = getattr(self, slot)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        return self.to_dict()[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        slot = HOT_FIELDS.get(key)
+        if slot is not None:
+            value = getattr(self, slot)
+            return default if value is _MISSING else value
+        return self.to_dict().get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        slot = HOT_FIELDS.get(key)
+        if slot is not None:
+            return getattr(self, slot) is not _MISSING
+        return key in self.to_dict()
+
+    def __iter__(self):
+        return iter(self.to_dict())
+
+    def __len__(self) -> int:
+        return len(self.to_dict())
+
+    # Parse once for whole-record views instead of once per key.
+    def keys(self):
+        return self.to_dict().keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def values(self):
+        return self.to_dict().values()
+
+    def __repr__(self) -> str:
+        return f"ActivityRecord(activityId={self.get('activityId')!r}, activityName={self.get('activityName')!r})"
+
+
+def to_records(activities: Iterable[Union[Dict[str, Any], ActivityRecord]]) -> List[ActivityRecord]:
+    """
+    Converts activity summaries to records, records are passed through.
+
+    Args:
+        activities (Iterable[Union[Dict[str, Any], ActivityRecord]]): Activity summaries.
+
+    Returns:
+        List[ActivityRecord]: The records, in the same order.
+    """
+    return [activity if isinstance(activity, ActivityRecord) else ActivityRecord.from_dict(activity)
+            for activity in activities]
@@ -0,0 +1,279 @@
+import datetime
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from modules.activity_record import ActivityRecord
+from modules.paths import data_path
+
+# Filterable and sortable fields of `select`, with the SQL expression each one maps to.
+QUERY_FIELDS = {
+    "start": "start_time_local",
+    "type": "activity_type",
+    "distance": "distance",
+    "duration": "duration",
+    "device": "device_id",
+    "pace": "duration * 1000.0 / distance",
+    "speed": "distance / duration",
+}
+QUERY_OPERATORS = ("=", "!=", "<", "<=", ">", ">=", "in")
+# Summary fields stored in their own indexed columns, added to databases created before them.
+_INDEXED_COLUMNS = {"distance": "REAL", "duration": "REAL", "device_id": "INTEGER"}
+
+
+class ActivityStore:
+    """
+    A local SQLite store of activity summaries as returned by `get_activities`.
+
+    Besides the activities themselves the store keeps a small key/value table with the sync
+    state (high-water mark, time of the last deep pass, whether the full history is present).
+    Start time, type, distance, duration and device are stored in indexed columns, so `select`
+    answers filtered and sorted queries without decoding every summary.
+
+    Args:
+        path (str, optional): The SQLite database file. Defaults to `activities.sqlite` in the data directory.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or data_path("activities.sqlite")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS activities ("
+            " activity_id INTEGER PRIMARY KEY,"
+            " start_time_gmt TEXT,"
+            " start_time_local TEXT,"
+            " activity_type TEXT,"
+            " data TEXT NOT NULL,"
+            " distance REAL,"
+            " duration REAL,"
+            " device_id INTEGER)"
+        )
+        self._add_indexed_columns()
+        self._conn.execute("CREATE INDEX IF NOT EXISTS activities_start ON activities (start_time_local)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS activities_type_start ON activities (activity_type, start_time_local)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS activities_distance ON activities (distance)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS activities_duration ON activities (duration)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS activities_device ON activities (device_id, start_time_local)")
+        # Expression indexes, used when a query filters or sorts by the same expression.
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS activities_pace ON activities ({QUERY_FIELDS['pace']})")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS activities_speed ON activities ({QUERY_FIELDS['speed']})")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+
+    def _add_indexed_columns(self) -> None:
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(activities)")}
+        missing = [name for name in _INDEXED_COLUMNS if name not in existing]
+        if not missing:
+            return
+        for name in missing:
+            self._conn.execute(f"ALTER TABLE activities ADD COLUMN {name} {_INDEXED_COLUMNS[name]}")
+        # Fill the new columns from the stored summaries once.
+        updates = []
+        for activity_id, data in self._conn.execute("SELECT activity_id, data FROM activities"):
+            activity = json.loads(data)
+            updates.append((activity.get("distance"), activity.get("duration"), activity.get("deviceId"), activity_id))
+        self._conn.executemany("UPDATE activities SET distance = ?, duration = ?, device_id = ? WHERE activity_id = ?", updates)
+        self._conn.commit()
+
+    @staticmethod
+    def _row(activity: Dict[str, Any]) -> tuple:
+        return (
+            activity["activityId"],
+            activity.get("startTimeGMT"),
+            activity.get("startTimeLocal"),
+            (activity.get("activityType") or {}).get("typeKey"),
+            json.dumps(activity, separators=(",", ":")),
+            activity.get("distance"),
+            activity.get("duration"),
+            activity.get("deviceId"),
+        )
+
+    def upsert(self, activities: Iterable[Dict[str, Any]]) -> int:
+        """
+        Inserts activities or replaces the stored version of existing ones.
+
+        Args:
+            activities (Iterable[Dict[str, Any]]): Activity summaries, each with an activityId.
+
+        Returns:
+            int: The number of activities written.
+        """
+        rows = [self._row(activity) for activity in activities if activity.get("activityId") is not None]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO activities"
+                " (activity_id, start_time_gmt, start_time_local, activity_type, data, distance, duration, device_id)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def delete(self, activity_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._conn.executemany("DELETE FROM activities WHERE activity_id = ?", [(i,) for i in activity_ids])
+            self._conn.commit()
+
+    def contains(self, activity_id: int) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM activities WHERE activity_id = ?", (activity_id,)).fetchone()
+        return row is not None
+
+    def get(self, activity_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM activities WHERE activity_id = ?", (activity_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yields every stored activity, oldest first.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM activities ORDER BY start_time_gmt").fetchall()
+        for row in rows:
+            yield json.loads(row[0])
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM activities").fetchone()[0]
+
+    def latest(self, limit: int) -> List[ActivityRecord]:
+        """
+        Returns the most recent activities, newest first, like `get_activities(0, limit)`.
+
+        Args:
+            limit (int): The number of activities to return.
+
+        Returns:
+            List[ActivityRecord]: The activity summaries as compact records.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM activities ORDER BY start_time_gmt DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [ActivityRecord.from_json(row[0]) for row in rows]
+
+    def between(self, start_date: str, end_date: str, activity_type: Optional[str] = None) -> List[ActivityRecord]:
+        """
+        Returns activities whose local start date lies in an inclusive date range, oldest first.
+
+        Args:
+            start_date (str): The first day of the range, in YYYY-MM-DD format.
+            end_date (str): The last day of the range, in YYYY-MM-DD format.
+            activity_type (str, optional): Only return activities with this typeKey.
+
+        Returns:
+            List[ActivityRecord]: The activity summaries as compact records.
+        """
+        end_exclusive = (datetime.date.fromisoformat(end_date) + datetime.timedelta(days=1)).isoformat()
+        query = "SELECT data FROM activities WHERE start_time_local >= ? AND start_time_local < ?"
+        params = [start_date, end_exclusive]
+        if activity_type:
+            query += " AND activity_type = ?"
+            params.append(activity_type)
+        query += " ORDER BY start_time_local"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [ActivityRecord.from_json(row[0]) for row in rows]
+
+    def iter_between(self, start_date: str, end_date: str, activity_type: Optional[str] = None,
+                     batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Streams activities of an inclusive date range, oldest first, reading `batch_size` rows at a time.
+
+        Args:
+            start_date (str): The first day of the range, in YYYY-MM-DD format.
+            end_date (str): The last day of the range, in YYYY-MM-DD format.
+            activity_type (str, optional): Only return activities with this typeKey.
+            batch_size (int, optional): The number of rows read per query. Defaults to 500.
+
+        Yields:
+            Dict[str, Any]: The activity summaries.
+        """
+        end_exclusive = (datetime.date.fromisoformat(end_date) + datetime.timedelta(days=1)).isoformat()
+        query = "SELECT start_time_local, activity_id, data FROM activities WHERE (start_time_local, activity_id) > (?, ?) AND start_time_local < ?"
+        if activity_type:
+            query += " AND activity_type = ?"
+        query += " ORDER BY start_time_local, activity_id LIMIT ?"
+        cursor = (start_date, -1)
+        while True:
+            params = [cursor[0], cursor[1], end_exclusive] + ([activity_type] if activity_type else []) + [batch_size]
+            with self._lock:
+                rows = self._conn.execute(query, params).fetchall()
+            for row in rows:
+                yield json.loads(row[2])
+            if len(rows) < batch_size:
+                return
+            cursor = (rows[-1][0], rows[-1][1])
+
+    def select(self, where: Optional[List[Tuple[str, str, Any]]] = None, order_by: Optional[str] = None,
+               descending: bool = False, limit: Optional[int] = None) -> List[ActivityRecord]:
+        """
+        Returns the activities matching all conditions, answered from the indexed columns.
+
+        Args:
+            where (List[Tuple[str, str, Any]], optional): (field, operator, value) conditions, with
+                fields from QUERY_FIELDS and operators from QUERY_OPERATORS. "in" takes a list.
+            order_by (str, optional): A field from QUERY_FIELDS. Activities without a value come last.
+                Defaults to the start time.
+            descending (bool, optional): Sort in descending order. Defaults to False.
+            limit (int, optional): The maximum number of activities to return.
+
+        Returns:
+            List[ActivityRecord]: The matching activity summaries as compact records.
+
+        Raises:
+            ValueError: If a field or operator is unknown.
+        """
+        clauses, params = [], []
+        for field, operator, value in where or []:
+            if field not in QUERY_FIELDS or operator not in QUERY_OPERATORS:
+                raise ValueError(f"Unsupported condition: {field} {operator} {value!r}.")
+            if operator == "in":
+                values = list(value)
+                clauses.append(f"{QUERY_FIELDS[field]} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+            else:
+                clauses.append(f"{QUERY_FIELDS[field]} {operator} ?")
+                params.append(value)
+        order_by = order_by or "start"
+        if order_by not in QUERY_FIELDS:
+            raise ValueError(f"Cannot sort by {order_by}, expected one of {', '.join(QUERY_FIELDS)}.")
+        direction = "DESC" if descending else "ASC"
+        query = "SELECT data FROM activities"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        # Written so that SQLite can walk the index of the sort field instead of sorting.
+        query += f" ORDER BY {QUERY_FIELDS[order_by]} {direction} NULLS LAST, activity_id {direction}"
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [ActivityRecord.from_json(row[0]) for row in rows]
+
+    def activity_types(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT DISTINCT activity_type FROM activities WHERE activity_type IS NOT NULL ORDER BY activity_type")]
+
+    def ids_between(self, start_date: str, end_date: str) -> set:
+        end_exclusive = (datetime.date.fromisoformat(end_date) + datetime.timedelta(days=1)).isoformat()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT activity_id FROM activities WHERE start_time_local >= ? AND start_time_local < ?",
+                (start_date, end_exclusive),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def get_state(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_state(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+            self._conn.commit()
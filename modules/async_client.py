@@ -0,0 +1,248 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from modules.cache import CachedGarminApi, ResponseCache
+from modules.metrics import metrics
+from modules.rate_limit import RateLimiter, path_family, shared_limiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://connectapi.garmin.com"
+# Same default as the synchronous session, read here so importing this module does not load requests.
+DEFAULT_POOL_SIZE = int(os.getenv("GARMIN_POOL_SIZE") or 16)
+
+
+class AsyncGarminConnectClient:
+    """
+    An asyncio client for the Garmin Connect API.
+
+    Many requests can be in flight on one event loop thread. The client reuses the login of a
+    synchronous `GarminConnectClient`: OAuth tokens and the display name are read from its API
+    object, responses go through the same `ResponseCache` (entries are shared with the
+    synchronous API) and requests are paced by the same rate limiter.
+
+    Args:
+        api (CachedGarminApi): The logged in synchronous API, usually `GarminConnectClient.api`.
+        base_url (str, optional): The Connect API root. Defaults to the Garmin Connect API host,
+            point it to a local server to run against recorded responses.
+        max_connections (int, optional): The size of the connection pool. Defaults to GARMIN_POOL_SIZE or 16.
+        limiter (RateLimiter, optional): The rate limiter. Defaults to the process-wide limiter.
+        timeout (float, optional): The total timeout of a request in seconds. Defaults to 30.
+        cache_writes (bool, optional): Whether fetched responses are added to the response cache.
+            Cached entries are still read when False. Defaults to True.
+    Attributes:
+        sync_api: The synchronous API, used by plugins without a native async implementation.
+    """
+
+    def __init__(self, api, base_url: Optional[str] = None, max_connections: int = DEFAULT_POOL_SIZE,
+                 limiter: Optional[RateLimiter] = None, timeout: float = 30.0, cache_writes: bool = True):
+        self.sync_api = api
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
+        self.max_connections = max_connections
+        self.limiter = limiter or shared_limiter()
+        self.timeout = timeout
+        self.cache_writes = cache_writes
+        self._session = None
+        self._refresh_lock = None
+
+    @property
+    def garth(self):
+        return self.sync_api.garth
+
+    @property
+    def display_name(self) -> str:
+        return self.sync_api.display_name
+
+    async def __aenter__(self) -> "AsyncGarminConnectClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _get_session(self):
+        # Deferred so that the synchronous code paths never import aiohttp.
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            headers = {key: value for key, value in self.garth.sess.headers.items() if key.lower() == "user-agent"}
+            self._session = aiohttp.ClientSession(connector=connector, headers=headers,
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._refresh_lock = asyncio.Lock()
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _authorization(self) -> str:
+        garth = self.garth
+        if not garth.oauth2_token or garth.oauth2_token.expired:
+            async with self._refresh_lock:
+                if not garth.oauth2_token or garth.oauth2_token.expired:
+                    # The OAuth exchange is rare and synchronous, keep it off the event loop.
+                    await asyncio.get_running_loop().run_in_executor(None, garth.refresh_oauth2)
+        return str(garth.oauth2_token)
+
+    async def connectapi(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Sends a GET request to a Connect API path and returns the decoded JSON.
+
+        Requests wait for a token of their endpoint family. Throttled and transient responses are
+        retried after the delay the rate limiter decides on.
+
+        Args:
+            path (str): The API path, e.g. "/hrv-service/hrv/2024-05-01".
+            params (Dict[str, Any], optional): Query parameters.
+
+        Returns:
+            Any: The response JSON, or None for empty responses.
+
+        Raises:
+            aiohttp.ClientResponseError: If the final response has an error status.
+        """
+        session = self._get_session()
+        family = path_family(path)
+        url = self.base_url + path
+        registry = metrics()
+        attempt = 0
+        while True:
+            await self.limiter.before_request_async(family)
+            headers = {"Authorization": await self._authorization()}
+            start = time.perf_counter()
+            async with session.get(url, params=params, headers=headers) as response:
+                body = await response.read()
+                registry.observe("http_request", time.perf_counter() - start, family=family)
+                registry.increment("http_requests", family=family, status=response.status)
+                registry.increment("http_response_bytes", len(body), family=family)
+                delay = self.limiter.retry_delay(family, attempt, response.status, response.headers.get("Retry-After"))
+                if delay is None:
+                    response.raise_for_status()
+                    if response.status == 204 or not body:
+                        return None
+                    with registry.timer("json_decode", family=family):
+                        return json.loads(body)
+            registry.increment("http_retries", family=family, status=response.status)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _cached(self, method: str, args: tuple, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Answers a call from the response cache of the synchronous API, or fetches and stores it.
+
+        `method` and `args` mirror the synchronous `Garmin` call so both clients share cache entries.
+
+        Args:
+            method (str): The name of the equivalent `Garmin` method.
+            args (tuple): The arguments of the equivalent call.
+            fetch (Callable): Returns the coroutine that fetches the response.
+        """
+        api = self.sync_api
+        registry = metrics()
+        if not isinstance(api, CachedGarminApi) or api.bypass:
+            with registry.timer("api_call", method=method, cache="bypass"):
+                return await fetch()
+        start = time.perf_counter()
+        key = ResponseCache.make_key(method, args, {})
+        if not api.refresh:
+            hit, value = api.cache.get(key)
+            if hit:
+                logger.debug(f"Cache hit for {method}.")
+                registry.increment("api_cache_hits", method=method)
+                registry.observe("api_call", time.perf_counter() - start, method=method, cache="hit")
+                return value
+        registry.increment("api_cache_misses", method=method)
+        with registry.timer("api_call", method=method, cache="miss"):
+            value = await fetch()
+        if self.cache_writes:
+            api.cache.put(key, method, value, api.ttl_for(args, {}))
+        return value
+
+    async def _user_summary(self, cdate: str) -> Dict[str, Any]:
+        from garminconnect import GarminConnectAuthenticationError
+
+        path = f"/usersummary-service/usersummary/daily/{self.display_name}"
+        summary = await self.connectapi(path, {"calendarDate": str(cdate)})
+        if summary and summary.get("privacyProtected") is True:
+            raise GarminConnectAuthenticationError("Authentication error")
+        return summary
+
+    async def get_user_summary(self, cdate: str) -> Dict[str, Any]:
+        return await self._cached("get_user_summary", (cdate,), lambda: self._user_summary(cdate))
+
+    async def get_stats(self, cdate: str) -> Dict[str, Any]:
+        return await self._cached("get_stats", (cdate,), lambda: self._user_summary(cdate))
+
+    async def get_hrv_data(self, cdate: str) -> Dict[str, Any]:
+        return await self._cached("get_hrv_data", (cdate,), lambda: self.connectapi(f"/hrv-service/hrv/{cdate}"))
+
+    async def get_body_composition(self, startdate: str, enddate: Optional[str] = None) -> Dict[str, Any]:
+        args = (startdate,) if enddate is None else (startdate, enddate)
+        params = {"startDate": str(startdate), "endDate": str(enddate or startdate)}
+        return await self._cached("get_body_composition", args,
+                                  lambda: self.connectapi("/weight-service/weight/dateRange", params))
+
+    async def get_activities(self, start: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+        params = {"start": str(start), "limit": str(limit)}
+        return await self.connectapi("/activitylist-service/activities/search/activities", params)
+
+    async def get_activities_by_date(self, startdate: str, enddate: str,
+                                     activitytype: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Fetches the activities between two dates, paging like the synchronous API.
+
+        Pages depend on each other, so they are requested in order. Split long ranges into
+        windows and gather them to fetch concurrently.
+        """
+        params = {"startDate": str(startdate), "endDate": str(enddate), "limit": "20"}
+        if activitytype:
+            params["activityType"] = str(activitytype)
+
+        async def fetch():
+            activities, start = [], 0
+            while True:
+                page = await self.connectapi("/activitylist-service/activities/search/activities",
+                                             {**params, "start": str(start)})
+                if not page:
+                    return activities
+                activities.extend(page)
+                start += 20
+
+        args = (startdate, enddate) if activitytype is None else (startdate, enddate, activitytype)
+        return await self._cached("get_activities_by_date", args, fetch)
+
+
+class BackgroundLoop:
+    """
+    An asyncio event loop running in a daemon thread.
+
+    Coroutines submitted from other threads return `concurrent.futures.Future` objects, so the
+    synchronous menu can wait on them with `as_completed` and keep rendering on the main thread
+    while requests stay in flight.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="garmin-async", daemon=True)
+        self._thread.start()
+
+    def submit(self, coro: Awaitable) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable) -> Any:
+        """
+        Runs a coroutine on the loop and blocks until it returns.
+        """
+        return self.submit(coro).result()
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        self.loop.close()
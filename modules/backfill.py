@@ -0,0 +1,190 @@
+import asyncio
+import datetime
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from modules.async_client import AsyncGarminConnectClient
+from modules.rate_limit import is_rate_limited
+from modules.wellness_store import WellnessStore
+
+logger = logging.getLogger(__name__)
+
+# Backfill endpoint names and the store cell each one fills. get_stats is an alias of
+# get_user_summary, so both share one cell and one request per day.
+ENDPOINTS = {
+    "stats": "summary",
+    "user_summary": "summary",
+    "hrv": "hrv",
+    "body_composition": "body_composition",
+}
+DEFAULT_CONCURRENCY = 8
+# Body composition is served by a date range endpoint, so one request covers a whole window.
+BODY_COMPOSITION_WINDOW_DAYS = 31
+FLUSH_EVERY = 50
+
+
+def days_between(start_date: str, end_date: str) -> List[str]:
+    """
+    Returns every day of an inclusive date range in YYYY-MM-DD format, oldest first.
+    """
+    start = datetime.date.fromisoformat(start_date)
+    end = datetime.date.fromisoformat(end_date)
+    if start > end:
+        start, end = end, start
+    return [(start + datetime.timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+def _windows(days: List[str], size: int) -> List[List[str]]:
+    """Groups sorted days into runs of consecutive days, at most `size` long."""
+    windows: List[List[str]] = []
+    previous = None
+    for day in days:
+        current = datetime.date.fromisoformat(day)
+        if windows and len(windows[-1]) < size and previous is not None and (current - previous).days == 1:
+            windows[-1].append(day)
+        else:
+            windows.append([day])
+        previous = current
+    return windows
+
+
+def _split_body_composition(days: List[str], response: Optional[Dict[str, Any]]) -> List[Tuple[str, str, Any]]:
+    by_day: Dict[str, List[Dict[str, Any]]] = {day: [] for day in days}
+    for entry in (response or {}).get("dateWeightList") or []:
+        if entry.get("calendarDate") in by_day:
+            by_day[entry["calendarDate"]].append(entry)
+    return [("body_composition", day, {"dateWeightList": entries}) for day, entries in by_day.items()]
+
+
+class WellnessBackfill:
+    """
+    Fills a `WellnessStore` with daily wellness data for a date range.
+
+    The range and endpoints form a grid of (cell, day) jobs. Cells already stored as final are
+    skipped, the rest are fetched concurrently with the async client, at most `concurrency`
+    at a time and paced by the shared rate limiter. Completed cells are written in small
+    batches as they arrive, so an interrupted run loses at most one batch and the next run
+    resumes with the cells still missing. Responses already in the response cache are reused;
+    new ones go to the wellness store only.
+
+    A run stops early when Garmin Connect keeps rate limiting after the client's retries;
+    running it again later continues where it stopped.
+
+    Args:
+        api (CachedGarminApi): The logged in synchronous API, whose login the async client reuses.
+        store (WellnessStore, optional): The store to fill. The default store is opened if None.
+        concurrency (int, optional): The maximum number of requests in flight. Defaults to 8.
+    """
+
+    def __init__(self, api, store: Optional[WellnessStore] = None, concurrency: int = DEFAULT_CONCURRENCY):
+        self.api = api
+        self.store = store or WellnessStore()
+        self.concurrency = max(1, concurrency)
+
+    def plan(self, start_date: str, end_date: str, endpoints: List[str]) -> Dict[str, List[str]]:
+        """
+        Returns the days still missing per store cell.
+
+        Args:
+            start_date (str): The first day (YYYY-MM-DD).
+            end_date (str): The last day (YYYY-MM-DD).
+            endpoints (List[str]): Names from ENDPOINTS.
+
+        Raises:
+            ValueError: If an endpoint name is unknown.
+        """
+        unknown = [name for name in endpoints if name not in ENDPOINTS]
+        if unknown:
+            raise ValueError(f"Unknown endpoints: {', '.join(unknown)}. Choose from {', '.join(ENDPOINTS)}.")
+        today = datetime.date.today().isoformat()
+        days = [day for day in days_between(start_date, end_date) if day <= today]
+        cells = dict.fromkeys(ENDPOINTS[name] for name in endpoints)
+        return {cell: self.store.missing(cell, days) for cell in cells}
+
+    def _jobs(self, client: AsyncGarminConnectClient, missing: Dict[str, List[str]]) -> List[Tuple[int, Callable[[], Awaitable[list]]]]:
+        jobs = []
+        for cell, days in missing.items():
+            if cell == "body_composition":
+                for window in _windows(days, BODY_COMPOSITION_WINDOW_DAYS):
+                    async def fetch(window=window):
+                        return _split_body_composition(window, await client.get_body_composition(window[0], window[-1]))
+                    jobs.append((len(window), fetch))
+                continue
+            method = client.get_user_summary if cell == "summary" else client.get_hrv_data
+            for day in days:
+                async def fetch(cell=cell, day=day, method=method):
+                    return [(cell, day, await method(day))]
+                jobs.append((1, fetch))
+        return jobs
+
+    async def run_async(self, client: AsyncGarminConnectClient, start_date: str, end_date: str, endpoints: List[str],
+                        on_progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """
+        Runs the backfill on the current event loop with the given client. See `run`.
+        """
+        missing = self.plan(start_date, end_date, endpoints)
+        total_cells = sum(len(days) for days in missing.values())
+        summary = {"start_date": start_date, "end_date": end_date, "endpoints": list(endpoints),
+                   "missing": total_cells, "stored": 0, "failed": 0, "rate_limited": False}
+        jobs = self._jobs(client, missing)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_job(size, fetch):
+            async with semaphore:
+                try:
+                    return size, await fetch(), None
+                except Exception as err:
+                    return size, None, err
+
+        tasks = [asyncio.ensure_future(run_job(size, fetch)) for size, fetch in jobs]
+        pending_cells: List[Tuple[str, str, Any]] = []
+        done = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                size, cells, err = await next_done
+                done += size
+                if err is not None:
+                    summary["failed"] += size
+                    if is_rate_limited(err):
+                        summary["rate_limited"] = True
+                        logger.warning("Garmin Connect keeps rate limiting, stopping the backfill. Run it again later to resume.")
+                        break
+                    logger.warning(f"Backfill request failed: {err}")
+                else:
+                    pending_cells.extend(cells)
+                    if len(pending_cells) >= FLUSH_EVERY:
+                        summary["stored"] += self.store.put_many(pending_cells)
+                        pending_cells = []
+                if on_progress:
+                    on_progress(done, total_cells)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if pending_cells:
+                summary["stored"] += self.store.put_many(pending_cells)
+        logger.info(f"Backfill stored {summary['stored']} of {total_cells} missing cells, {summary['failed']} failed.")
+        return summary
+
+    def run(self, start_date: str, end_date: str, endpoints: Optional[List[str]] = None,
+            on_progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """
+        Backfills the endpoints for a date range, blocking until done.
+
+        Args:
+            start_date (str): The first day (YYYY-MM-DD).
+            end_date (str): The last day (YYYY-MM-DD). Future days are ignored.
+            endpoints (List[str], optional): Names from ENDPOINTS. All endpoints if None.
+            on_progress (Callable, optional): Called with (cells done, cells missing) after every request.
+
+        Returns:
+            Dict[str, Any]: Counts of "missing", "stored" and "failed" cells and whether the run
+                stopped because of rate limiting.
+        """
+        endpoints = list(endpoints or ENDPOINTS)
+
+        async def main():
+            async with AsyncGarminConnectClient(self.api, cache_writes=False) as client:
+                return await self.run_async(client, start_date, end_date, endpoints, on_progress)
+
+        return asyncio.run(main())
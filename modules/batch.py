@@ -0,0 +1,87 @@
+import datetime
+import inspect
+import json
+import logging
+from typing import Any, Dict, IO, List
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    to_dict = getattr(value, "to_dict", None)
+    if callable(to_dict):
+        return to_dict()
+    tolist = getattr(value, "tolist", None)
+    if callable(tolist):
+        return tolist()
+    return str(value)
+
+
+def write_ndjson(record: Dict[str, Any], out: IO[str]) -> None:
+    """
+    Writes one record as a single line of JSON.
+
+    Args:
+        record (Dict[str, Any]): The record to write.
+        out (IO[str]): The output stream.
+    """
+    out.write(json.dumps(record, default=_json_default, separators=(",", ":")))
+    out.write("\n")
+
+
+def plugin_params(plugin, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Selects the parameters a plugin's `fetch` accepts.
+
+    Args:
+        plugin: The plugin (or lazy plugin) to run.
+        params (Dict[str, Any]): All parameters given on the command line, None values are ignored.
+
+    Returns:
+        Dict[str, Any]: The keyword arguments to pass to the plugin.
+    """
+    accepted = inspect.signature(plugin.fetch).parameters
+    return {key: value for key, value in params.items() if key in accepted and value is not None}
+
+
+def run_batch(api, plugins: Dict[str, Any], keys: List[str], params: Dict[str, Any], out: IO[str]) -> Dict[str, int]:
+    """
+    Runs plugins headlessly and streams their results as NDJSON.
+
+    Every record is written as soon as the plugin yields it, as
+    `{"plugin": <command key>, "record": <data>}`. A plugin that fails produces a single
+    `{"plugin": <command key>, "error": <message>}` line and the remaining plugins still run.
+
+    Args:
+        api: The logged in Garmin API object.
+        plugins (Dict[str, Any]): Plugins keyed by command key.
+        keys (List[str]): The command keys to run, in order.
+        params (Dict[str, Any]): Parameters for the plugins, each plugin receives those its `fetch` accepts.
+        out (IO[str]): The output stream.
+
+    Returns:
+        Dict[str, int]: The number of records written per command key.
+    """
+    counts = {}
+    for key in keys:
+        plugin = plugins.get(key)
+        if plugin is None:
+            write_ndjson({"plugin": key, "error": f"Command '{key}' not found."}, out)
+            continue
+        if not plugin.supports_fetch:
+            write_ndjson({"plugin": key, "error": f"Plugin '{key}' does not support headless execution."}, out)
+            continue
+        counts[key] = 0
+        try:
+            for record in plugin.iter_records(api, **plugin_params(plugin, params)):
+                write_ndjson({"plugin": key, "record": record}, out)
+                counts[key] += 1
+        except Exception as err:
+            logger.error(f"Plugin '{key}' failed: {err}")
+            write_ndjson({"plugin": key, "error": str(err)}, out)
+        out.flush()
+    return counts
@@ -0,0 +1,311 @@
+import datetime
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Tuple
+
+from modules.metrics import metrics
+from modules.paths import data_path
+
+logger = logging.getLogger(__name__)
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+class ResponseCache:
+    """
+    A persistent SQLite store for Garmin Connect API responses.
+
+    Entries are keyed on the API method name plus its arguments. Each entry carries an
+    optional expiry time and a last access time, and the store is kept under a size budget
+    by evicting the least recently used entries.
+
+    Args:
+        path (str, optional): The SQLite database file. Defaults to `cache.sqlite` in the data directory.
+        max_bytes (int, optional): The maximum total size of cached payloads. Defaults to 256 MB.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path or os.getenv("GARMINCACHE") or data_path("cache.sqlite")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " method TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " expires_at REAL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(method: str, args: tuple, kwargs: dict) -> str:
+        """
+        Builds a stable cache key from a method name and its call arguments.
+
+        Args:
+            method (str): The API method name.
+            args (tuple): Positional arguments of the call.
+            kwargs (dict): Keyword arguments of the call.
+
+        Returns:
+            str: The cache key.
+        """
+        return json.dumps([method, list(args), sorted(kwargs.items())], default=str, separators=(",", ":"))
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Looks up a cached response.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            tuple: (hit, value). `hit` is False when the key is missing or expired.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return False, None
+            value, expires_at = row
+            if expires_at is not None and expires_at < now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return False, None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return True, json.loads(value)
+
+    def put(self, key: str, method: str, value: Any, ttl: Optional[float]) -> None:
+        """
+        Stores a response and evicts least recently used entries if the size budget is exceeded.
+
+        Args:
+            key (str): The cache key.
+            method (str): The API method name, stored for inspection and selective invalidation.
+            value (Any): A JSON serializable response.
+            ttl (float, optional): Seconds until the entry expires. None means it never expires.
+        """
+        try:
+            payload = json.dumps(value, separators=(",", ":"))
+        except (TypeError, ValueError):
+            logger.debug(f"Response of {method} is not JSON serializable, not caching it.")
+            return
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, method, value, size, created, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, method, payload, len(payload), now, expires_at, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        logger.debug(f"Evicted {len(evicted)} cached responses.")
+
+    def iter_method(self, method: str, first_arg: Any = None) -> Iterator[Tuple[list, Any]]:
+        """
+        Yields the stored responses of one API method, expired ones included.
+
+        Used to build views over data that was already fetched, without network calls.
+
+        Args:
+            method (str): The API method name.
+            first_arg (Any, optional): Only yield calls whose first positional argument equals this.
+
+        Yields:
+            tuple: (args, value) with the positional arguments of the call and the response.
+        """
+        query, params = "SELECT key, value FROM responses WHERE method = ?", [method]
+        if first_arg is not None:
+            # Keys are JSON `[method, [args...], ...]`, so a prefix match narrows the scan.
+            query += " AND substr(key, 1, ?) = ?"
+            prefix = json.dumps([method, [first_arg]], default=str, separators=(",", ":"))[:-2]
+            params += [len(prefix), prefix]
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        for key, value in rows:
+            args = json.loads(key)[1]
+            if first_arg is None or (args and args[0] == first_arg):
+                yield args, json.loads(value)
+
+    def stored_args(self, method: str) -> List[list]:
+        """
+        Returns the positional arguments of the stored calls of one API method, without loading the responses.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT key FROM responses WHERE method = ?", (method,)).fetchall()
+        return [json.loads(key)[1] for key, in rows]
+
+    def version(self, methods: List[str]) -> Tuple[int, float]:
+        """
+        Returns the number of stored responses of the given methods and the time of the newest one.
+
+        Lets derived data be recomputed only when the underlying responses changed.
+        """
+        marks = ",".join("?" * len(methods))
+        with self._lock:
+            count, newest = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(MAX(created), 0) FROM responses WHERE method IN ({marks})", methods
+            ).fetchone()
+        return count, newest
+
+    def invalidate(self, method: Optional[str] = None) -> None:
+        """
+        Removes cached responses.
+
+        Args:
+            method (str, optional): Only remove responses of this API method. Removes everything if None.
+        """
+        with self._lock:
+            if method is None:
+                self._conn.execute("DELETE FROM responses")
+            else:
+                self._conn.execute("DELETE FROM responses WHERE method = ?", (method,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedGarminApi:
+    """
+    A transparent caching proxy around the `Garmin` API object.
+
+    Calls to `get_*` methods are answered from a `ResponseCache` when possible. Every other
+    attribute is forwarded to the wrapped object unchanged, so plugins can use the proxy in
+    place of the `Garmin` object.
+
+    Expiry policy:
+        - Calls whose date arguments all lie in the past never expire, that data does not change.
+        - Calls touching today (or a future date) expire after `today_ttl` seconds.
+        - Calls without date arguments expire after `default_ttl` seconds.
+
+    The `GARMINCACHE_MODE` environment variable selects the initial mode: "on" (default),
+    "refresh" (always fetch and overwrite the cache) or "off" (bypass the cache entirely).
+
+    Args:
+        api (Garmin): The logged in Garmin API object.
+        cache (ResponseCache): The response store.
+        today_ttl (float, optional): TTL in seconds for responses covering today. Defaults to 300.
+        default_ttl (float, optional): TTL in seconds for responses without dates. Defaults to 900.
+    """
+
+    # Methods that only read attributes populated at login, caching them gains nothing.
+    UNCACHED = {"get_full_name", "get_unit_system"}
+
+    def __init__(self, api, cache: ResponseCache, today_ttl: float = 300, default_ttl: float = 900):
+        self._api = api
+        self._cache = cache
+        self.today_ttl = today_ttl
+        self.default_ttl = default_ttl
+        mode = (os.getenv("GARMINCACHE_MODE") or "on").lower()
+        self.bypass = mode == "off"
+        self.refresh = mode == "refresh"
+
+    @property
+    def cache(self) -> ResponseCache:
+        return self._cache
+
+    @property
+    def wrapped(self):
+        """The underlying `Garmin` object."""
+        return self._api
+
+    @contextmanager
+    def refreshing(self):
+        """
+        Context manager that forces network fetches and rewrites the cached entries.
+        """
+        previous = self.refresh
+        self.refresh = True
+        try:
+            yield self
+        finally:
+            self.refresh = previous
+
+    def ttl_for(self, args: tuple, kwargs: dict) -> Optional[float]:
+        """
+        Determines the time to live for a call based on its date arguments.
+
+        Args:
+            args (tuple): Positional arguments of the call.
+            kwargs (dict): Keyword arguments of the call.
+
+        Returns:
+            float: The TTL in seconds, or None if the response never expires.
+        """
+        today = datetime.date.today()
+        dates = []
+        for value in list(args) + list(kwargs.values()):
+            if isinstance(value, datetime.datetime):
+                dates.append(value.date())
+            elif isinstance(value, datetime.date):
+                dates.append(value)
+            elif isinstance(value, str) and _DATE_RE.match(value):
+                try:
+                    dates.append(datetime.date.fromisoformat(value))
+                except ValueError:
+                    pass
+        if not dates:
+            return self.default_ttl
+        if max(dates) >= today:
+            return self.today_ttl
+        return None
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._api, name)
+        if not callable(attr) or not name.startswith("get_") or name in self.UNCACHED:
+            return attr
+
+        def cached_call(*args, **kwargs):
+            registry = metrics()
+            if self.bypass:
+                with registry.timer("api_call", method=name, cache="bypass"):
+                    return attr(*args, **kwargs)
+            start = time.perf_counter()
+            key = ResponseCache.make_key(name, args, kwargs)
+            if not self.refresh:
+                hit, value = self._cache.get(key)
+                if hit:
+                    logger.debug(f"Cache hit for {name}.")
+                    registry.increment("api_cache_hits", method=name)
+                    registry.observe("api_call", time.perf_counter() - start, method=name, cache="hit")
+                    return value
+            registry.increment("api_cache_misses", method=name)
+            with registry.timer("api_call", method=name, cache="miss"):
+                value = attr(*args, **kwargs)
+            self._cache.put(key, name, value, self.ttl_for(args, kwargs))
+            return value
+
+        cached_call.__name__ = name
+        cached_call.__doc__ = attr.__doc__
+        return cached_call
+
+    def __dir__(self):
+        return dir(self._api)
@@ -1,84 +1,224 @@
-import requests
-from garth.exc import GarthHTTPError
-from garminconnect import (
-    Garmin,
-    GarminConnectAuthenticationError,
-)
-from rich.console import Console
-import os
-import logging
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-console = Console()
-
-class GarminConnectClient:
-    """
-    A client for interacting with the Garmin Connect API.
-    Args:
-        email (str): The email address associated with the Garmin Connect account.
-        password (str): The password for the Garmin Connect account.
-    Attributes:
-        email (str): The email address associated with the Garmin Connect account.
-        password (str): The password for the Garmin Connect account.
-        api (Garmin): The Garmin API client.
-        tokenstore (str): The path to the directory where login tokens are stored.
-    Methods:
-        login(): Logs in to Garmin Connect using token data or credentials.
-        logout(): Logs out of Garmin Connect and removes stored login tokens.
-    """
-    def __init__(self, email: str, password: str):
-        self.email = email
-        self.password = password
-        self.api = None
-        self.tokenstore = os.getenv("GARMINTOKENS") or "~/.garminconnect"
-
-    def login(self):
-        """
-        Logs in to Garmin Connect using token data or credentials.
-
-        Returns:
-            bool: True if login is successful, False otherwise.
-        """
-        try:
-            console.print(f"Trying to login to Garmin Connect using token data from directory '{self.tokenstore}'...\n")
-            self.api = Garmin()
-            self.api.login(self.tokenstore)
-        except (FileNotFoundError, GarthHTTPError, GarminConnectAuthenticationError):
-            console.print(f"Login tokens not present, logging in with credentials.\n")
-            try:
-                self.api = Garmin(email=self.email, password=self.password)
-                self.api.login()
-                self.api.garth.dump(self.tokenstore)
-                console.print(f"Oauth tokens stored in '{self.tokenstore}' directory for future use.\n")
-            except (FileNotFoundError, GarthHTTPError, GarminConnectAuthenticationError, requests.exceptions.HTTPError) as err:
-                logger.error(err)
-                return False
-        return True
-
-    def logout(self):
-        """
-        Logs out the user and removes stored login tokens.
-        This method removes any stored login tokens from the specified token directory.
-        It also calls the `logout` method of the API object to log out the user.
-        After calling this method, the API object is set to `None`.
-        Raises:
-            FileNotFoundError: If the token directory is not found.
-        """
-        # Rest of the code...
-
-        tokendir = os.path.expanduser(self.tokenstore)
-        console.print(f"Removing stored login tokens from: {tokendir}")
-        try:
-            for root, dirs, files in os.walk(tokendir, topdown=False):
-                for name in files:
-                    os.remove(os.path.join(root, name))
-                for name in dirs:
-                    os.rmdir(os.path.join(root, name))
-            console.print(f"Directory {tokendir} removed")
-            
-        except FileNotFoundError:
-            console.print(f"Directory not found: {tokendir}")
-        self.api = None
-
+from rich.console import Console
+from modules.cache import CachedGarminApi, ResponseCache
+from typing import Callable, Optional, Tuple
+import json
+import os
+import logging
+import threading
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+# Status messages go to stderr so they never mix with data written to stdout.
+console = Console(stderr=True)
+
+class GarminConnectClient:
+    """
+    A client for interacting with the Garmin Connect API.
+    Args:
+        email (str, optional): The email address associated with the Garmin Connect account.
+        password (str, optional): The password for the Garmin Connect account.
+        credentials_provider (Callable, optional): Returns (email, password) when a credential login
+            is needed and no credentials were given. Lets callers skip keyring lookups on token logins.
+    Attributes:
+        email (str): The email address associated with the Garmin Connect account.
+        password (str): The password for the Garmin Connect account.
+        api (CachedGarminApi): The Garmin API client, wrapped in a persistent response cache.
+        cache (ResponseCache): The on-disk response cache shared by all API calls.
+        tokenstore (str): The path to the directory where login tokens are stored.
+        TOKEN_MARGIN (int): Seconds of remaining OAuth2 validity below which tokens are not considered fresh.
+        REFRESH_AHEAD (int): Seconds before OAuth2 expiry at which tokens are refreshed in the background.
+    Methods:
+        login(): Logs in to Garmin Connect using token data or credentials.
+        logout(): Logs out of Garmin Connect and removes stored login tokens.
+        connection_stats(): Reports connection reuse of the shared, pooled HTTP session.
+    """
+    TOKEN_MARGIN = 60
+    REFRESH_AHEAD = 300
+    PROFILE_FILE = "profile.json"
+
+    def __init__(self, email: Optional[str] = None, password: Optional[str] = None,
+                 credentials_provider: Optional[Callable[[], Tuple[str, str]]] = None):
+        self.email = email
+        self.password = password
+        self.credentials_provider = credentials_provider
+        self.api = None
+        self.cache = None
+        self.tokenstore = os.getenv("GARMINTOKENS") or "~/.garminconnect"
+        self._refresh_timer = None
+
+    def _token_expiry(self) -> Optional[float]:
+        """
+        Reads the OAuth2 expiry time from the token store without any network access.
+
+        Returns:
+            float: The expiry as a Unix timestamp, or None if no usable tokens are stored.
+        """
+        tokendir = os.path.expanduser(self.tokenstore)
+        try:
+            if not os.path.exists(os.path.join(tokendir, "oauth1_token.json")):
+                return None
+            with open(os.path.join(tokendir, "oauth2_token.json")) as f:
+                return float(json.load(f)["expires_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _load_profile(self) -> Optional[dict]:
+        try:
+            with open(os.path.join(os.path.expanduser(self.tokenstore), self.PROFILE_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_profile(self, api) -> None:
+        profile = {"display_name": api.display_name, "full_name": api.full_name, "unit_system": api.unit_system}
+        try:
+            with open(os.path.join(os.path.expanduser(self.tokenstore), self.PROFILE_FILE), "w") as f:
+                json.dump(profile, f)
+        except OSError as err:
+            logger.warning(f"Could not store profile data: {err}")
+
+    def _fast_login(self, garmin_class, attach_session):
+        """
+        Restores a session from fresh local tokens and the cached profile, without network calls.
+
+        Returns:
+            Garmin: The restored API object, or None if the tokens are not fresh or no profile is cached.
+        """
+        expires_at = self._token_expiry()
+        if expires_at is None or expires_at - time.time() < self.TOKEN_MARGIN:
+            return None
+        profile = self._load_profile()
+        if not profile:
+            return None
+        api = garmin_class()
+        attach_session(api)
+        api.garth.load(self.tokenstore)
+        api.display_name = profile.get("display_name")
+        api.full_name = profile.get("full_name")
+        api.unit_system = profile.get("unit_system")
+        return api
+
+    def _schedule_refresh(self) -> None:
+        """
+        Schedules a background OAuth2 refresh shortly before the current token expires.
+        """
+        self._cancel_refresh()
+        expires_at = self._token_expiry()
+        if expires_at is None:
+            return
+        delay = max(expires_at - time.time() - self.REFRESH_AHEAD, 0)
+        self._refresh_timer = threading.Timer(delay, self._refresh_tokens)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _cancel_refresh(self) -> None:
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
+    def _refresh_tokens(self) -> None:
+        api = self.api.wrapped if isinstance(self.api, CachedGarminApi) else self.api
+        if api is None:
+            return
+        try:
+            api.garth.refresh_oauth2()
+            api.garth.dump(self.tokenstore)
+            logger.debug("OAuth2 token refreshed in the background.")
+        except Exception as err:
+            logger.warning(f"Background token refresh failed: {err}")
+            return
+        self._schedule_refresh()
+
+    def login(self):
+        """
+        Logs in to Garmin Connect using token data or credentials.
+
+        When the stored OAuth2 token is still fresh and the profile is cached, the session is
+        restored locally without any request. Otherwise the tokens are validated against Garmin
+        Connect, falling back to a credential login. After login, tokens are refreshed in the
+        background shortly before they expire.
+
+        Returns:
+            bool: True if login is successful, False otherwise.
+        """
+        # Deferred so that startup and menu rendering do not pay for importing the API stack.
+        import requests
+        from garth.exc import GarthHTTPError
+        from garminconnect import (
+            Garmin,
+            GarminConnectAuthenticationError,
+        )
+        from modules.http_session import attach_shared_session
+
+        try:
+            self.api = self._fast_login(Garmin, attach_shared_session)
+        except Exception as err:
+            logger.debug(f"Local token restore failed: {err}")
+            self.api = None
+        if self.api is not None:
+            console.print(f"Restored Garmin Connect session from fresh tokens in '{self.tokenstore}'.\n")
+            return self._finish_login()
+
+        try:
+            console.print(f"Trying to login to Garmin Connect using token data from directory '{self.tokenstore}'...\n")
+            self.api = Garmin()
+            attach_shared_session(self.api)
+            self.api.login(self.tokenstore)
+        except (FileNotFoundError, GarthHTTPError, GarminConnectAuthenticationError):
+            console.print(f"Login tokens not present, logging in with credentials.\n")
+            if (not self.email or not self.password) and self.credentials_provider:
+                self.email, self.password = self.credentials_provider()
+            try:
+                self.api = Garmin(email=self.email, password=self.password)
+                attach_shared_session(self.api)
+                self.api.login()
+                self.api.garth.dump(self.tokenstore)
+                console.print(f"Oauth tokens stored in '{self.tokenstore}' directory for future use.\n")
+            except (FileNotFoundError, GarthHTTPError, GarminConnectAuthenticationError, requests.exceptions.HTTPError) as err:
+                logger.error(err)
+                self.api = None
+                return False
+        self._save_profile(self.api)
+        return self._finish_login()
+
+    def _finish_login(self) -> bool:
+        if self.cache is None:
+            self.cache = ResponseCache()
+        self.api = CachedGarminApi(self.api, self.cache)
+        self._schedule_refresh()
+        return True
+
+    def connection_stats(self):
+        """
+        Returns connection reuse statistics of the HTTP session shared by all API calls.
+
+        Returns:
+            dict: Counts of "requests", "connections" opened and "reused" connections.
+        """
+        from modules.http_session import connection_stats
+        return connection_stats()
+
+    def logout(self):
+        """
+        Logs out the user and removes stored login tokens.
+        This method removes any stored login tokens from the specified token directory.
+        It also calls the `logout` method of the API object to log out the user.
+        After calling this method, the API object is set to `None`.
+        Raises:
+            FileNotFoundError: If the token directory is not found.
+        """
+        self._cancel_refresh()
+        tokendir = os.path.expanduser(self.tokenstore)
+        console.print(f"Removing stored login tokens from: {tokendir}")
+        try:
+            # Only the token files of this login, subdirectories may hold other accounts' tokens.
+            for entry in os.scandir(tokendir):
+                if entry.is_file():
+                    os.remove(entry.path)
+            console.print(f"Stored tokens in {tokendir} removed")
+        except FileNotFoundError:
+            console.print(f"Directory not found: {tokendir}")
+        self.api = None
+
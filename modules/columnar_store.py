@@ -0,0 +1,253 @@
+import contextlib
+import datetime
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from modules.paths import data_path
+
+try:
+    import fcntl
+except ImportError:  # Windows, stores are then only locked within one process.
+    fcntl = None
+
+# Column name -> (numpy dtype, activity summary field). Float columns use NaN for missing
+# values, integer columns use -1.
+COLUMNS = {
+    "activity_id": ("<i8", "activityId"),
+    "start_time_local": ("<i8", "startTimeLocal"),
+    "activity_type": ("<i4", "activityType"),
+    "distance": ("<f8", "distance"),
+    "duration": ("<f8", "duration"),
+    "moving_duration": ("<f8", "movingDuration"),
+    "elevation_gain": ("<f8", "elevationGain"),
+    "average_speed": ("<f8", "averageSpeed"),
+    "max_speed": ("<f8", "maxSpeed"),
+    "average_hr": ("<f8", "averageHR"),
+    "max_hr": ("<f8", "maxHR"),
+    "calories": ("<f8", "calories"),
+    "device_id": ("<i8", "deviceId"),
+}
+
+# One lock per store directory, shared by all instances in the process.
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+def _path_lock(path: str) -> threading.Lock:
+    key = os.path.realpath(path)
+    with _path_locks_guard:
+        return _path_locks.setdefault(key, threading.Lock())
+
+
+def _epoch_seconds(value: Optional[str]) -> int:
+    if not value:
+        return -1
+    try:
+        return int(datetime.datetime.fromisoformat(value).replace(tzinfo=datetime.timezone.utc).timestamp())
+    except ValueError:
+        return -1
+
+
+class ColumnarActivityStore:
+    """
+    An append-only columnar store of flattened activity summary fields.
+
+    Every column lives in its own raw little-endian file and is read back as a read-only
+    `numpy.memmap`, so scans only touch the columns they project and never build per-activity
+    dicts. A small `meta.json` holds the committed row count and the activity type dictionary;
+    it is written last on append, so an interrupted append leaves the store readable.
+
+    Instances may share a directory, also across processes: every operation takes a lock on
+    `meta.lock` (shared for reads, exclusive for writes) and reloads `meta.json` under it.
+    `rewrite` replaces the column files instead of truncating them, so arrays returned earlier
+    by `read` stay valid.
+
+    `start_time_local` holds the local start time as seconds since the epoch (naive local time
+    encoded as UTC), `activity_type` holds a code into `activity_types`.
+
+    Args:
+        path (str, optional): The store directory. Defaults to `columnar` in the data directory.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.dirname(data_path("columnar", "meta.json"))
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = _path_lock(self.path)
+        self._meta = self._load_meta()
+
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    @contextlib.contextmanager
+    def _locked(self, exclusive: bool):
+        """Holds the store lock and reloads the meta data, which other instances may have changed."""
+        with self._lock, open(os.path.join(self.path, "meta.lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._meta = self._load_meta()
+            yield
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _load_meta(self) -> Dict[str, Any]:
+        try:
+            with open(self._meta_path()) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"rows": 0, "activity_types": []}
+
+    def _save_meta(self) -> None:
+        tmp_path = self._meta_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._meta, f)
+        os.replace(tmp_path, self._meta_path())
+
+    def __len__(self) -> int:
+        with self._locked(False):
+            return self._meta["rows"]
+
+    @property
+    def generation(self) -> int:
+        """Incremented by every `rewrite`, so derived data can tell appends from replacements."""
+        with self._locked(False):
+            return self._meta.get("generation", 0)
+
+    @property
+    def activity_types(self) -> List[str]:
+        """The activity type dictionary, indexed by the codes in the `activity_type` column."""
+        with self._locked(False):
+            return list(self._meta["activity_types"])
+
+    def _type_code(self, type_key: Optional[str]) -> int:
+        if not type_key:
+            return -1
+        types = self._meta["activity_types"]
+        if type_key not in types:
+            types.append(type_key)
+        return types.index(type_key)
+
+    def _flatten(self, activities: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        columns = {}
+        for name, (dtype, field) in COLUMNS.items():
+            if name == "start_time_local":
+                values = [_epoch_seconds(a.get(field)) for a in activities]
+            elif name == "activity_type":
+                values = [self._type_code((a.get(field) or {}).get("typeKey")) for a in activities]
+            elif dtype.startswith("<f"):
+                values = [a.get(field) if a.get(field) is not None else np.nan for a in activities]
+            else:
+                values = [a.get(field) if a.get(field) is not None else -1 for a in activities]
+            columns[name] = np.asarray(values, dtype=dtype)
+        return columns
+
+    def append(self, activities: Iterable[Dict[str, Any]]) -> int:
+        """
+        Appends activities that are not stored yet.
+
+        Args:
+            activities (Iterable[Dict[str, Any]]): Activity summaries as returned by the API.
+
+        Returns:
+            int: The number of rows appended.
+        """
+        activities = [a for a in activities if a.get("activityId") is not None]
+        with self._locked(True):
+            rows = self._meta["rows"]
+            if rows:
+                known = set(self._read_column("activity_id").tolist())
+                activities = [a for a in activities if a["activityId"] not in known]
+            if not activities:
+                return 0
+            columns = self._flatten(activities)
+            for name, (dtype, _) in COLUMNS.items():
+                path = self._column_path(name)
+                with open(path, "ab") as f:
+                    # Drop bytes of an earlier append that never committed its row count.
+                    f.truncate(rows * np.dtype(dtype).itemsize)
+                    f.write(columns[name].tobytes())
+            self._meta["rows"] = rows + len(activities)
+            self._save_meta()
+        return len(activities)
+
+    def rewrite(self, activities: Iterable[Dict[str, Any]]) -> int:
+        """
+        Replaces the whole store, used after edits or deletions were reconciled.
+
+        Args:
+            activities (Iterable[Dict[str, Any]]): The complete set of activity summaries.
+
+        Returns:
+            int: The number of rows written.
+        """
+        activities = [a for a in activities if a.get("activityId") is not None]
+        with self._locked(True):
+            # An empty store first, so an interrupted rewrite never pairs old meta data with new columns.
+            self._meta = {"rows": 0, "activity_types": [], "generation": self._meta.get("generation", 0) + 1}
+            self._save_meta()
+            columns = self._flatten(activities)
+            for name in COLUMNS:
+                # Replaced rather than truncated, memory maps of the old file stay readable.
+                tmp_path = self._column_path(name) + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(columns[name].tobytes())
+                os.replace(tmp_path, self._column_path(name))
+            self._meta["rows"] = len(activities)
+            self._save_meta()
+        return len(activities)
+
+    def _read_column(self, name: str) -> np.ndarray:
+        dtype = COLUMNS[name][0]
+        rows = self._meta["rows"]
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._column_path(name), dtype=dtype, mode="r", shape=(rows,))
+
+    def read(self, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Returns memory-mapped column arrays.
+
+        Args:
+            columns (List[str], optional): The columns to project. All columns if None.
+
+        Returns:
+            Dict[str, np.ndarray]: Read-only arrays of equal length, keyed by column name.
+        """
+        columns = columns or list(COLUMNS)
+        unknown = set(columns) - set(COLUMNS)
+        if unknown:
+            raise KeyError(f"Unknown columns: {', '.join(sorted(unknown))}")
+        with self._locked(False):
+            return {name: self._read_column(name) for name in columns}
+
+    def to_frame(self, columns: Optional[List[str]] = None):
+        """
+        Returns the projected columns as a pandas DataFrame.
+
+        `start_time_local` is converted to datetime64 and `activity_type` to a categorical of
+        type keys. Other columns are wrapped without copying where pandas allows it.
+
+        Args:
+            columns (List[str], optional): The columns to project. All columns if None.
+
+        Returns:
+            pandas.DataFrame: One row per activity.
+        """
+        import pandas as pd
+
+        arrays = self.read(columns)
+        frame = {}
+        for name, values in arrays.items():
+            if name == "start_time_local":
+                times = np.asarray(values).astype("datetime64[s]")
+                times[np.asarray(values) < 0] = np.datetime64("NaT")
+                frame[name] = times
+            elif name == "activity_type":
+                frame[name] = pd.Categorical.from_codes(np.asarray(values), categories=self.activity_types)
+            else:
+                frame[name] = values
+        return pd.DataFrame(frame)
@@ -0,0 +1,333 @@
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from modules.cache import ResponseCache
+from modules.columnar_store import ColumnarActivityStore
+from modules.detail_decoder import DetailCache, decode_details
+from modules.downsample import lttb, window
+from modules.paths import data_path
+from modules.wellness_store import WellnessStore
+
+logger = logging.getLogger(__name__)
+
+# Points sent to the browser per trace. Zooming re-downsamples the visible range.
+MAX_POINTS = 2000
+DETAIL_METRICS = {
+    "directHeartRate": "Heart rate (bpm)",
+    "directSpeed": "Speed (m/s)",
+    "directElevation": "Elevation (m)",
+    "directPower": "Power (W)",
+    "directRunCadence": "Cadence (spm)",
+}
+WELLNESS_METHODS = ["get_stats", "get_user_summary", "get_hrv_data", "get_body_composition"]
+WELLNESS_SERIES = {
+    "steps": "Steps",
+    "resting_hr": "Resting heart rate (bpm)",
+    "stress": "Average stress",
+    "hrv": "HRV last night (ms)",
+    "weight": "Weight (kg)",
+}
+
+
+def _wellness_rows(cache: ResponseCache, store: WellnessStore) -> List[Tuple[str, str, float]]:
+    """
+    Extracts (date, series, value) rows from the backfilled wellness store and the cached wellness responses.
+    """
+    sources = [(cell, day, value) for cell in ("summary", "hrv", "body_composition")
+               for day, value in store.iter_endpoint(cell)]
+    for method, cell in (("get_stats", "summary"), ("get_user_summary", "summary"),
+                         ("get_hrv_data", "hrv"), ("get_body_composition", "body_composition")):
+        sources.extend((cell, str(args[0]), value) for args, value in cache.iter_method(method) if args)
+
+    rows = []
+    for cell, day, value in sources:
+        if not isinstance(value, dict):
+            continue
+        if cell == "summary":
+            for series, field in (("steps", "totalSteps"), ("resting_hr", "restingHeartRate"),
+                                  ("stress", "averageStressLevel")):
+                if value.get(field) is not None and value[field] >= 0:
+                    rows.append((day, series, float(value[field])))
+        elif cell == "hrv":
+            average = (value.get("hrvSummary") or {}).get("lastNightAvg")
+            if average is not None:
+                rows.append((day, "hrv", float(average)))
+        else:
+            for entry in value.get("dateWeightList") or []:
+                if entry.get("calendarDate") and entry.get("weight"):
+                    rows.append((entry["calendarDate"], "weight", entry["weight"] / 1000.0))
+    return rows
+
+
+class DashboardData:
+    """
+    The data behind the dashboard, computed from locally stored data only.
+
+    Aggregates (per-activity points, weekly and monthly volume per activity type, daily wellness
+    series) are computed with pandas group-bys and pickled to disk together with a fingerprint
+    of their sources. They are only recomputed when the columnar store, the wellness store or the
+    cached wellness responses change. Detail streams come from the DetailCache, or are decoded
+    from cached responses on first use, and are kept in a small LRU.
+
+    Args:
+        cache (ResponseCache, optional): The response cache. The default cache is opened if None.
+        columnar (ColumnarActivityStore, optional): The columnar store. The default store is opened if None.
+        path (str, optional): The aggregate file. Defaults to `dashboard/aggregates.pkl` in the data directory.
+    """
+
+    DETAIL_CACHE_SIZE = 8
+
+    def __init__(self, cache: Optional[ResponseCache] = None, columnar: Optional[ColumnarActivityStore] = None,
+                 path: Optional[str] = None):
+        self.cache = cache or ResponseCache()
+        self.columnar = columnar or ColumnarActivityStore()
+        self.path = path or data_path("dashboard", "aggregates.pkl")
+        self.details = DetailCache()
+        self.wellness = WellnessStore()
+        self._aggregates = None
+        self._details: "OrderedDict[int, Tuple[np.ndarray, Dict[str, np.ndarray]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _fingerprint(self) -> List[Any]:
+        meta = os.path.join(self.columnar.path, "meta.json")
+        mtime = os.path.getmtime(meta) if os.path.exists(meta) else 0
+        return [len(self.columnar), mtime, list(self.cache.version(WELLNESS_METHODS)), list(self.wellness.version())]
+
+    def aggregates(self) -> Dict[str, Any]:
+        """
+        Returns the precomputed aggregates, recomputing them if their sources changed.
+
+        Returns:
+            Dict[str, Any]: "activities", "volume_week", "volume_month" and "wellness" DataFrames.
+        """
+        with self._lock:
+            fingerprint = self._fingerprint()
+            if self._aggregates is not None and self._aggregates["fingerprint"] == fingerprint:
+                return self._aggregates
+            try:
+                with open(self.path, "rb") as f:
+                    stored = pickle.load(f)
+                if stored.get("fingerprint") == fingerprint:
+                    self._aggregates = stored
+                    return stored
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                pass
+            self._aggregates = self._compute(fingerprint)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(self._aggregates, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+            return self._aggregates
+
+    def _compute(self, fingerprint: List[Any]) -> Dict[str, Any]:
+        import pandas as pd
+
+        frame = self.columnar.to_frame(["activity_id", "start_time_local", "activity_type", "distance",
+                                        "duration", "elevation_gain", "calories"])
+        activities = pd.DataFrame({
+            "activity_id": np.asarray(frame["activity_id"]),
+            "start": frame["start_time_local"],
+            "type": frame["activity_type"].astype(str).replace("nan", "other"),
+            "distance_km": np.asarray(frame["distance"]) / 1000.0,
+            "duration_h": np.asarray(frame["duration"]) / 3600.0,
+            "elevation_m": np.asarray(frame["elevation_gain"]),
+            "calories": np.asarray(frame["calories"]),
+        }).dropna(subset=["start"]).sort_values("start")
+
+        volume = {}
+        for period, rule in (("week", "W-MON"), ("month", "MS")):
+            grouped = activities.groupby([pd.Grouper(key="start", freq=rule, label="left", closed="left"), "type"])
+            volume[period] = grouped.agg(distance_km=("distance_km", "sum"), duration_h=("duration_h", "sum"),
+                                         elevation_m=("elevation_m", "sum"), count=("activity_id", "size")).reset_index()
+
+        rows = _wellness_rows(self.cache, self.wellness)
+        if rows:
+            wellness = pd.DataFrame(rows, columns=["date", "series", "value"])
+            wellness["date"] = pd.to_datetime(wellness["date"], errors="coerce")
+            wellness = wellness.dropna().groupby(["date", "series"])["value"].mean().unstack("series").sort_index()
+        else:
+            wellness = pd.DataFrame(columns=list(WELLNESS_SERIES))
+
+        return {
+            "fingerprint": fingerprint,
+            "activities": activities,
+            "volume_week": volume["week"],
+            "volume_month": volume["month"],
+            "wellness": wellness,
+        }
+
+    def detail_activities(self) -> List[Tuple[int, str]]:
+        """
+        Returns (activity id, label) of the activities whose detail streams are stored locally.
+        """
+        ids = {int(args[0]) for args in self.cache.stored_args("get_activity_details") if args}
+        ids.update(self.details.activity_ids())
+        activities = self.aggregates()["activities"]
+        known = activities[activities["activity_id"].isin(ids)]
+        labels = {int(row.activity_id): f"{row.start:%Y-%m-%d %H:%M} {row.type} {row.distance_km:.1f} km"
+                  for row in known.itertuples()}
+        return sorted(((i, labels.get(i, str(i))) for i in ids), key=lambda item: item[1], reverse=True)
+
+    def detail_streams(self, activity_id: int) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Returns the full resolution detail streams of an activity, with datetime64 timestamps.
+        """
+        with self._lock:
+            if activity_id in self._details:
+                self._details.move_to_end(activity_id)
+                return self._details[activity_id]
+        decoded = self.details.get(activity_id)
+        if decoded is None:
+            best = None
+            for _, details in self.cache.iter_method("get_activity_details", first_arg=activity_id):
+                if details:
+                    if best is None or len(details.get("activityDetailMetrics") or []) > len(best.get("activityDetailMetrics") or []):
+                        best = details
+            if best is None:
+                raise KeyError(f"No details stored for activity {activity_id}.")
+            decoded = decode_details(best)
+            self.details.put(activity_id, decoded)
+        times = (decoded.timestamps * 1000).astype("datetime64[ms]")
+        streams = decoded.streams()
+        with self._lock:
+            self._details[activity_id] = (times, streams)
+            while len(self._details) > self.DETAIL_CACHE_SIZE:
+                self._details.popitem(last=False)
+        return times, streams
+
+
+def _figure_series(x, y, name: str, start=None, end=None, **trace) -> Dict[str, Any]:
+    xs, ys = window(x, y, start, end, MAX_POINTS) if (start is not None or end is not None) else lttb(x, y, MAX_POINTS)
+    return {"type": "scattergl", "mode": "lines", "name": name, "x": xs, "y": ys, **trace}
+
+
+def _relayout_range(relayout: Optional[Dict[str, Any]]):
+    if not relayout or "xaxis.range[0]" not in relayout:
+        return None, None
+    return np.datetime64(relayout["xaxis.range[0]"].replace(" ", "T")), np.datetime64(relayout["xaxis.range[1]"].replace(" ", "T"))
+
+
+def create_app(data: Optional[DashboardData] = None):
+    """
+    Builds the Dash app: activity history, training volume, wellness trends and activity details.
+
+    Returns:
+        dash.Dash: The app, not yet running.
+    """
+    # Deferred so that the terminal app never imports dash unless the dashboard is opened.
+    from dash import Dash, Input, Output, dcc, html
+
+    data = data or DashboardData()
+    app = Dash(__name__, title="Garmin Connect dashboard")
+
+    def graph(graph_id: str):
+        return dcc.Loading(dcc.Graph(id=graph_id, style={"height": "70vh"}))
+
+    app.layout = html.Div([
+        html.H2("Garmin Connect dashboard"),
+        dcc.Tabs([
+            dcc.Tab(label="Activities", children=[graph("activities")]),
+            dcc.Tab(label="Training volume", children=[
+                html.Div([
+                    dcc.RadioItems(id="volume-period", options=[{"label": "Weekly", "value": "week"},
+                                                                {"label": "Monthly", "value": "month"}],
+                                   value="week", inline=True),
+                    dcc.RadioItems(id="volume-metric", options=[{"label": "Distance (km)", "value": "distance_km"},
+                                                                {"label": "Duration (h)", "value": "duration_h"},
+                                                                {"label": "Elevation (m)", "value": "elevation_m"},
+                                                                {"label": "Activities", "value": "count"}],
+                                   value="distance_km", inline=True),
+                ]),
+                graph("volume"),
+            ]),
+            dcc.Tab(label="Wellness", children=[
+                dcc.Dropdown(id="wellness-series", options=[{"label": label, "value": key}
+                                                            for key, label in WELLNESS_SERIES.items()],
+                             value=["steps", "resting_hr"], multi=True),
+                graph("wellness"),
+            ]),
+            dcc.Tab(label="Activity detail", children=[
+                dcc.Dropdown(id="detail-activity", placeholder="Activities with locally stored details"),
+                dcc.Dropdown(id="detail-metrics", options=[{"label": label, "value": key}
+                                                           for key, label in DETAIL_METRICS.items()],
+                             value=["directHeartRate"], multi=True),
+                graph("detail"),
+            ]),
+        ]),
+    ], style={"fontFamily": "sans-serif", "margin": "1em"})
+
+    @app.callback(Output("activities", "figure"), Input("activities", "id"))
+    def activities_figure(_):
+        frame = data.aggregates()["activities"]
+        traces = [{"type": "scattergl", "mode": "markers", "name": activity_type, "x": group["start"],
+                   "y": group["distance_km"], "customdata": group[["duration_h", "elevation_m"]].values,
+                   "hovertemplate": "%{x}<br>%{y:.1f} km, %{customdata[0]:.2f} h, %{customdata[1]:.0f} m"}
+                  for activity_type, group in frame.groupby("type")]
+        return {"data": traces, "layout": {"yaxis": {"title": "Distance (km)"}, "legend": {"orientation": "h"}}}
+
+    @app.callback(Output("volume", "figure"), Input("volume-period", "value"), Input("volume-metric", "value"))
+    def volume_figure(period, metric):
+        frame = data.aggregates()[f"volume_{period}"]
+        traces = [{"type": "bar", "name": activity_type, "x": group["start"], "y": group[metric]}
+                  for activity_type, group in frame.groupby("type")]
+        return {"data": traces, "layout": {"barmode": "stack", "legend": {"orientation": "h"}}}
+
+    @app.callback(Output("wellness", "figure"), Input("wellness-series", "value"), Input("wellness", "relayoutData"))
+    def wellness_figure(series, relayout):
+        frame = data.aggregates()["wellness"]
+        start, end = _relayout_range(relayout)
+        x = frame.index.values
+        traces = [_figure_series(x, frame[key].values, WELLNESS_SERIES[key], start, end, yaxis=f"y{i + 1}")
+                  for i, key in enumerate(series or []) if key in frame]
+        layout = {"uirevision": "wellness", "legend": {"orientation": "h"}}
+        for i in range(len(traces)):
+            layout["yaxis" if i == 0 else f"yaxis{i + 1}"] = {"overlaying": "y", "side": "right"} if i else {}
+        return {"data": traces, "layout": layout}
+
+    @app.callback(Output("detail-activity", "options"), Input("detail-activity", "id"))
+    def detail_options(_):
+        return [{"label": label, "value": activity_id} for activity_id, label in data.detail_activities()]
+
+    @app.callback(Output("detail", "figure"), Input("detail-activity", "value"), Input("detail-metrics", "value"),
+                  Input("detail", "relayoutData"))
+    def detail_figure(activity_id, metrics, relayout):
+        if activity_id is None:
+            return {"data": [], "layout": {"title": "Select an activity"}}
+        times, streams = data.detail_streams(int(activity_id))
+        start, end = _relayout_range(relayout)
+        traces = [_figure_series(times, streams[key], DETAIL_METRICS[key], start, end, yaxis=f"y{i + 1}")
+                  for i, key in enumerate(metrics or []) if key in streams]
+        layout = {"uirevision": activity_id, "legend": {"orientation": "h"}}
+        for i in range(1, len(traces)):
+            layout[f"yaxis{i + 1}"] = {"overlaying": "y", "side": "right"}
+        return {"data": traces, "layout": layout}
+
+    return app
+
+
+_server_lock = threading.Lock()
+_server_thread: Optional[threading.Thread] = None
+
+
+def serve_in_background(port: int = 8050, data: Optional[DashboardData] = None) -> str:
+    """
+    Starts the dashboard in a daemon thread, once per process.
+
+    Returns:
+        str: The URL of the dashboard.
+    """
+    global _server_thread
+    url = f"http://127.0.0.1:{port}/"
+    with _server_lock:
+        if _server_thread is None or not _server_thread.is_alive():
+            app = create_app(data)
+            _server_thread = threading.Thread(target=app.run, kwargs={"port": port, "debug": False},
+                                              name="garmin-dashboard", daemon=True)
+            _server_thread.start()
+    return url
@@ -1,129 +1,258 @@
-from typing import List, Dict, Any
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.text import Text
-from rich.tree import Tree
-from rich.syntax import Syntax
-import json
-
-class DataViewer:
-    """
-    A class to visualize activity data using the rich library.
-
-    Attributes:
-        data (List[Dict[str, Any]]): A list of dictionaries containing activity data.
-        console (Console): An instance of rich.console.Console for rendering output.
-    """
-
-    def __init__(self, data: List[Dict[str, Any]]):
-        """
-        Initializes the DataViewer with activity data.
-
-        Args:
-            data (List[Dict[str, Any]]): A list of dictionaries containing activity data.
-        """
-        self.data = data
-        self.console = Console()
-
-    def view_data(self) -> None:
-        """
-        Displays the activity data in a formatted manner using rich library components.
-        """
-        for i, activity in enumerate(self.data, 1):
-            self.console.print(Panel(f"[bold cyan]Activity {i}[/bold cyan]", expand=False))
-            
-            # Create a table for basic activity info
-            table = Table(title="Activity Summary")
-            table.add_column("Attribute", style="cyan")
-            table.add_column("Value", style="magenta")
-            
-            basic_info = [
-                ("Activity Name", activity.get('activityName', 'N/A')),
-                ("Activity Type", activity.get('activityType', {}).get('typeKey', 'N/A')),
-                ("Start Time", activity.get('startTimeLocal', 'N/A')),
-                ("Duration", f"{activity.get('duration', 0) / 60:.2f} minutes"),
-                ("Distance", f"{activity.get('distance', 0) / 1000:.2f} km"),
-                ("Average Speed", f"{activity.get('averageSpeed', 0) * 3.6:.2f} km/h"),
-            ]
-            
-            for attr, value in basic_info:
-                table.add_row(attr, str(value))
-            
-            self.console.print(table)
-            
-            # Create a tree for detailed data
-            tree = Tree("[bold green]Detailed Data[/bold green]")
-            self._add_dict_to_tree(activity, tree)
-            
-            self.console.print(tree)
-            self.console.print("\n" + "="*50 + "\n")
-
-    def _add_dict_to_tree(self, data: Dict[str, Any], tree: Tree, max_depth: int = 2, current_depth: int = 0):
-        """
-        Recursively adds dictionary data to a rich.tree.Tree object.
-
-        Args:
-            data (Dict[str, Any]): The dictionary data to add to the tree.
-            tree (Tree): The rich.tree.Tree object to add data to.
-            max_depth (int, optional): The maximum depth to traverse in the dictionary. Defaults to 2.
-            current_depth (int, optional): The current depth in the dictionary traversal. Defaults to 0.
-        """
-        if current_depth >= max_depth:
-            return
-
-        for key, value in data.items():
-            if isinstance(value, dict):
-                branch = tree.add(f"[bold blue]{key}[/bold blue]")
-                self._add_dict_to_tree(value, branch, max_depth, current_depth + 1)
-            elif isinstance(value, list):
-                branch = tree.add(f"[bold blue]{key}[/bold blue] (list with {len(value)} items)")
-                if len(value) > 0 and isinstance(value[0], dict):
-                    self._add_dict_to_tree(value[0], branch, max_depth, current_depth + 1)
-            else:
-                tree.add(Text(f"{key}: ", "yellow") + Text(str(value), "green"))
-
-    @staticmethod
-    def display_rich_output(api_call: str, output: Any) -> None:
-        """
-        Displays the output of an API call in a formatted manner using rich library components.
-
-        Args:
-            api_call (str): The API call description.
-            output (Any): The output data to display, can be a dictionary, list, or any other type.
-        """
-        console = Console()
-        console.print(Panel(api_call, border_style="bold cyan"))
-        
-        if isinstance(output, (dict, list)):
-            json_str = json.dumps(output, indent=2)
-            syntax = Syntax(json_str, "json", theme="monokai", line_numbers=True)
-            console.print(syntax)
-        else:
-            console.print(str(output))
-
-# Example usage:
-if __name__ == "__main__":
-    # Sample data (replace with actual data from Garmin Connect)
-    sample_data = [
-        {
-            "activityName": "Morning Run",
-            "activityType": {"typeKey": "running"},
-            "startTimeLocal": "2024-09-15 07:30:00",
-            "duration": 1800,  # in seconds
-            "distance": 5000,  # in meters
-            "averageSpeed": 2.78,  # in m/s
-            "elevationGain": 50,
-            "averageHeartRate": 140,
-            "maxHeartRate": 165,
-            "calories": 300,
-            "weather": {
-                "temperature": 20,
-                "humidity": 65,
-                "windSpeed": 5
-            }
-        }
-    ]
-
-    viewer = DataViewer(sample_data)
+from typing import List, Dict, Any, Mapping
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from rich.text import Text
+from rich.tree import Tree
+from rich.syntax import Syntax
+from rich.prompt import Confirm, Prompt
+from datetime import datetime
+import json
+
+class DataViewer:
+    """
+    A class to visualize activity data using the rich library.
+
+    Attributes:
+        data (List[Mapping[str, Any]]): Activity summaries, as dictionaries or ActivityRecords.
+        console (Console): An instance of rich.console.Console for rendering output.
+    """
+
+    def __init__(self, data: List[Mapping[str, Any]]):
+        """
+        Initializes the DataViewer with activity data.
+
+        Args:
+            data (List[Mapping[str, Any]]): Activity summaries, as dictionaries or ActivityRecords.
+        """
+        self.data = data
+        self.console = Console()
+
+    def view_data(self, page_size: int = 10) -> None:
+        """
+        Displays the activity data in a formatted manner using rich library components.
+
+        A single activity is shown in full. Longer lists are paged: only the current page is
+        rendered, as one summary row per activity, and the detailed view of an activity is
+        built when the user expands it. Without an interactive terminal all pages are printed
+        as summary tables.
+
+        Args:
+            page_size (int, optional): The number of activities per page. Defaults to 10.
+        """
+        if len(self.data) == 1:
+            self._view_activity(1, self.data[0])
+            return
+
+        pages = max(1, -(-len(self.data) // page_size))
+        if not self.console.is_interactive:
+            for page in range(pages):
+                self.console.print(self._page_table(page, page_size, pages))
+            return
+
+        page = 0
+        while True:
+            self.console.print(self._page_table(page, page_size, pages))
+            choice = Prompt.ask(
+                "[cyan]n[/cyan]ext, [cyan]p[/cyan]revious, activity number to expand, [cyan]q[/cyan] to return",
+                default="q" if page == pages - 1 else "n",
+                console=self.console,
+            ).strip().lower()
+            if choice == "q":
+                return
+            if choice == "n":
+                page = min(page + 1, pages - 1)
+            elif choice == "p":
+                page = max(page - 1, 0)
+            elif choice.isdigit() and 1 <= int(choice) <= len(self.data):
+                self._view_activity(int(choice), self.data[int(choice) - 1])
+            else:
+                self.console.print("Invalid selection.", style="bold red")
+
+    @staticmethod
+    def _summary(activity: Dict[str, Any]) -> List[tuple]:
+        return [
+            ("Activity Name", activity.get('activityName') or 'N/A'),
+            ("Activity Type", (activity.get('activityType') or {}).get('typeKey', 'N/A')),
+            ("Start Time", activity.get('startTimeLocal') or 'N/A'),
+            ("Duration", f"{(activity.get('duration') or 0) / 60:.2f} minutes"),
+            ("Distance", f"{(activity.get('distance') or 0) / 1000:.2f} km"),
+            ("Average Speed", f"{(activity.get('averageSpeed') or 0) * 3.6:.2f} km/h"),
+        ]
+
+    def _page_table(self, page: int, page_size: int, pages: int) -> Table:
+        """
+        Builds a compact table with one row per activity of the given page.
+        """
+        table = Table(title=f"Activities (page {page + 1} of {pages}, {len(self.data)} total)")
+        table.add_column("#", style="cyan", justify="right")
+        table.add_column("Name", style="magenta", no_wrap=True, max_width=30)
+        table.add_column("Type", style="magenta")
+        table.add_column("Start Time", style="magenta", no_wrap=True)
+        table.add_column("Min", style="green", justify="right")
+        table.add_column("Km", style="green", justify="right")
+        table.add_column("Km/h", style="green", justify="right")
+
+        first = page * page_size
+        for i, activity in enumerate(self.data[first:first + page_size], first + 1):
+            table.add_row(
+                str(i),
+                str(activity.get('activityName') or 'N/A'),
+                str((activity.get('activityType') or {}).get('typeKey', 'N/A')),
+                str(activity.get('startTimeLocal') or 'N/A'),
+                f"{(activity.get('duration') or 0) / 60:.1f}",
+                f"{(activity.get('distance') or 0) / 1000:.2f}",
+                f"{(activity.get('averageSpeed') or 0) * 3.6:.1f}",
+            )
+        return table
+
+    def _view_activity(self, index: int, activity: Dict[str, Any]) -> None:
+        """
+        Displays the summary table and the detailed data tree of one activity.
+        """
+        self.console.print(Panel(f"[bold cyan]Activity {index}[/bold cyan]", expand=False))
+
+        # Create a table for basic activity info
+        table = Table(title="Activity Summary")
+        table.add_column("Attribute", style="cyan")
+        table.add_column("Value", style="magenta")
+
+        for attr, value in self._summary(activity):
+            table.add_row(attr, str(value))
+
+        self.console.print(table)
+
+        # Create a tree for detailed data
+        tree = Tree("[bold green]Detailed Data[/bold green]")
+        self._add_dict_to_tree(activity, tree)
+
+        self.console.print(tree)
+        self.console.print("\n" + "="*50 + "\n")
+
+    def _add_dict_to_tree(self, data: Dict[str, Any], tree: Tree, max_depth: int = 2, current_depth: int = 0):
+        """
+        Recursively adds dictionary data to a rich.tree.Tree object.
+
+        Args:
+            data (Dict[str, Any]): The dictionary data to add to the tree.
+            tree (Tree): The rich.tree.Tree object to add data to.
+            max_depth (int, optional): The maximum depth to traverse in the dictionary. Defaults to 2.
+            current_depth (int, optional): The current depth in the dictionary traversal. Defaults to 0.
+        """
+        if current_depth >= max_depth:
+            return
+
+        for key, value in data.items():
+            if isinstance(value, dict):
+                branch = tree.add(f"[bold blue]{key}[/bold blue]")
+                self._add_dict_to_tree(value, branch, max_depth, current_depth + 1)
+            elif isinstance(value, list):
+                branch = tree.add(f"[bold blue]{key}[/bold blue] (list with {len(value)} items)")
+                if len(value) > 0 and isinstance(value[0], dict):
+                    self._add_dict_to_tree(value[0], branch, max_depth, current_depth + 1)
+            else:
+                tree.add(Text(f"{key}: ", "yellow") + Text(str(value), "green"))
+
+    # Payloads up to this many characters of compact JSON are shown in full with syntax highlighting.
+    HIGHLIGHT_LIMIT = 100_000
+    # Arrays longer than this are collapsed to their first items in the summarized view.
+    MAX_ARRAY_ITEMS = 10
+
+    @staticmethod
+    def _collapse(data: Any, max_items: int) -> Any:
+        """
+        Returns a copy of the data with long arrays cut to `max_items` and a note of the rest.
+        """
+        if isinstance(data, dict):
+            return {key: DataViewer._collapse(value, max_items) for key, value in data.items()}
+        if isinstance(data, list):
+            head = [DataViewer._collapse(item, max_items) for item in data[:max_items]]
+            if len(data) > max_items:
+                head.append(f"... {len(data) - max_items} more items")
+            return head
+        return data
+
+    @staticmethod
+    def dump_to_file(api_call: str, output: Any) -> str:
+        """
+        Writes the full output of an API call as JSON to the `dumps` folder of the data directory.
+
+        Args:
+            api_call (str): The API call description, used in the file name.
+            output (Any): The output data.
+
+        Returns:
+            str: The path of the written file.
+        """
+        from modules.paths import data_path
+
+        slug = "".join(c if c.isalnum() else "_" for c in api_call.lower()).strip("_") or "output"
+        path = data_path("dumps", f"{slug}_{datetime.now():%Y%m%d_%H%M%S}.json")
+        with open(path, "w") as f:
+            json.dump(output, f, indent=2, default=str)
+        return path
+
+    @staticmethod
+    def display_rich_output(api_call: str, output: Any) -> None:
+        """
+        Displays the output of an API call in a formatted manner using rich library components.
+
+        Small payloads are pretty printed with syntax highlighting. Payloads above
+        `HIGHLIGHT_LIMIT` characters have their long arrays collapsed to a summary, are printed
+        as plain text if they are still large, and the user is offered a full dump to a file.
+
+        Args:
+            api_call (str): The API call description.
+            output (Any): The output data to display, can be a dictionary, list, or any other type.
+        """
+        console = Console()
+        console.print(Panel(api_call, border_style="bold cyan"))
+        
+        if not isinstance(output, (dict, list)):
+            console.print(str(output))
+            return
+
+        size = len(json.dumps(output, separators=(",", ":"), default=str))
+        if size <= DataViewer.HIGHLIGHT_LIMIT:
+            json_str = json.dumps(output, indent=2, default=str)
+            syntax = Syntax(json_str, "json", theme="monokai", line_numbers=True)
+            console.print(syntax)
+            return
+
+        collapsed = DataViewer._collapse(output, DataViewer.MAX_ARRAY_ITEMS)
+        json_str = json.dumps(collapsed, indent=2, default=str)
+        if len(json_str) <= DataViewer.HIGHLIGHT_LIMIT:
+            console.print(Syntax(json_str, "json", theme="monokai", line_numbers=True))
+        else:
+            # Highlighting dominates the runtime for large payloads, stream them as plain text.
+            console.out(json_str, highlight=False)
+        console.print(f"Output is {size / 1024:.0f} KB, arrays longer than {DataViewer.MAX_ARRAY_ITEMS} items are collapsed.",
+                      style="bold yellow")
+        if console.is_interactive and Confirm.ask("Write the full output to a file?", default=False, console=console):
+            console.print(f"Full output written to {DataViewer.dump_to_file(api_call, output)}", style="bold green")
+
+# Example usage:
+if __name__ == "__main__":
+    # Sample data (replace with actual data from Garmin Connect)
+    sample_data = [
+        {
+            "activityName": "Morning Run",
+            "activityType": {"typeKey": "running"},
+            "startTimeLocal": "2024-09-15 07:30:00",
+            "duration": 1800,  # in seconds
+            "distance": 5000,  # in meters
+            "averageSpeed": 2.78,  # in m/s
+            "elevationGain": 50,
+            "averageHeartRate": 140,
+            "maxHeartRate": 165,
+            "calories": 300,
+            "weather": {
+                "temperature": 20,
+                "humidity": 65,
+                "windSpeed": 5
+            }
+        }
+    ]
+
+    viewer = DataViewer(sample_data)
     viewer.view_data()
\ No newline at end of file
@@ -0,0 +1,260 @@
+import datetime
+import io
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from modules.paths import data_path
+
+logger = logging.getLogger(__name__)
+
+# maxchart used when the full resolution streams are wanted instead of the default 2000 point chart.
+FULL_RESOLUTION = 100000
+TIMESTAMP_KEY = "directTimestamp"
+ELAPSED_KEY = "sumElapsedDuration"
+
+# Values arrive in the unit named by their descriptor. The descriptor "factor" describes how
+# Garmin stores the value internally and is not applied. Units are converted to SI here.
+UNIT_SCALES = {
+    "kilometer": ("meter", 1000.0),
+    "centimeter": ("meter", 0.01),
+    "mile": ("meter", 1609.344),
+    "foot": ("meter", 0.3048),
+    "kph": ("mps", 1 / 3.6),
+    "mph": ("mps", 0.44704),
+    "millisecond": ("second", 0.001),
+    "minute": ("second", 60.0),
+    "hour": ("second", 3600.0),
+    "gram": ("kilogram", 0.001),
+    "semicircle": ("dd", 180.0 / 2 ** 31),
+    "gmt": ("second", 0.001),
+}
+
+
+class DecodedDetails:
+    """
+    The detail streams of one activity as a dense float matrix, one row per metric.
+
+    Samples are sorted by time with duplicates removed. Missing values are NaN. Rows of the
+    matrix are contiguous, so each metric is a plain float64 view.
+
+    Args:
+        timestamps (np.ndarray): Epoch seconds of the samples.
+        keys (List[str]): The metric descriptor keys, in matrix row order.
+        matrix (np.ndarray): Values of shape (len(keys), len(timestamps)).
+        units (Dict[str, str]): The unit of every metric after scaling.
+        resolution (int): The maxchart the payload was requested with, or its sample count if unknown.
+    """
+
+    def __init__(self, timestamps: np.ndarray, keys: List[str], matrix: np.ndarray, units: Dict[str, str],
+                 resolution: int = 0):
+        self.timestamps = timestamps
+        self.keys = list(keys)
+        self.matrix = matrix
+        self.units = units
+        self.resolution = resolution or len(timestamps)
+        self._index = {key: i for i, key in enumerate(self.keys)}
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.matrix[self._index[key]]
+
+    def streams(self) -> Dict[str, np.ndarray]:
+        """
+        Returns the metrics as a dict of arrays, sharing memory with the matrix.
+        """
+        return {key: self.matrix[i] for i, key in enumerate(self.keys)}
+
+    def to_frame(self):
+        """
+        Returns the streams as a pandas DataFrame with a UTC DatetimeIndex and one column per metric.
+        """
+        import pandas as pd
+
+        index = pd.to_datetime((self.timestamps * 1000).astype(np.int64), unit="ms", utc=True)
+        frame = pd.DataFrame(self.matrix.T, index=index, columns=self.keys, copy=False)
+        frame.attrs["units"] = dict(self.units)
+        return frame
+
+    def resample(self, step: float = 1.0, max_gap: float = 10.0) -> "DecodedDetails":
+        """
+        Interpolates the streams onto a uniform time grid.
+
+        Grid points further than `max_gap` seconds from a recorded sample stay NaN, so pauses
+        and recording gaps are not bridged by interpolation.
+
+        Args:
+            step (float, optional): The grid spacing in seconds. Defaults to 1.0.
+            max_gap (float, optional): The longest gap in seconds that is interpolated. Defaults to 10.
+
+        Returns:
+            DecodedDetails: The resampled streams.
+        """
+        if len(self) < 2:
+            return self
+        grid = self.timestamps[0] + np.arange(0, self.timestamps[-1] - self.timestamps[0] + step, step)
+        position = np.clip(np.searchsorted(self.timestamps, grid, side="right"), 1, len(self) - 1)
+        before, after = self.timestamps[position - 1], self.timestamps[position]
+        bridged = (after - before <= max_gap) | (grid == before) | (grid == after)
+        matrix = np.full((len(self.keys), len(grid)), np.nan)
+        for i in range(len(self.keys)):
+            values = self.matrix[i]
+            valid = ~np.isnan(values)
+            if valid.sum() < 2:
+                continue
+            row = np.interp(grid, self.timestamps[valid], values[valid], left=np.nan, right=np.nan)
+            row[~bridged] = np.nan
+            matrix[i] = row
+        return DecodedDetails(grid, self.keys, matrix, self.units, self.resolution)
+
+
+def decode_details(details: Dict[str, Any], start: Optional[float] = None, resolution: int = 0) -> DecodedDetails:
+    """
+    Decodes a `get_activity_details` payload into a DecodedDetails matrix.
+
+    Rectangular payloads convert in a single NumPy call; ragged rows are padded with NaN. Null
+    values become NaN, samples without a time are dropped, and values are converted to SI units.
+
+    Args:
+        details (Dict[str, Any]): The payload with metricDescriptors and activityDetailMetrics.
+        start (float, optional): The start of the activity in epoch seconds, needed when samples carry
+            only the elapsed duration and no timestamp.
+        resolution (int, optional): The maxchart the payload was requested with.
+
+    Returns:
+        DecodedDetails: The decoded streams, without the time metric.
+
+    Raises:
+        ValueError: If the samples have no time axis.
+    """
+    descriptors = sorted(details.get("metricDescriptors") or [], key=lambda d: d["metricsIndex"])
+    rows = [row.get("metrics") or [] for row in details.get("activityDetailMetrics") or []]
+    width = max((d["metricsIndex"] for d in descriptors), default=-1) + 1
+    try:
+        matrix = np.array(rows, dtype=float).reshape(len(rows), width)
+    except ValueError:
+        matrix = np.full((len(rows), width), np.nan)
+        for i, row in enumerate(rows):
+            matrix[i, :len(row)] = np.array(row[:width], dtype=float)
+
+    keys, units, columns, scales = [], {}, [], []
+    timestamps = None
+    for descriptor in descriptors:
+        unit = (descriptor.get("unit") or {}).get("key") or ""
+        unit, scale = UNIT_SCALES.get(unit, (unit, 1.0))
+        column = descriptor["metricsIndex"]
+        if descriptor["key"] == TIMESTAMP_KEY:
+            timestamps = matrix[:, column] * scale
+            continue
+        keys.append(descriptor["key"])
+        units[descriptor["key"]] = unit
+        columns.append(column)
+        scales.append(scale)
+
+    if timestamps is None:
+        if ELAPSED_KEY not in units or start is None:
+            raise ValueError("The activity details carry no time axis.")
+        i = keys.index(ELAPSED_KEY)
+        timestamps = start + matrix[:, columns[i]] * scales[i]
+
+    order = np.argsort(timestamps, kind="stable")
+    order = order[~np.isnan(timestamps[order])]
+    timestamps = timestamps[order]
+    # Repeated timestamps keep their first sample.
+    first = np.concatenate(([True], np.diff(timestamps) > 0)) if len(timestamps) else np.ones(0, dtype=bool)
+    timestamps, order = timestamps[first], order[first]
+
+    # One gather for all metrics, transposed so every metric is a contiguous row.
+    values = np.ascontiguousarray(matrix[np.ix_(order, np.array(columns, dtype=np.intp))].T)
+    values *= np.array(scales)[:, None]
+    return DecodedDetails(timestamps, keys, values, units, resolution)
+
+
+class DetailCache:
+    """
+    Decoded activity details stored as `.npz` files, one per activity.
+
+    Loading an `.npz` file is a few array reads, far cheaper than fetching and parsing the JSON
+    payload again. Entries record the resolution they were requested with, and a request for a
+    higher resolution fetches the payload again.
+
+    Args:
+        directory (str, optional): The cache directory. Defaults to `details` in the data directory.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.path.dirname(data_path("details", "index"))
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, activity_id: int) -> str:
+        return os.path.join(self.directory, f"{int(activity_id)}.npz")
+
+    def activity_ids(self) -> List[int]:
+        return [int(name[:-4]) for name in os.listdir(self.directory) if name.endswith(".npz") and name[:-4].isdigit()]
+
+    def get(self, activity_id: int, resolution: int = 0) -> Optional[DecodedDetails]:
+        """
+        Returns the stored details of an activity, or None if missing or stored at a lower resolution.
+        """
+        try:
+            with np.load(self._path(activity_id), allow_pickle=False) as stored:
+                if int(stored["resolution"]) < resolution:
+                    return None
+                keys = [str(key) for key in stored["keys"]]
+                return DecodedDetails(stored["timestamps"], keys, stored["matrix"],
+                                      dict(zip(keys, (str(unit) for unit in stored["units"]))),
+                                      int(stored["resolution"]))
+        except (OSError, KeyError, ValueError) as err:
+            if not isinstance(err, FileNotFoundError):
+                logger.warning(f"Ignoring unreadable details of activity {activity_id}: {err}")
+            return None
+
+    def put(self, activity_id: int, decoded: DecodedDetails) -> None:
+        buffer = io.BytesIO()
+        np.savez(buffer, timestamps=decoded.timestamps, matrix=decoded.matrix,
+                 keys=np.array(decoded.keys, dtype=str), units=np.array([decoded.units[k] for k in decoded.keys], dtype=str),
+                 resolution=np.int64(decoded.resolution))
+        path = self._path(activity_id)
+        with self._lock:
+            with open(path + ".tmp", "wb") as f:
+                f.write(buffer.getbuffer())
+            os.replace(path + ".tmp", path)
+
+    def load(self, api, activity: Dict[str, Any], resolution: int = FULL_RESOLUTION) -> DecodedDetails:
+        """
+        Returns the decoded details of an activity, fetching and storing them if needed.
+
+        Args:
+            api: The Garmin Connect API client.
+            activity (Dict[str, Any]): The activity summary, with activityId and startTimeGMT.
+            resolution (int, optional): The maxchart to request. Defaults to FULL_RESOLUTION.
+
+        Returns:
+            DecodedDetails: The decoded streams.
+        """
+        activity_id = activity["activityId"]
+        decoded = self.get(activity_id, resolution)
+        if decoded is None:
+            details = api.get_activity_details(activity_id, maxchart=resolution)
+            decoded = decode_details(details, start_epoch(activity), resolution)
+            self.put(activity_id, decoded)
+        return decoded
+
+
+def start_epoch(activity: Dict[str, Any]) -> Optional[float]:
+    """
+    Returns the start of an activity in epoch seconds, or None if the summary has no startTimeGMT.
+    """
+    start = activity.get("startTimeGMT")
+    if not start:
+        return None
+    return datetime.datetime.fromisoformat(start).replace(tzinfo=datetime.timezone.utc).timestamp()
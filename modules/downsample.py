@@ -0,0 +1,72 @@
+from typing import Tuple
+
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsamples a series with the Largest-Triangle-Three-Buckets algorithm.
+
+    LTTB keeps the first and last point and, from every bucket in between, the point forming the
+    largest triangle with the point kept from the previous bucket and the average of the next
+    bucket. Peaks and troughs survive, so a few thousand points draw like the full series.
+    Points with NaN values are dropped first.
+
+    Args:
+        x (np.ndarray): Monotonic x values (numbers or datetime64).
+        y (np.ndarray): The values.
+        threshold (int): The number of points to keep.
+
+    Returns:
+        tuple: (x, y) with at most `threshold` points, the input dtype of x preserved.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    valid = ~np.isnan(y)
+    if np.issubdtype(x.dtype, np.datetime64):
+        valid &= ~np.isnat(x)
+    x, y = x[valid], y[valid]
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    xs = x.astype("datetime64[ns]").astype(np.float64) if np.issubdtype(x.dtype, np.datetime64) else x.astype(float)
+    # Buckets split the points between the first and the last one.
+    every = (n - 2) / (threshold - 2)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = xs[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        px, py = xs[previous], y[previous]
+        area = np.abs((px - avg_x) * (y[start:end] - py) - (px - xs[start:end]) * (avg_y - py))
+        previous = start + int(np.argmax(area))
+        keep[i + 1] = previous
+    return x[keep], y[keep]
+
+
+def window(x: np.ndarray, y: np.ndarray, start, end, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsamples the part of a series between `start` and `end` to `threshold` points.
+
+    Used when a chart is zoomed, so the visible range is drawn at full detail again.
+
+    Args:
+        x (np.ndarray): Sorted x values.
+        y (np.ndarray): The values.
+        start: The first x value to include, None for the beginning.
+        end: The last x value to include, None for the end.
+        threshold (int): The number of points to keep.
+
+    Returns:
+        tuple: The downsampled (x, y) of the window.
+    """
+    lo = 0 if start is None else int(np.searchsorted(x, start, side="left"))
+    hi = len(x) if end is None else int(np.searchsorted(x, end, side="right"))
+    # One point beyond each edge keeps lines running out of the visible range.
+    lo, hi = max(lo - 1, 0), min(hi + 1, len(x))
+    return lttb(x[lo:hi], y[lo:hi], threshold)
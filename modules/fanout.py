@@ -0,0 +1,94 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, IO, List, Optional
+
+from modules.accounts import Account
+from modules.batch import run_batch, write_ndjson
+
+logger = logging.getLogger(__name__)
+
+
+def _run_account(account: Dict[str, Any], plugin_dir: str, keys: List[str], params: Dict[str, Any],
+                 out_path: str) -> Dict[str, Any]:
+    """
+    Runs the plugins for one account in a worker process, writing NDJSON to `out_path`.
+
+    The worker switches the process environment to the account before anything is opened, so
+    tokens, the response cache, the activity store and the rate limiter all belong to it alone.
+    """
+    account = Account(**account)
+    account.activate()
+
+    from modules.client import GarminConnectClient
+    from modules.interface import CredentialsManager
+    from modules.plugin_manifest import load_plugins
+
+    client = GarminConnectClient(credentials_provider=CredentialsManager(account.name).load_credentials)
+    if not client.login():
+        return {"account": account.name, "error": "Could not login to Garmin Connect."}
+    plugins = load_plugins(plugin_dir)
+    with open(out_path, "w") as out:
+        counts = run_batch(client.api, plugins, keys, params, out)
+    return {"account": account.name, "counts": counts}
+
+
+def _append_with_account(name: str, path: str, out: IO[str]) -> None:
+    # Lines are copied without decoding the records, only the account field is spliced in.
+    prefix = '{"account":' + json.dumps(name) + ","
+    with open(path) as f:
+        for line in f:
+            out.write(prefix + line[1:])
+
+
+def run_accounts(accounts: List[Account], plugin_dir: str, keys: List[str], params: Dict[str, Any], out: IO[str],
+                 workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Runs a set of plugins for many accounts across a process pool and merges the output.
+
+    Every account runs in its own process with its own login, local stores and rate budget, so
+    a slow or throttled account does not hold back the others. Each worker writes NDJSON to a
+    temporary file. As accounts finish, their lines are appended to `out` with an "account"
+    field, e.g. `{"account": "alice", "plugin": "3", "record": {...}}`. An account that fails
+    produces a single `{"account": <name>, "error": <message>}` line.
+
+    Args:
+        accounts (List[Account]): The accounts to run.
+        plugin_dir (str): The plugin directory.
+        keys (List[str]): The command keys to run for every account.
+        params (Dict[str, Any]): Plugin parameters, as for `run_batch`.
+        out (IO[str]): The aggregated output stream.
+        workers (int, optional): The number of processes. Defaults to the number of CPUs, at most one per account.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Per account, the records written per command key or the error.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(accounts)))
+    tmpdir = tempfile.mkdtemp(prefix="garmin_fanout_")
+    results = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for account in accounts:
+                path = os.path.join(tmpdir, f"{account.name}.ndjson")
+                future = executor.submit(_run_account, account.to_dict(), plugin_dir, keys, params, path)
+                futures[future] = (account.name, path)
+            for future in as_completed(futures):
+                name, path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as err:
+                    result = {"account": name, "error": str(err)}
+                if "error" in result:
+                    logger.error(f"Account '{name}' failed: {result['error']}")
+                    write_ndjson(result, out)
+                if os.path.exists(path):
+                    _append_with_account(name, path, out)
+                out.flush()
+                results[name] = result
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return results
@@ -0,0 +1,154 @@
+import io
+import logging
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from garminconnect import Garmin
+
+from modules.fit_decoder import FitDecoder, FitError
+from modules.paths import data_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+
+
+def extract_fit_files(payload: bytes) -> List[Tuple[str, bytes]]:
+    """
+    Extracts the FIT files of an original download in memory.
+
+    Garmin Connect returns originals as zip archives, usually holding a single FIT file.
+
+    Args:
+        payload (bytes): The downloaded content, a zip archive or a bare FIT file.
+
+    Returns:
+        List[Tuple[str, bytes]]: (file name, content) of every FIT file.
+    """
+    if payload[8:12] == b".FIT":
+        return [("activity.fit", payload)]
+    with zipfile.ZipFile(io.BytesIO(payload)) as archive:
+        return [(info.filename, archive.read(info)) for info in archive.infolist()
+                if info.filename.lower().endswith(".fit")]
+
+
+class FitExporter:
+    """
+    Downloads the original files of activities concurrently and decodes them into columnar arrays.
+
+    Downloads run on a thread pool with a bounded number of requests in flight, so memory holds a
+    few archives at a time. Archives are extracted in memory and decoded on the calling thread
+    by a single FitDecoder whose buffers are reused across files. For every activity the
+    decoded records are written to `<activity id>.npz` and, if `keep_originals` is set, the FIT
+    files next to it. Activities with an existing `.npz` are skipped, so an interrupted export
+    resumes where it stopped.
+
+    Args:
+        api: The Garmin API object (or a proxy of it).
+        directory (str, optional): The export directory. Defaults to `fit` in the data directory.
+        max_workers (int, optional): The maximum number of concurrent downloads. Defaults to 4.
+        keep_originals (bool, optional): Whether to write the FIT files as well. Defaults to True.
+    """
+
+    def __init__(self, api, directory: Optional[str] = None, max_workers: int = DEFAULT_MAX_WORKERS,
+                 keep_originals: bool = True):
+        self.api = api
+        self.directory = directory or os.path.dirname(data_path("fit", "index"))
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_workers = max_workers
+        self.keep_originals = keep_originals
+        self.decoder = FitDecoder()
+
+    def records_path(self, activity_id: int) -> str:
+        return os.path.join(self.directory, f"{int(activity_id)}.npz")
+
+    def _download(self, activity_id: int) -> List[Tuple[str, bytes]]:
+        return extract_fit_files(self.api.download_activity(activity_id, dl_fmt=Garmin.ActivityDownloadFormat.ORIGINAL))
+
+    def _store(self, activity_id: int, files: List[Tuple[str, bytes]]) -> Dict[str, Any]:
+        decoded = [self.decoder.decode(content) for _, content in files]
+        columns = {name: np.concatenate([d[name] for d in decoded]) for name in decoded[0]} if decoded else {}
+        if self.keep_originals:
+            for i, (_, content) in enumerate(files):
+                suffix = f"_{i + 1}" if len(files) > 1 else ""
+                with open(os.path.join(self.directory, f"{int(activity_id)}{suffix}.fit"), "wb") as f:
+                    f.write(content)
+        path = self.records_path(activity_id)
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, **columns)
+        os.replace(path + ".tmp", path)
+        return {"activityId": activity_id, "files": len(files),
+                "records": len(columns.get("timestamp", ())), "bytes": sum(len(c) for _, c in files)}
+
+    def iter_export(self, activities: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Exports activities and yields one result per activity, in input order.
+
+        Args:
+            activities (Iterable[Dict[str, Any]]): Activity summaries with an activityId.
+
+        Yields:
+            Dict[str, Any]: activityId plus either files, records and bytes, "skipped" for activities
+                exported before, or "error" with the reason the activity failed.
+        """
+        ids = deque(a["activityId"] for a in activities)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = deque()
+            while ids or pending:
+                while ids and len(pending) < self.max_workers * 2:
+                    activity_id = ids.popleft()
+                    if os.path.exists(self.records_path(activity_id)):
+                        pending.append((activity_id, None))
+                    else:
+                        pending.append((activity_id, executor.submit(self._download, activity_id)))
+                activity_id, future = pending.popleft()
+                if future is None:
+                    yield {"activityId": activity_id, "skipped": True}
+                    continue
+                try:
+                    yield self._store(activity_id, future.result())
+                except (FitError, zipfile.BadZipFile) as err:
+                    logger.warning(f"Could not decode the original of activity {activity_id}: {err}")
+                    yield {"activityId": activity_id, "error": str(err)}
+                except Exception as err:
+                    logger.warning(f"Could not download the original of activity {activity_id}: {err}")
+                    yield {"activityId": activity_id, "error": str(err)}
+
+    def export(self, activities: Iterable[Dict[str, Any]],
+               on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Exports activities, see `iter_export`.
+
+        Args:
+            activities (Iterable[Dict[str, Any]]): Activity summaries with an activityId.
+            on_result (Callable, optional): Called with every result as it is produced.
+
+        Returns:
+            List[Dict[str, Any]]: The results, in input order.
+        """
+        results = []
+        for result in self.iter_export(activities):
+            if on_result:
+                on_result(result)
+            results.append(result)
+        return results
+
+
+def load_records(activity_id: int, directory: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Returns the decoded FIT records of an exported activity.
+
+    Args:
+        activity_id (int): The activity id.
+        directory (str, optional): The export directory. Defaults to `fit` in the data directory.
+
+    Returns:
+        Dict[str, np.ndarray]: The record columns, see `FitDecoder.decode`.
+    """
+    directory = directory or os.path.dirname(data_path("fit", "index"))
+    with np.load(os.path.join(directory, f"{int(activity_id)}.npz")) as stored:
+        return {name: stored[name] for name in stored.files}
@@ -0,0 +1,164 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from requests import Session
+from requests.adapters import HTTPAdapter, Retry
+
+from modules.metrics import metrics
+from modules.rate_limit import RateLimiter, endpoint_family, shared_limiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = int(os.getenv("GARMIN_POOL_SIZE") or 16)
+DEFAULT_RETRIES = int(os.getenv("GARMIN_RETRIES") or 3)
+
+_session_lock = threading.Lock()
+_session: Optional[Session] = None
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """
+    An HTTPAdapter that paces requests through a rate limiter and counts them.
+
+    Connect API requests wait for a token of their endpoint family before being sent. Throttled
+    (429) and transient (5xx) responses are retried after the delay the limiter decides on,
+    honoring Retry-After.
+
+    urllib3 keeps a per-host connection pool that counts the connections it opened. Every
+    request beyond that number was served over an already established (keep-alive) connection.
+
+    Args:
+        limiter (RateLimiter, optional): The rate limiter. Defaults to the process-wide limiter.
+    """
+
+    def __init__(self, *args, limiter: Optional[RateLimiter] = None, **kwargs):
+        self._count_lock = threading.Lock()
+        self.request_count = 0
+        self.limiter = limiter or shared_limiter()
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        family = endpoint_family(request.url)
+        attempt = 0
+        while True:
+            if family:
+                self.limiter.before_request(family)
+            with self._count_lock:
+                self.request_count += 1
+            registry = metrics()
+            start = time.perf_counter()
+            response = super().send(request, **kwargs)
+            label = family or "auth"
+            if not kwargs.get("stream"):
+                # Reading the body here moves the transfer time into the measured request.
+                registry.increment("http_response_bytes", len(response.content), family=label)
+            registry.observe("http_request", time.perf_counter() - start, family=label)
+            registry.increment("http_requests", family=label, status=response.status_code)
+            if not family:
+                return response
+            delay = self.limiter.retry_delay(family, attempt, response.status_code,
+                                             response.headers.get("Retry-After"))
+            if delay is None:
+                return response
+            registry.increment("http_retries", family=family, status=response.status_code)
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns connection statistics for this adapter.
+
+        Returns:
+            Dict[str, int]: Counts of "requests", "connections" opened and "reused" connections.
+        """
+        pools = self.poolmanager.pools
+        connections = sum(pools[key].num_connections for key in list(pools.keys()) if key in pools)
+        return {
+            "requests": self.request_count,
+            "connections": connections,
+            "reused": max(self.request_count - connections, 0),
+        }
+
+
+def create_session(pool_size: int = DEFAULT_POOL_SIZE, retries: int = DEFAULT_RETRIES,
+                   backoff_factor: float = 0.5) -> Session:
+    """
+    Creates a requests Session with a sized, keep-alive connection pool and retry policy.
+
+    Args:
+        pool_size (int, optional): The number of connections kept per host. Defaults to GARMIN_POOL_SIZE or 16.
+        retries (int, optional): The number of retries for connection errors. Retryable statuses are
+            handled by the rate limiter. Defaults to GARMIN_RETRIES or 3.
+        backoff_factor (float, optional): The urllib3 backoff factor between retries. Defaults to 0.5.
+
+    Returns:
+        Session: The configured session.
+    """
+    session = Session()
+    session.headers["Connection"] = "keep-alive"
+    retry = Retry(total=retries, status_forcelist=(), backoff_factor=backoff_factor,
+                  respect_retry_after_header=False)
+    adapter = CountingHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                                  max_retries=retry, pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def shared_session() -> Session:
+    """
+    Returns the process-wide session, creating it on first use.
+
+    All Garmin API objects of the process share this session, so TLS handshakes and
+    connections are reused across logins, plugins and concurrent fetches.
+
+    Returns:
+        Session: The shared session.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def reset_shared_session() -> None:
+    """
+    Closes the process-wide session, so the next login starts without cookies or pooled connections.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def attach_shared_session(api) -> None:
+    """
+    Makes a `Garmin` API object send its requests through the shared session.
+
+    Args:
+        api (Garmin): A freshly created Garmin object, before login.
+    """
+    session = shared_session()
+    # Keep the headers garth sets on its own session (User-Agent).
+    session.headers.update(api.garth.sess.headers)
+    session.headers["Connection"] = "keep-alive"
+    api.garth.sess = session
+
+
+def connection_stats() -> Dict[str, int]:
+    """
+    Returns connection reuse statistics of the shared session.
+
+    Returns:
+        Dict[str, int]: Counts of "requests", "connections" opened and "reused" connections.
+    """
+    adapter = shared_session().get_adapter("https://")
+    if isinstance(adapter, CountingHTTPAdapter):
+        return adapter.stats()
+    return {"requests": 0, "connections": 0, "reused": 0}
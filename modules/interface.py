@@ -1,175 +1,364 @@
-# -*- coding: utf-8 -*-
-"""
-Created on Sun Sep 16 12:34:56 2024
-Summary: This is an interface for interacting with the Garmin Connect API, allowing users to retrieve and display various fitness data.
-Author: github.com/bshreyas13
-"""
-
-import logging
-from typing import Dict, Callable
-from modules.menu import Menu
-from modules.client import GarminConnectClient
-from plugins.base_plugin import BasePlugin
-import importlib
-import os
-from rich.console import Console
-from rich.panel import Panel
-from rich.prompt import Prompt
-import keyring
-from keyring.errors import KeyringError
-from plugins.plugin_types import PluginType
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-console = Console()
-
-class GarminConnectInterface:
-    def __init__(self, email: str, password: str):
-        self.api_client = GarminConnectClient(email, password)
-        self.menu = Menu()
-        self.commands: Dict[str, Callable] = {}
-        self.plugins: Dict[str, BasePlugin] = {}
-        self.retrieval_plugins: list = []
-        self.process_plugins:list = []
-        self._load_plugins()
-        self._setup_menu()
-        
-
-    def _load_plugins(self):
-        plugin_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),'plugins')
-        for filename in os.listdir(plugin_dir):
-            if filename.endswith('.py') and filename != 'base_plugin.py':
-                module_name = filename[:-3]  # Remove .py extension
-                module = importlib.import_module(f'plugins.{module_name}')
-                for item in dir(module):
-                    item = getattr(module, item)
-                    if isinstance(item, type) and issubclass(item, BasePlugin) and item != BasePlugin:
-                        plugin = item()
-                        self.plugins[plugin.command_key] = plugin
-
-    def _setup_menu(self):
-        sorted_keys = sorted(self.plugins.keys(), key=lambda k: (0, int(k)) if k.isdigit() else (1, k))
-        for key in sorted_keys:
-            plugin = self.plugins[key]
-            self.menu.add_option(key, plugin.description)
-            if plugin.plugin_type == PluginType.DATA_RETRIEVAL:
-                self.retrieval_plugins.append(key)
-            elif plugin.plugin_type == PluginType.DATA_PROCESSING:
-                self.process_plugins.append(key)
-            self.commands[key] = plugin.execute
-            
-        # Add exit options
-        self.menu.add_option("q", "Exit without logging out")
-        self.menu.add_option("Q", "Log session out and exit")
-
-    def run(self):
-        while True:
-            console.print(Panel.fit("Garmin Connect API Demo. Author:bshreyas13", border_style="bold green"))
-            
-            if not self.api_client.api:
-                if not self.api_client.login():
-                    console.print(Panel.fit("Could not login to Garmin Connect, try again later.", border_style="bold_red", style="bold red"))
-                    break
-
-            self.menu.display()
-            option = self.menu.get_selection()
-
-            if option == "q":
-                console.print(Panel.fit("Exiting the program without logging out session. Goodbye!", border_style="yellow", style="bold blue"))
-                break
-            elif option == "Q":
-                self.api_client.logout()
-                console.print(Panel.fit("Logged out successfully. Goodbye!", border_style="bold blue", style="bold blue"))
-                break
-
-            try:
-                command_func = self.commands.get(option)
-                if command_func is None:
-                    console.print(f"Command '{option}' not found.", style="bold red")
-                    continue
-                
-                if option in self.retrieval_plugins :
-                   command_func(self.api_client.api)
-                
-                if option in self.process_plugins :
-                    ret_func = self.commands.get('R')
-                    data = ret_func(self.api_client.api) 
-                    command_func(data)
-
-
-            except Exception as err:
-                logger.error(err)
-                console.print(f"Error: {err}", style="bold red")
-
-
-
-class CredentialsManager:
-    """
-    Manages user credentials using the keyring library for secure storage.
-
-    Attributes:
-        KEYRING_SERVICE (str): The name of the keyring service used for storing credentials.
-        email (str): The user's email address.
-        password (str): The user's password.
-    """
-
-    KEYRING_SERVICE = "GarminConnect"
-
-    def __init__(self):
-        """
-        Initializes the CredentialsManager with email and password set to None.
-        """
-        self.email = None
-        self.password = None
-
-    def get_credentials(self):
-        """
-        Retrieves the user's credentials from the keyring or prompts the user to enter them.
-
-        This method first attempts to retrieve the email and password from the keyring. If the
-        credentials are not found or there is an error accessing the keyring, it prompts the user
-        to enter their email and password. The entered credentials are then stored in the keyring.
-
-        Returns:
-            tuple: A tuple containing the email and password.
-        """
-        try:
-            # Try to get email and password from keyring
-            self.email = keyring.get_password(self.KEYRING_SERVICE, "email")
-            self.password = keyring.get_password(self.KEYRING_SERVICE, "password")
-        except KeyringError as e:
-            logger.error(f"Error accessing keyring: {e}")
-            self.email = None
-            self.password = None
-
-        if not self.email or not self.password:
-            self.email = Prompt.ask("Login e-mail")
-            self.password = Prompt.ask("Enter password", password=True)
-
-            # Store the credentials in keyring
-            try:
-                keyring.set_password(self.KEYRING_SERVICE, "email", self.email)
-                keyring.set_password(self.KEYRING_SERVICE, "password", self.password)
-            except KeyringError as e:
-                logger.error(f"Error storing credentials in keyring: {e}")
-                console.print("Could not store credentials securely. Proceeding without storing.")
-
-        return self.email, self.password
-    
-    def delete_credentials(self):
-        """
-        Deletes the stored credentials from the keyring.
-
-        This method attempts to delete the email and password from the keyring. If there is an error
-        during the deletion process, it logs the error and notifies the user.
-
-        """
-        KEYRING_SERVICE = "GarminConnect"
-        try:
-            keyring.delete_password(KEYRING_SERVICE, "email")
-            keyring.delete_password(KEYRING_SERVICE, "password")
-            console.print("Stored credentials have been deleted.", style="bold green")
-        except keyring.errors.KeyringError as e:
-            logger.error(f"Error deleting credentials from keyring: {e}")
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Sep 16 12:34:56 2024
+Summary: This is an interface for interacting with the Garmin Connect API, allowing users to retrieve and display various fitness data.
+Author: github.com/bshreyas13
+"""
+
+import contextlib
+import logging
+from typing import Dict, Callable, List
+from modules.menu import Menu
+from modules.client import GarminConnectClient
+from modules.plugin_manifest import LazyPlugin, load_plugins
+from modules.profiling import profile_run
+from modules.rate_limit import is_rate_limited
+from modules.result_store import ResultStore
+import os
+import time
+from concurrent.futures import as_completed
+from rich.console import Console
+from rich.panel import Panel
+from rich.prompt import Prompt
+from rich.table import Table
+from plugins.plugin_types import PluginType
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+console = Console()
+
+class GarminConnectInterface:
+    def __init__(self, email: str = None, password: str = None, credentials_provider: Callable = None,
+                 profile_dir: str = None):
+        self.api_client = GarminConnectClient(email, password, credentials_provider)
+        # When set, every menu selection is profiled and the reports are written to this directory.
+        self.profile_dir = profile_dir
+        self.menu = Menu()
+        self.commands: Dict[str, Callable] = {}
+        self.plugins: Dict[str, LazyPlugin] = {}
+        self.retrieval_plugins: list = []
+        self.process_plugins:list = []
+        self.results = ResultStore()
+        self._loop = None
+        self._async_api = None
+        self._load_plugins()
+        self._setup_menu()
+        
+
+    def _load_plugins(self):
+        # Plugin modules are imported only when selected, menu data comes from the manifest.
+        plugin_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),'plugins')
+        self.plugins.update(load_plugins(plugin_dir))
+
+    def _setup_menu(self):
+        sorted_keys = sorted(self.plugins.keys(), key=lambda k: (0, int(k)) if k.isdigit() else (1, k))
+        for key in sorted_keys:
+            plugin = self.plugins[key]
+            self.menu.add_option(key, plugin.description)
+            if plugin.plugin_type == PluginType.DATA_RETRIEVAL:
+                self.retrieval_plugins.append(key)
+            elif plugin.plugin_type == PluginType.DATA_PROCESSING:
+                self.process_plugins.append(key)
+            self.commands[key] = plugin.execute
+            
+        # Add exit options
+        self.menu.add_option("q", "Exit without logging out")
+        self.menu.add_option("Q", "Log session out and exit")
+
+    def _run_retrieval(self, key: str):
+        """
+        Runs a retrieval plugin interactively and keeps its result in the session result store.
+        """
+        plugin = self.plugins[key]
+        params = plugin.prompt_params()
+        data = plugin.execute(self.api_client.api, params=params)
+        self.results.put(key, params, data)
+        return data
+
+    def _select_input(self, source_key: str, optional: bool = False):
+        """
+        Lets the user pick a stored result of `source_key` as input for a processing plugin,
+        or run the retrieval plugin again. Without a stored result, the retrieval plugin runs
+        unless the input is optional, then None is returned.
+        """
+        entries = self.results.entries(source_key)
+        if not entries:
+            return None if optional else self._run_retrieval(source_key)
+
+        table = Table(title="Previously retrieved data")
+        table.add_column("#", style="cyan")
+        table.add_column("Arguments", style="magenta")
+        table.add_column("Items", style="green", justify="right")
+        table.add_column("Age", style="yellow", justify="right")
+        for i, entry in enumerate(entries, 1):
+            table.add_row(str(i), entry.describe(), str(entry.items), f"{(time.time() - entry.created) / 60:.0f} min")
+        console.print(table)
+
+        choice = Prompt.ask("Select a result, or 'n' to retrieve new data",
+                            choices=[str(i) for i in range(1, len(entries) + 1)] + ["n"], default="1")
+        if choice == "n":
+            return self._run_retrieval(source_key)
+        entry = entries[int(choice) - 1]
+        self.results.touch(entry)
+        return entry.data
+
+    def _get_async_api(self):
+        """
+        Returns the async client of the current login, started on the background event loop on first use.
+        """
+        # Imported on first use, so a single menu option does not load the HTTP stack at startup.
+        from modules.async_client import AsyncGarminConnectClient, BackgroundLoop
+
+        if self._loop is None:
+            self._loop = BackgroundLoop()
+        if self._async_api is None or self._async_api.sync_api is not self.api_client.api:
+            if self._async_api is not None:
+                self._loop.run(self._async_api.close())
+            self._async_api = AsyncGarminConnectClient(self.api_client.api)
+        return self._async_api
+
+    def _close_async(self) -> None:
+        if self._loop is None:
+            return
+        if self._async_api is not None:
+            self._loop.run(self._async_api.close())
+        self._loop.stop()
+        self._loop = self._async_api = None
+
+    def _run_many(self, keys: List[str]) -> None:
+        """
+        Runs several plugins from one selection.
+
+        Arguments of all retrieval plugins are collected up front, then their fetches run
+        concurrently on the background event loop and each result is rendered on this thread as
+        soon as it arrives. A processing plugin runs
+        once the result of the plugin it depends on is available; if that plugin was not selected,
+        a stored result is offered, or the plugin is added to the run unless the input is optional.
+        """
+        api = self.api_client.api
+        retrieval = [key for key in keys if key in self.retrieval_plugins]
+        processing = [key for key in keys if key in self.process_plugins]
+
+        inputs = {}
+        waiting: Dict[str, List[str]] = {}
+        for key in processing:
+            plugin = self.plugins[key]
+            source = plugin.depends_on or 'R'
+            if source in retrieval:
+                waiting.setdefault(source, []).append(key)
+            elif self.results.entries(source):
+                inputs[key] = self._select_input(source)
+            elif plugin.input_optional:
+                inputs[key] = None
+            else:
+                retrieval.append(source)
+                waiting.setdefault(source, []).append(key)
+
+        params = {key: self.plugins[key].prompt_params() for key in retrieval}
+
+        async_api = self._get_async_api()
+        futures = {self._loop.submit(self.plugins[key].fetch_async(async_api, **params[key])): key
+                   for key in retrieval if self.plugins[key].supports_fetch}
+
+        def completed(key, data):
+            self.results.put(key, params[key], data)
+            for dependent in waiting.pop(key, []):
+                inputs[dependent] = data
+
+        # Plugins without a fetch/render split run interactively on this thread while the others fetch.
+        for key in retrieval:
+            plugin = self.plugins[key]
+            if plugin.supports_fetch:
+                continue
+            console.rule(f"[bold cyan]{key}: {plugin.description}")
+            try:
+                completed(key, plugin.execute(api, params=params[key]))
+            except Exception as err:
+                logger.error(err)
+                console.print(f"Error in '{key}': {err}", style="bold red")
+        for future in as_completed(futures):
+            key = futures[future]
+            plugin = self.plugins[key]
+            console.rule(f"[bold cyan]{key}: {plugin.description}")
+            try:
+                data = future.result()
+                plugin.render(data)
+            except Exception as err:
+                logger.error(err)
+                console.print(f"Error in '{key}': {err}", style="bold red")
+                continue
+            completed(key, data)
+
+        for key in processing:
+            if key not in inputs:
+                console.print(f"Skipping '{key}', its input could not be retrieved.", style="bold yellow")
+                continue
+            console.rule(f"[bold cyan]{key}: {self.plugins[key].description}")
+            self.commands[key](inputs[key], api=api)
+
+    def _profiled(self, label: str):
+        if not self.profile_dir:
+            return contextlib.nullcontext()
+        return profile_run(label, self.profile_dir)
+
+    def run(self):
+        while True:
+            console.print(Panel.fit("Garmin Connect API Demo. Author:bshreyas13", border_style="bold green"))
+            
+            if not self.api_client.api:
+                if not self.api_client.login():
+                    console.print(Panel.fit("Could not login to Garmin Connect, try again later.", border_style="bold_red", style="bold red"))
+                    break
+
+            self.menu.display()
+            options = self.menu.get_selections(exclusive=["q", "Q"])
+            if len(options) > 1:
+                try:
+                    with self._profiled("_".join(options)):
+                        self._run_many(options)
+                except Exception as err:
+                    logger.error(err)
+                    console.print(f"Error: {err}", style="bold red")
+                continue
+            option = options[0]
+
+            if option in ("q", "Q"):
+                self._close_async()
+            if option == "q":
+                console.print(Panel.fit("Exiting the program without logging out session. Goodbye!", border_style="yellow", style="bold blue"))
+                break
+            elif option == "Q":
+                self.api_client.logout()
+                console.print(Panel.fit("Logged out successfully. Goodbye!", border_style="bold blue", style="bold blue"))
+                break
+
+            try:
+                command_func = self.commands.get(option)
+                if command_func is None:
+                    console.print(f"Command '{option}' not found.", style="bold red")
+                    continue
+                
+                with self._profiled(option):
+                    if option in self.retrieval_plugins :
+                        self._run_retrieval(option)
+
+                    if option in self.process_plugins :
+                        plugin = self.plugins[option]
+                        data = self._select_input(plugin.depends_on or 'R', plugin.input_optional)
+                        command_func(data, api=self.api_client.api)
+
+
+            except Exception as err:
+                logger.error(err)
+                if is_rate_limited(err):
+                    console.print("Garmin Connect is rate limiting requests. Please try again in a few minutes.", style="bold red")
+                else:
+                    console.print(f"Error: {err}", style="bold red")
+
+
+
+class CredentialsManager:
+    """
+    Manages user credentials using the keyring library for secure storage.
+
+    Args:
+        account (str, optional): The account name. Each account stores its credentials under its
+            own keyring service, the default account uses `KEYRING_SERVICE`.
+
+    Attributes:
+        KEYRING_SERVICE (str): The name of the keyring service used for storing credentials.
+        service (str): The keyring service of this manager's account.
+        email (str): The user's email address.
+        password (str): The user's password.
+    """
+
+    KEYRING_SERVICE = "GarminConnect"
+
+    def __init__(self, account: str = None):
+        """
+        Initializes the CredentialsManager with email and password set to None.
+        """
+        self.account = account
+        self.service = f"{self.KEYRING_SERVICE}:{account}" if account else self.KEYRING_SERVICE
+        self.email = None
+        self.password = None
+
+    def load_credentials(self):
+        """
+        Retrieves the user's credentials without prompting, for non-interactive use.
+
+        For the default account, the GARMIN_EMAIL and GARMIN_PASSWORD environment variables take
+        precedence over the keyring.
+
+        Returns:
+            tuple: A tuple containing the email and password, either may be None if not stored.
+        """
+        if not self.account:
+            self.email = os.getenv("GARMIN_EMAIL")
+            self.password = os.getenv("GARMIN_PASSWORD")
+            if self.email and self.password:
+                return self.email, self.password
+        import keyring
+        from keyring.errors import KeyringError
+
+        try:
+            # Try to get email and password from keyring
+            self.email = keyring.get_password(self.service, "email")
+            self.password = keyring.get_password(self.service, "password")
+        except KeyringError as e:
+            logger.error(f"Error accessing keyring: {e}")
+            self.email = None
+            self.password = None
+        return self.email, self.password
+
+    def get_credentials(self):
+        """
+        Retrieves the user's credentials from the keyring or prompts the user to enter them.
+
+        This method first attempts to retrieve the email and password from the keyring. If the
+        credentials are not found or there is an error accessing the keyring, it prompts the user
+        to enter their email and password. The entered credentials are then stored in the keyring.
+
+        Returns:
+            tuple: A tuple containing the email and password.
+        """
+        import keyring
+        from keyring.errors import KeyringError
+
+        preset_email = self.email
+        self.load_credentials()
+        self.email = self.email or preset_email
+
+        if not self.email or not self.password:
+            self.email = self.email or Prompt.ask("Login e-mail")
+            self.password = Prompt.ask("Enter password", password=True)
+
+            # Store the credentials in keyring
+            try:
+                keyring.set_password(self.service, "email", self.email)
+                keyring.set_password(self.service, "password", self.password)
+            except KeyringError as e:
+                logger.error(f"Error storing credentials in keyring: {e}")
+                console.print("Could not store credentials securely. Proceeding without storing.")
+
+        return self.email, self.password
+    
+    def delete_credentials(self):
+        """
+        Deletes the stored credentials from the keyring.
+
+        This method attempts to delete the email and password from the keyring. If there is an error
+        during the deletion process, it logs the error and notifies the user.
+
+        """
+        import keyring
+        import keyring.errors
+
+        try:
+            keyring.delete_password(self.service, "email")
+            keyring.delete_password(self.service, "password")
+            console.print("Stored credentials have been deleted.", style="bold green")
+        except keyring.errors.KeyringError as e:
+            logger.error(f"Error deleting credentials from keyring: {e}")
             console.print("Could not delete credentials.", style="bold red")
\ No newline at end of file
@@ -1,65 +1,120 @@
-from typing import Dict
-from rich.console import Console
-from rich.table import Table
-from rich.prompt import Prompt
-
-console = Console()
-
-class Menu:
-    """
-    The Menu class provides a simple interface for creating and displaying a menu with selectable options.
-    Attributes:
-        options (Dict[str, str]): A dictionary to store menu options with their keys and descriptions.
-    Methods:
-        __init__():
-            Initializes the Menu instance with an empty options dictionary.
-        add_option(key: str, description: str) -> None:
-            Adds an option to the menu with the given key and description.
-        display() -> None:
-            Displays the menu options in a formatted table using the rich library.
-        get_selection() -> str:
-            Prompts the user to make a selection from the available menu options and returns the selected key.
-    """
-    def __init__(self):
-        self.options: Dict[str, str] = {}
-
-    def add_option(self, key: str, description: str) -> None:
-        """
-        Adds an option to the menu.
-
-        Args:
-            key (str): The key for the option.
-            description (str): The description of the option.
-
-        Returns:
-            None
-        """
-        self.options[key] = description
-
-    def display(self) -> None:
-        """
-        Displays a menu using the rich library's Table component.
-        This method creates a table with two columns: "Key" and "Description".
-        It iterates over the `self.options` dictionary, adding each key and its
-        corresponding description as a row in the table. Finally, it prints the
-        table to the console.
-        Returns:
-            None
-        """
-        table = Table(title="Garmin Connect API Menu")
-        table.add_column("Key", style="cyan", no_wrap=True)
-        table.add_column("Description", style="magenta")
-
-        for key, description in self.options.items():
-            table.add_row(key, description)
-
-        console.print(table)
-
-    def get_selection(self) -> str:
-        """
-        Prompts the user to make a selection from the available options.
-
-        Returns:
-            str: The user's selection as a string.
-        """
-        return Prompt.ask("Make your selection", choices=list(self.options.keys()))
+from typing import Dict, List
+import os
+from rich.console import Console
+from rich.table import Table
+from rich.prompt import Prompt
+
+console = Console()
+
+class Menu:
+    """
+    The Menu class provides a simple interface for creating and displaying a menu with selectable options.
+    Attributes:
+        options (Dict[str, str]): A dictionary to store menu options with their keys and descriptions.
+        presets (Dict[str, List[str]]): Named groups of option keys that can be selected together.
+    Methods:
+        __init__():
+            Initializes the Menu instance with an empty options dictionary.
+        add_option(key: str, description: str) -> None:
+            Adds an option to the menu with the given key and description.
+        add_preset(name: str, keys: List[str]) -> None:
+            Adds a named group of option keys.
+        display() -> None:
+            Displays the menu options in a formatted table using the rich library.
+        get_selection() -> str:
+            Prompts the user to make a selection from the available menu options and returns the selected key.
+        get_selections(exclusive: List[str]) -> List[str]:
+            Prompts for one or more keys ("3,4,8") or a preset name and returns the selected keys.
+    """
+    # Presets can be extended with GARMIN_PRESETS, e.g. "morning=3,4,8,5,7;devices=0,9".
+    DEFAULT_PRESETS = {"morning": ["3", "4", "8", "5", "7"]}
+
+    def __init__(self):
+        self.options: Dict[str, str] = {}
+        self.presets: Dict[str, List[str]] = {name: list(keys) for name, keys in self.DEFAULT_PRESETS.items()}
+        for item in (os.getenv("GARMIN_PRESETS") or "").split(";"):
+            if "=" in item:
+                name, keys = item.split("=", 1)
+                self.presets[name.strip()] = [key.strip() for key in keys.split(",") if key.strip()]
+
+    def add_option(self, key: str, description: str) -> None:
+        """
+        Adds an option to the menu.
+
+        Args:
+            key (str): The key for the option.
+            description (str): The description of the option.
+
+        Returns:
+            None
+        """
+        self.options[key] = description
+
+    def add_preset(self, name: str, keys: List[str]) -> None:
+        """
+        Adds a named group of option keys that can be selected together.
+
+        Args:
+            name (str): The preset name typed at the prompt.
+            keys (List[str]): The option keys the preset stands for.
+
+        Returns:
+            None
+        """
+        self.presets[name] = list(keys)
+
+    def display(self) -> None:
+        """
+        Displays a menu using the rich library's Table component.
+        This method creates a table with two columns: "Key" and "Description".
+        It iterates over the `self.options` dictionary, adding each key and its
+        corresponding description as a row in the table. Finally, it prints the
+        table to the console.
+        Returns:
+            None
+        """
+        table = Table(title="Garmin Connect API Menu")
+        table.add_column("Key", style="cyan", no_wrap=True)
+        table.add_column("Description", style="magenta")
+
+        for key, description in self.options.items():
+            table.add_row(key, description)
+        for name, keys in self.presets.items():
+            table.add_row(name, f"Preset: {', '.join(keys)}")
+
+        console.print(table)
+        console.print("Several keys can be run together, e.g. 3,4,8", style="dim")
+
+    def get_selection(self) -> str:
+        """
+        Prompts the user to make a selection from the available options.
+
+        Returns:
+            str: The user's selection as a string.
+        """
+        return Prompt.ask("Make your selection", choices=list(self.options.keys()))
+
+    def get_selections(self, exclusive: List[str] = ()) -> List[str]:
+        """
+        Prompts the user for one or more options, as a comma separated list of keys or a preset name.
+
+        Args:
+            exclusive (List[str], optional): Keys that may only be selected on their own, e.g. exit options.
+
+        Returns:
+            List[str]: The selected keys in the order given, without duplicates.
+        """
+        while True:
+            answer = Prompt.ask("Make your selection").strip()
+            if answer in self.presets:
+                keys = self.presets[answer]
+            else:
+                keys = [key.strip() for key in answer.split(",") if key.strip()]
+            keys = list(dict.fromkeys(keys))
+            unknown = [key for key in keys if key not in self.options]
+            if not keys or unknown:
+                console.print(f"Please select one of the available options{': ' + ', '.join(unknown) if unknown else ''}.", style="bold red")
+            elif len(keys) > 1 and any(key in exclusive for key in keys):
+                console.print(f"{', '.join(k for k in keys if k in exclusive)} cannot be combined with other options.", style="bold red")
+            else:
+                return keys
@@ -0,0 +1,215 @@
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from modules.detail_decoder import DecodedDetails, decode_details, start_epoch
+
+# Detail metrics that accumulate over a recording. When recordings are joined, later
+# recordings are offset by the final value of the earlier ones.
+CUMULATIVE_PREFIX = "sum"
+HEART_RATE_KEY = "directHeartRate"
+DISTANCE_KEY = "sumDistance"
+
+
+def _start_epoch(activity: Dict[str, Any]) -> float:
+    start = start_epoch(activity)
+    if start is None:
+        raise ValueError(f"Activity {activity.get('activityId')} has no startTimeGMT.")
+    return start
+
+
+def detail_streams(details: Union[Dict[str, Any], DecodedDetails], activity: Dict[str, Any]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Converts a `get_activity_details` payload into per-metric arrays.
+
+    Args:
+        details (Union[Dict[str, Any], DecodedDetails]): The payload with metricDescriptors and
+            activityDetailMetrics, or the already decoded details.
+        activity (Dict[str, Any]): The activity summary, used when samples carry no timestamp.
+
+    Returns:
+        tuple: (timestamps, metrics). Timestamps are epoch seconds, metrics map descriptor keys to float arrays.
+    """
+    if not isinstance(details, DecodedDetails):
+        try:
+            details = decode_details(details, start_epoch(activity))
+        except ValueError:
+            raise ValueError(f"Activity {activity.get('activityId')} details carry no time axis.") from None
+    return details.timestamps, details.streams()
+
+
+def _resample(grid: np.ndarray, times: np.ndarray, values: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    out = np.full(grid.shape, np.nan)
+    if valid.sum() < 2:
+        return out
+    inside = (grid >= times[valid][0]) & (grid <= times[valid][-1])
+    out[inside] = np.interp(grid[inside], times[valid], values[valid])
+    return out
+
+
+def merge_streams(recordings: List[Tuple[np.ndarray, Dict[str, np.ndarray]]], step: float = 1.0) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Aligns recordings on a common timebase and joins them into one set of streams.
+
+    Every metric is linearly resampled onto a uniform grid spanning all recordings. Where
+    recordings overlap the earlier one wins, gaps between recordings stay NaN, and cumulative
+    metrics of later recordings are offset so they continue from the earlier totals.
+
+    Args:
+        recordings (List[tuple]): (timestamps, metrics) pairs as returned by `detail_streams`, in start order.
+        step (float, optional): The grid spacing in seconds. Defaults to 1.0.
+
+    Returns:
+        tuple: (grid, metrics) with the grid in epoch seconds and one float array per metric.
+    """
+    recordings = [r for r in recordings if len(r[0])]
+    if not recordings:
+        return np.empty(0), {}
+    start = min(times[0] for times, _ in recordings)
+    end = max(times[-1] for times, _ in recordings)
+    grid = start + np.arange(0, end - start + step, step)
+    keys = sorted({key for _, metrics in recordings for key in metrics})
+
+    merged = {key: np.full(grid.shape, np.nan) for key in keys}
+    offsets = dict.fromkeys(keys, 0.0)
+    for times, metrics in recordings:
+        for key in keys:
+            if key not in metrics:
+                continue
+            values = metrics[key]
+            if key.startswith(CUMULATIVE_PREFIX):
+                values = values + offsets[key]
+                if np.any(~np.isnan(values)):
+                    offsets[key] = np.nanmax(values)
+            resampled = _resample(grid, times, values)
+            target = merged[key]
+            fill = np.isnan(target) & ~np.isnan(resampled)
+            target[fill] = resampled[fill]
+    return grid, merged
+
+
+def distance_laps(grid: np.ndarray, metrics: Dict[str, np.ndarray], lap_distance: float = 1000.0) -> List[Dict[str, Any]]:
+    """
+    Splits merged streams into laps of a fixed distance.
+
+    Args:
+        grid (np.ndarray): The uniform time grid in epoch seconds.
+        metrics (Dict[str, np.ndarray]): The merged metric streams.
+        lap_distance (float, optional): Lap length in meters. Defaults to 1000.
+
+    Returns:
+        List[Dict[str, Any]]: One dict per lap with distance, duration, averageSpeed and averageHR.
+    """
+    distance = metrics.get(DISTANCE_KEY)
+    if distance is None or len(grid) == 0 or np.all(np.isnan(distance)):
+        return []
+    # Carry the last known distance through gaps so the series stays monotonic.
+    known = ~np.isnan(distance)
+    filled = distance[np.maximum.accumulate(np.where(known, np.arange(len(distance)), 0))]
+    filled[:np.argmax(known)] = 0.0
+
+    marks = np.arange(lap_distance, filled[-1], lap_distance)
+    bounds = np.concatenate(([0], np.searchsorted(filled, marks), [len(grid) - 1]))
+    bounds = np.unique(bounds)
+
+    hr = metrics.get(HEART_RATE_KEY, np.full(grid.shape, np.nan))
+    hr_valid = ~np.isnan(hr)
+    hr_sum = np.concatenate(([0.0], np.cumsum(np.where(hr_valid, hr, 0.0))))
+    hr_count = np.concatenate(([0], np.cumsum(hr_valid)))
+
+    starts, ends = bounds[:-1], bounds[1:]
+    lap_distances = filled[ends] - filled[starts]
+    lap_durations = grid[ends] - grid[starts]
+    counts = hr_count[ends] - hr_count[starts]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lap_hr = np.where(counts > 0, (hr_sum[ends] - hr_sum[starts]) / counts, np.nan)
+        lap_speed = np.where(lap_durations > 0, lap_distances / lap_durations, np.nan)
+
+    return [
+        {
+            "lapIndex": i + 1,
+            "distance": float(lap_distances[i]),
+            "duration": float(lap_durations[i]),
+            "averageSpeed": None if np.isnan(lap_speed[i]) else float(lap_speed[i]),
+            "averageHR": None if np.isnan(lap_hr[i]) else float(lap_hr[i]),
+        }
+        for i in range(len(starts))
+    ]
+
+
+def _total(activities: List[Dict[str, Any]], key: str) -> Optional[float]:
+    values = [a[key] for a in activities if a.get(key) is not None]
+    return float(sum(values)) if values else None
+
+
+def _nan_stat(func, values: Optional[np.ndarray]) -> Optional[float]:
+    if values is None or np.all(np.isnan(values)):
+        return None
+    return float(func(values))
+
+
+def merge_activities(activities: List[Dict[str, Any]], details: List[Union[Dict[str, Any], DecodedDetails]], step: float = 1.0) -> Dict[str, Any]:
+    """
+    Merges activities of the same type into a single combined activity.
+
+    Args:
+        activities (List[Dict[str, Any]]): Activity summaries, all of the same activity type.
+        details (List[Union[Dict[str, Any], DecodedDetails]]): The `get_activity_details` payload or the
+            decoded details of each activity, in the same order.
+        step (float, optional): The resampling interval in seconds. Defaults to 1.0.
+
+    Returns:
+        Dict[str, Any]: A summary in Garmin field names with recomputed totals and averages,
+        plus "laps" (one per source activity), "splits" (one per kilometre) and the merged "streams".
+
+    Raises:
+        ValueError: If fewer than two activities are given or their types differ.
+    """
+    if len(activities) < 2:
+        raise ValueError("At least two activities are needed for a merge.")
+    types = {(a.get("activityType") or {}).get("typeKey") for a in activities}
+    if len(types) != 1:
+        raise ValueError(f"Only activities of the same type can be merged, got: {', '.join(map(str, types))}.")
+
+    pairs = sorted(zip(activities, details), key=lambda pair: _start_epoch(pair[0]))
+    activities = [a for a, _ in pairs]
+    grid, metrics = merge_streams([detail_streams(d, a) for a, d in pairs], step)
+
+    distance = _total(activities, "distance")
+    duration = _total(activities, "duration")
+    hr = metrics.get(HEART_RATE_KEY)
+    first = activities[0]
+    merged = {
+        "activityName": f"{first.get('activityName') or 'Activity'} (merged)",
+        "activityType": first.get("activityType"),
+        "startTimeLocal": first.get("startTimeLocal"),
+        "startTimeGMT": first.get("startTimeGMT"),
+        "mergedActivityIds": [a.get("activityId") for a in activities],
+        "distance": distance,
+        "duration": duration,
+        "elapsedDuration": float(grid[-1] - grid[0]) if len(grid) else duration,
+        "movingDuration": _total(activities, "movingDuration"),
+        "elevationGain": _total(activities, "elevationGain"),
+        "elevationLoss": _total(activities, "elevationLoss"),
+        "calories": _total(activities, "calories"),
+        "averageSpeed": distance / duration if distance and duration else None,
+        "maxSpeed": max((a["maxSpeed"] for a in activities if a.get("maxSpeed") is not None), default=None),
+        "averageHR": _nan_stat(np.nanmean, hr),
+        "maxHR": _nan_stat(np.nanmax, hr),
+    }
+    merged["laps"] = [
+        {
+            "lapIndex": i + 1,
+            "sourceActivityId": a.get("activityId"),
+            "startTimeLocal": a.get("startTimeLocal"),
+            "distance": a.get("distance"),
+            "duration": a.get("duration"),
+            "averageSpeed": a.get("averageSpeed"),
+            "averageHR": a.get("averageHR"),
+        }
+        for i, a in enumerate(activities)
+    ]
+    merged["splits"] = distance_laps(grid, metrics)
+    merged["streams"] = {"timestamp": grid, **metrics}
+    return merged
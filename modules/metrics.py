@@ -0,0 +1,201 @@
+import asyncio
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+PREFIX = "garmin_"
+QUANTILES = (0.5, 0.95, 0.99)
+
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _series(name: str, labels: Dict[str, Any]) -> SeriesKey:
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Timing:
+    """
+    Aggregated durations of one series: count, sum, min, max and a window of recent samples for quantiles.
+    """
+
+    __slots__ = ("count", "total", "min", "max", "recent")
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "min": round(self.min, 6) if self.count else 0.0,
+            "max": round(self.max, 6),
+            **{f"p{int(q * 100)}": round(self.quantile(q), 6) for q in QUANTILES},
+        }
+
+
+class MetricsRegistry:
+    """
+    A thread-safe registry of counters and timings, labelled like Prometheus series.
+
+    Timings keep exact counts and sums plus the most recent `window` samples for quantiles, so
+    memory stays bounded however long the session runs.
+
+    Args:
+        window (int, optional): Samples kept per timing series for quantiles. Defaults to 1024.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self.started = time.time()
+        self._counters: Dict[SeriesKey, float] = {}
+        self._timings: Dict[SeriesKey, Timing] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        key = _series(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        key = _series(name, labels)
+        with self._lock:
+            timing = self._timings.get(key)
+            if timing is None:
+                timing = self._timings[key] = Timing(self.window)
+            timing.add(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """
+        Context manager recording the duration of its block. Failing blocks are also counted
+        in `<name>_errors`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.increment(f"{name}_errors", **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns all series as plain data.
+
+        Returns:
+            Dict[str, Any]: {"uptime": seconds, "counters": [...], "timings": [...]}, every series
+                being a dict with "name", "labels" and its values.
+        """
+        with self._lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            timings = [{"name": name, "labels": dict(labels), **timing.to_dict()}
+                       for (name, labels), timing in sorted(self._timings.items())]
+        return {"uptime": round(time.time() - self.started, 3), "counters": counters, "timings": timings}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """
+        Renders all series in the Prometheus text exposition format.
+
+        Counters become `garmin_<name>_total`, timings become summaries `garmin_<name>_seconds`.
+        """
+        def labels_text(labels: Dict[str, str], **extra) -> str:
+            items = {**labels, **extra}
+            if not items:
+                return ""
+            return "{" + ",".join(f'{key}="{str(value)}"' for key, value in items.items()) + "}"
+
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+        for series in snapshot["counters"]:
+            name = f"{PREFIX}{series['name']}_total"
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{labels_text(series['labels'])} {series['value']}")
+        for series in snapshot["timings"]:
+            name = f"{PREFIX}{series['name']}_seconds"
+            if name not in typed:
+                lines.append(f"# TYPE {name} summary")
+                typed.add(name)
+            for q in QUANTILES:
+                lines.append(f"{name}{labels_text(series['labels'], quantile=q)} {series[f'p{int(q * 100)}']}")
+            lines.append(f"{name}_sum{labels_text(series['labels'])} {series['sum']}")
+            lines.append(f"{name}_count{labels_text(series['labels'])} {series['count']}")
+        return "\n".join(lines) + "\n"
+
+
+_registry_lock = threading.Lock()
+_registry: Optional[MetricsRegistry] = None
+
+
+def metrics() -> MetricsRegistry:
+    """
+    Returns the process-wide metrics registry, creating it on first use.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
+
+
+def timed(func: Callable, name: str, **labels) -> Callable:
+    """
+    Wraps a function or coroutine function so that every call is recorded as timing `name`.
+    """
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with metrics().timer(name, **labels):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with metrics().timer(name, **labels):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def instrument_plugin(plugin) -> None:
+    """
+    Times the fetch, render and execute calls of a plugin instance, labelled by command key and phase.
+
+    Timing fetch and render separately shows whether a slow option waits on the network or on
+    rendering; `execute` covers the whole run including prompts.
+    """
+    for phase in ("fetch", "fetch_async", "render", "execute"):
+        method = getattr(plugin, phase, None)
+        if method is not None:
+            setattr(plugin, phase, timed(method, "plugin", plugin=plugin.command_key, phase=phase))
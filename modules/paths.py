@@ -0,0 +1,31 @@
+import os
+
+
+def data_dir() -> str:
+    """
+    Returns the directory used for locally stored data (caches, stores, exports).
+
+    The location can be overridden with the GARMINDATA environment variable, in the
+    same way GARMINTOKENS overrides the token store directory.
+
+    Returns:
+        str: The expanded path of the data directory. The directory is created if missing.
+    """
+    path = os.path.expanduser(os.getenv("GARMINDATA") or "~/.garminconnect_data")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def data_path(*parts: str) -> str:
+    """
+    Builds a path inside the data directory, creating parent directories as needed.
+
+    Args:
+        *parts (str): Path components relative to the data directory.
+
+    Returns:
+        str: The absolute path.
+    """
+    path = os.path.join(data_dir(), *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
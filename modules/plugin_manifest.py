@@ -0,0 +1,133 @@
+import importlib
+import json
+import logging
+import os
+from typing import Any, Dict, List
+
+from modules.metrics import instrument_plugin
+from modules.paths import data_path
+from plugins.base_plugin import BasePlugin
+from plugins.plugin_types import PluginType
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+class LazyPlugin:
+    """
+    A stand-in for a plugin that imports the plugin module only when it is first used.
+
+    The menu metadata (command key, description and plugin type) comes from the manifest, so
+    building the menu does not import any plugin module. Any other attribute access, including
+    `execute`, loads the real plugin instance and delegates to it.
+
+    Args:
+        module (str): The dotted module name, e.g. "plugins.get_stats".
+        class_name (str): The name of the BasePlugin subclass in that module.
+        command_key (str): The menu key of the plugin.
+        description (str): The menu description of the plugin.
+        plugin_type (PluginType): The plugin type.
+    """
+
+    def __init__(self, module: str, class_name: str, command_key: str, description: str, plugin_type: PluginType):
+        self.module = module
+        self.class_name = class_name
+        self.command_key = command_key
+        self.description = description
+        self.plugin_type = plugin_type
+        self._instance = None
+
+    def load(self) -> BasePlugin:
+        """
+        Imports the plugin module and instantiates the plugin, once.
+
+        Returns:
+            BasePlugin: The plugin instance.
+        """
+        if self._instance is None:
+            plugin_class = getattr(importlib.import_module(self.module), self.class_name)
+            self._instance = plugin_class()
+            instrument_plugin(self._instance)
+        return self._instance
+
+    def execute(self, *args, **kwargs):
+        return self.load().execute(*args, **kwargs)
+
+    def __getattr__(self, name: str):
+        if name.startswith("__") or name == "_instance":
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+
+def _scan_module(module_name: str) -> List[Dict[str, Any]]:
+    module = importlib.import_module(module_name)
+    entries = []
+    for item in dir(module):
+        item = getattr(module, item)
+        if isinstance(item, type) and issubclass(item, BasePlugin) and item != BasePlugin:
+            plugin = item()
+            entries.append({
+                "class_name": item.__name__,
+                "command_key": plugin.command_key,
+                "description": plugin.description,
+                "plugin_type": plugin.plugin_type.name,
+            })
+    return entries
+
+
+def load_plugins(plugin_dir: str, package: str = "plugins") -> Dict[str, LazyPlugin]:
+    """
+    Discovers plugins from a cached manifest, importing only modules that changed.
+
+    The manifest records the plugins of every module in `plugin_dir` together with the module
+    file's modification time. Modules whose mtime differs from the manifest (or that are new)
+    are imported once to refresh their entries; entries of deleted modules are dropped.
+
+    Args:
+        plugin_dir (str): The directory containing plugin modules.
+        package (str, optional): The package name of the plugin directory. Defaults to "plugins".
+
+    Returns:
+        Dict[str, LazyPlugin]: Lazy plugins keyed by command key.
+    """
+    manifest_path = data_path("plugin_manifest.json")
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("plugin_dir") != plugin_dir:
+        manifest = {"version": MANIFEST_VERSION, "plugin_dir": plugin_dir, "modules": {}}
+
+    modules = {}
+    changed = False
+    for filename in sorted(os.listdir(plugin_dir)):
+        if not filename.endswith('.py') or filename == 'base_plugin.py':
+            continue
+        mtime = os.path.getmtime(os.path.join(plugin_dir, filename))
+        cached = manifest["modules"].get(filename)
+        if cached is None or cached["mtime"] != mtime:
+            logger.debug(f"Refreshing plugin manifest entry for {filename}.")
+            cached = {"mtime": mtime, "plugins": _scan_module(f"{package}.{filename[:-3]}")}
+            changed = True
+        modules[filename] = cached
+    if changed or modules.keys() != manifest["modules"].keys():
+        manifest["modules"] = modules
+        try:
+            with open(manifest_path, "w") as f:
+                json.dump(manifest, f, indent=2)
+        except OSError as err:
+            logger.warning(f"Could not write plugin manifest: {err}")
+
+    plugins = {}
+    for filename, entry in modules.items():
+        for plugin in entry["plugins"]:
+            plugins[plugin["command_key"]] = LazyPlugin(
+                f"{package}.{filename[:-3]}",
+                plugin["class_name"],
+                plugin["command_key"],
+                plugin["description"],
+                PluginType[plugin["plugin_type"]],
+            )
+    return plugins
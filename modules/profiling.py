@@ -0,0 +1,73 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from modules.paths import data_path
+
+logger = logging.getLogger(__name__)
+
+
+def default_profile_dir() -> str:
+    return os.path.dirname(data_path("profiles", "report"))
+
+
+@contextmanager
+def profile_run(label: str, directory: Optional[str] = None, top: int = 40):
+    """
+    Profiles the enclosed block with cProfile and tracemalloc and writes the reports to disk.
+
+    Three files are written per run, named `<timestamp>_<label>`:
+        - `.prof`: the raw cProfile data, for pstats or snakeviz.
+        - `_cpu.txt`: the `top` functions by cumulative time.
+        - `_memory.txt`: the peak traced memory and the `top` allocation sites still held at the end.
+
+    Args:
+        label (str): A name for the run, e.g. the selected command keys.
+        directory (str, optional): The report directory. Defaults to `profiles` in the data directory.
+        top (int, optional): The number of entries listed in the text reports. Defaults to 40.
+
+    Yields:
+        Dict[str, str]: Filled with the report paths once the block has finished.
+    """
+    directory = directory or default_profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"{time.strftime('%Y%m%d_%H%M%S')}_{re.sub(r'[^A-Za-z0-9]+', '_', label)}")
+    reports: Dict[str, str] = {}
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(25)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield reports
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if not was_tracing:
+            tracemalloc.stop()
+
+        reports["profile"] = base + ".prof"
+        profiler.dump_stats(reports["profile"])
+
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).strip_dirs().sort_stats("cumulative").print_stats(top)
+        reports["cpu"] = base + "_cpu.txt"
+        with open(reports["cpu"], "w") as f:
+            f.write(stream.getvalue())
+
+        reports["memory"] = base + "_memory.txt"
+        with open(reports["memory"], "w") as f:
+            f.write(f"Peak traced memory: {peak / 2 ** 20:.2f} MB\n")
+            f.write(f"Held at the end: {current / 2 ** 20:.2f} MB\n\n")
+            for stat in snapshot.statistics("lineno")[:top]:
+                f.write(f"{stat}\n")
+        logger.info(f"Profile reports written to {base}*")
@@ -0,0 +1,323 @@
+import asyncio
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from modules.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# URL path prefix -> endpoint family. Requests to other hosts (SSO, OAuth) are not limited.
+ENDPOINT_FAMILIES = (
+    ("/activitylist-service", "activities"),
+    ("/activity-service", "activity_details"),
+    ("/download-service", "downloads"),
+    ("/usersummary-service", "wellness"),
+    ("/wellness-service", "wellness"),
+    ("/hrv-service", "wellness"),
+    ("/weight-service", "wellness"),
+)
+
+# Family -> (requests per second, burst). Overridden with GARMIN_RATE_LIMITS, e.g.
+# "activities=2:5,downloads=0.5:2".
+DEFAULT_BUDGETS = {
+    "activities": (2.0, 5),
+    "activity_details": (2.0, 5),
+    "downloads": (1.0, 3),
+    "wellness": (4.0, 8),
+    "default": (4.0, 8),
+}
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def parse_budgets(spec: Optional[str]) -> Dict[str, Tuple[float, int]]:
+    """
+    Parses a budget override string of the form "family=rate:burst,...".
+
+    Args:
+        spec (str, optional): The override string.
+
+    Returns:
+        Dict[str, Tuple[float, int]]: The default budgets updated with the overrides.
+    """
+    budgets = dict(DEFAULT_BUDGETS)
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        family, value = item.split("=", 1)
+        rate, _, burst = value.partition(":")
+        try:
+            budgets[family.strip()] = (float(rate), int(burst or max(1, float(rate))))
+        except ValueError:
+            logger.warning(f"Ignoring invalid rate limit '{item}'.")
+    return budgets
+
+
+def endpoint_family(url: str) -> Optional[str]:
+    """
+    Maps a request URL to its endpoint family.
+
+    Args:
+        url (str): The request URL.
+
+    Returns:
+        str: The family name, "default" for other Connect API paths, or None for hosts that are not limited.
+    """
+    parsed = urlparse(url)
+    if not parsed.hostname or not parsed.hostname.startswith("connectapi."):
+        return None
+    return path_family(parsed.path)
+
+
+def path_family(path: str) -> str:
+    """
+    Maps a Connect API path to its endpoint family.
+
+    Args:
+        path (str): The request path, e.g. "/hrv-service/hrv/2024-05-01".
+
+    Returns:
+        str: The family name, "default" for paths outside the known families.
+    """
+    for prefix, family in ENDPOINT_FAMILIES:
+        if path.startswith(prefix):
+            return family
+    return "default"
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a Retry-After header given either as seconds or as an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket whose refill rate adapts to server feedback.
+
+    The effective rate is cut in half whenever the server throttles (AIMD) and recovers
+    additively with every successful response, never exceeding the configured rate. A server
+    requested pause (Retry-After) blocks all callers of the bucket until it has elapsed.
+
+    Args:
+        rate (float): The configured refill rate in tokens per second.
+        burst (int): The bucket capacity.
+    """
+
+    MIN_RATE_FACTOR = 0.05
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.factor = 1.0
+        self.tokens = float(burst)
+        self.paused_until = 0.0
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate * self.factor)
+        self.updated = now
+
+    def try_acquire(self) -> float:
+        """
+        Takes a token if one is available, without waiting.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds to wait before trying again.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self.paused_until:
+                return self.paused_until - now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / (self.rate * self.factor)
+
+    def acquire(self) -> float:
+        """
+        Blocks until a token is available and takes it.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    async def acquire_async(self) -> float:
+        """
+        Waits on the running event loop until a token is available and takes it.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def throttled(self, pause: float) -> None:
+        """
+        Records a throttling response: halves the rate and pauses the bucket.
+
+        Args:
+            pause (float): Seconds during which no request may be sent.
+        """
+        with self._lock:
+            self.factor = max(self.factor / 2, self.MIN_RATE_FACTOR)
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            self.tokens = 0.0
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self.factor = min(1.0, self.factor + 0.05)
+
+
+class RateLimiter:
+    """
+    Paces Garmin Connect API requests per endpoint family and schedules retries.
+
+    Args:
+        budgets (Dict[str, Tuple[float, int]], optional): Requests per second and burst per family.
+            Defaults to DEFAULT_BUDGETS updated with GARMIN_RATE_LIMITS.
+        max_retries (int, optional): Retries of throttled or failed responses. Defaults to 5.
+        base_delay (float, optional): The first backoff delay in seconds. Defaults to 1.
+        max_delay (float, optional): The maximum backoff delay in seconds. Defaults to 60.
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, Tuple[float, int]]] = None, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 60.0):
+        self.budgets = budgets or parse_budgets(os.getenv("GARMIN_RATE_LIMITS"))
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.retries = 0
+        self.throttled = 0
+        self.wait_time = 0.0
+        self._lock = threading.Lock()
+
+    def bucket(self, family: str) -> TokenBucket:
+        with self._lock:
+            if family not in self.buckets:
+                rate, burst = self.budgets.get(family, self.budgets["default"])
+                self.buckets[family] = TokenBucket(rate, burst)
+            return self.buckets[family]
+
+    def before_request(self, family: str) -> None:
+        self._waited(family, self.bucket(family).acquire())
+
+    async def before_request_async(self, family: str) -> None:
+        self._waited(family, await self.bucket(family).acquire_async())
+
+    def _waited(self, family: str, waited: float) -> None:
+        if waited:
+            with self._lock:
+                self.wait_time += waited
+            metrics().observe("rate_limit_wait", waited, family=family)
+
+    def retry_delay(self, family: str, attempt: int, status: int, retry_after: Optional[str]) -> Optional[float]:
+        """
+        Decides whether a response should be retried and how long to wait first.
+
+        Uses the Retry-After header when present, capped at `max_delay`, otherwise exponential backoff
+        with full jitter.
+
+        Args:
+            family (str): The endpoint family of the request.
+            attempt (int): The number of retries already made for this request.
+            status (int): The response status code.
+            retry_after (str, optional): The Retry-After header value.
+
+        Returns:
+            float: Seconds to wait before retrying, or None if the response should be returned as is.
+        """
+        bucket = self.bucket(family)
+        if status not in RETRY_STATUSES:
+            bucket.succeeded()
+            return None
+        if attempt >= self.max_retries:
+            return None
+        delay = retry_after_seconds(retry_after)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        else:
+            # A Retry-After of hours would otherwise hang the CLI.
+            delay = min(delay, self.max_delay)
+        with self._lock:
+            self.retries += 1
+            if status == 429:
+                self.throttled += 1
+        if status == 429:
+            bucket.throttled(delay)
+        logger.info(f"Garmin Connect answered {status} for {family}, retrying in {delay:.1f}s.")
+        return delay
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "wait_time": round(self.wait_time, 3),
+                "rates": {family: round(b.rate * b.factor, 3) for family, b in self.buckets.items()},
+            }
+
+
+_limiter_lock = threading.Lock()
+_limiter: Optional[RateLimiter] = None
+
+
+def shared_limiter() -> RateLimiter:
+    """
+    Returns the process-wide rate limiter, creating it on first use.
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+
+def reset_shared_limiter() -> None:
+    """
+    Drops the process-wide rate limiter, the next one reads GARMIN_RATE_LIMITS again.
+    """
+    global _limiter
+    with _limiter_lock:
+        _limiter = None
+
+
+def is_rate_limited(err: Exception) -> bool:
+    """
+    Tells whether an exception raised by an API call is a throttling (HTTP 429) response.
+    """
+    error = getattr(err, "error", err)
+    response = getattr(error, "response", None)
+    # requests errors carry the response, aiohttp errors carry the status itself.
+    return getattr(response, "status_code", None) == 429 or getattr(error, "status", None) == 429
@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from modules.activity_record import ActivityRecord
+
+
+class ResultEntry:
+    """
+    A retrieval result kept in the session store.
+
+    Attributes:
+        command_key (str): The command key of the plugin that produced the data.
+        params (Dict[str, Any]): The arguments the plugin was run with.
+        data (Any): The returned data.
+        size (int): The approximate size of the data in bytes.
+        created (float): The time the result was stored.
+    """
+
+    __slots__ = ("command_key", "params", "data", "size", "created")
+
+    def __init__(self, command_key: str, params: Dict[str, Any], data: Any, size: int):
+        self.command_key = command_key
+        self.params = params
+        self.data = data
+        self.size = size
+        self.created = time.time()
+
+    @property
+    def items(self) -> int:
+        if isinstance(self.data, list):
+            return len(self.data)
+        return 0 if self.data is None else 1
+
+    def describe(self) -> str:
+        if not self.params:
+            return "(no arguments)"
+        return ", ".join(f"{key}={value}" for key, value in self.params.items() if value is not None)
+
+
+class ResultStore:
+    """
+    An in-memory, size-bounded store of retrieval results for the current session.
+
+    Results are keyed by command key and arguments. When the total approximate size exceeds
+    `max_bytes`, the least recently used results are dropped.
+
+    Args:
+        max_bytes (int, optional): The memory budget in bytes. Defaults to 256 MB.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, ResultEntry]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(command_key: str, params: Dict[str, Any]) -> str:
+        return json.dumps([command_key, sorted((params or {}).items())], default=str)
+
+    @staticmethod
+    def _estimate_size(data: Any) -> int:
+        # Compact JSON length is a cheap, stable proxy for the memory held by parsed JSON.
+        if isinstance(data, list) and data and all(isinstance(item, ActivityRecord) for item in data):
+            # Records hold their compact JSON already.
+            return sum(record.nbytes for record in data)
+        try:
+            return len(json.dumps(data, separators=(",", ":"), default=str))
+        except (TypeError, ValueError):
+            return 0
+
+    def put(self, command_key: str, params: Dict[str, Any], data: Any) -> Optional[ResultEntry]:
+        """
+        Stores a result, replacing an earlier result with the same key and arguments.
+
+        Args:
+            command_key (str): The plugin command key.
+            params (Dict[str, Any]): The arguments of the run.
+            data (Any): The returned data.
+
+        Returns:
+            ResultEntry: The stored entry, or None if the result alone exceeds the budget.
+        """
+        size = self._estimate_size(data)
+        if size > self.max_bytes:
+            return None
+        key = self._key(command_key, params)
+        entry = ResultEntry(command_key, dict(params or {}), data, size)
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key).size
+            self._entries[key] = entry
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+        return entry
+
+    def get(self, command_key: str, params: Dict[str, Any]) -> Optional[ResultEntry]:
+        key = self._key(command_key, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def entries(self, command_key: Optional[str] = None) -> List[ResultEntry]:
+        """
+        Returns stored results, most recently used first.
+
+        Args:
+            command_key (str, optional): Only return results of this plugin.
+        """
+        with self._lock:
+            entries = list(reversed(self._entries.values()))
+        if command_key is not None:
+            entries = [entry for entry in entries if entry.command_key == command_key]
+        return entries
+
+    def touch(self, entry: ResultEntry) -> None:
+        key = self._key(entry.command_key, entry.params)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
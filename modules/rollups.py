@@ -0,0 +1,274 @@
+import datetime
+import json
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from modules.columnar_store import ColumnarActivityStore
+from modules.paths import data_path
+
+logger = logging.getLogger(__name__)
+
+PERIODS = ("day", "week", "month")
+OTHER_TYPE = "other"
+# Additive measures stored per (period, bucket, activity type). Averages are derived when read.
+SUMS = ("count", "distance", "duration", "moving_duration", "elevation_gain", "calories", "hr_weighted", "hr_duration")
+
+
+def bucket_start(period: str, date: str) -> str:
+    """
+    Returns the first day of the bucket of `period` containing `date` (weeks start on Monday).
+
+    Args:
+        period (str): "day", "week" or "month".
+        date (str): A date in YYYY-MM-DD format.
+
+    Returns:
+        str: The bucket start in YYYY-MM-DD format.
+    """
+    day = datetime.date.fromisoformat(date)
+    if period == "week":
+        day -= datetime.timedelta(days=day.weekday())
+    elif period == "month":
+        day = day.replace(day=1)
+    return day.isoformat()
+
+
+def bucket_end(period: str, bucket: str) -> str:
+    """
+    Returns the last day of the bucket of `period` starting on `bucket`.
+
+    Args:
+        period (str): "day", "week" or "month".
+        bucket (str): The bucket start in YYYY-MM-DD format.
+
+    Returns:
+        str: The last day of the bucket in YYYY-MM-DD format.
+    """
+    day = datetime.date.fromisoformat(bucket)
+    if period == "week":
+        day += datetime.timedelta(days=6)
+    elif period == "month":
+        day = (day.replace(day=28) + datetime.timedelta(days=4)).replace(day=1) - datetime.timedelta(days=1)
+    return day.isoformat()
+
+
+def _measures(count, distance, duration, moving, elevation, calories, hr_weighted, hr_duration, max_hr) -> Dict[str, Any]:
+    return {
+        "count": int(count),
+        "distance": distance,
+        "duration": duration,
+        "movingDuration": moving,
+        "elevationGain": elevation,
+        "calories": calories,
+        "averageHR": hr_weighted / hr_duration if hr_duration else None,
+        "maxHR": max_hr,
+        "averageSpeed": distance / duration if duration else None,
+    }
+
+
+class RollupStore:
+    """
+    Materialized training totals per day, week and month and per activity type, in SQLite.
+
+    Rollups are built from the `ColumnarActivityStore` with vectorized group-bys. Only rows
+    appended since the last update are aggregated and added to the stored totals, so keeping
+    the rollups current after a sync costs time proportional to the new activities. Every
+    stored measure is additive (sums, counts, duration-weighted heart rate, maximum), which is
+    what makes the incremental update exact. When the columnar store was rewritten, after
+    edits or deletions were reconciled, the rollups are rebuilt from scratch.
+
+    Args:
+        path (str, optional): The SQLite database file. Defaults to `rollups.sqlite` in the data directory.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or data_path("rollups.sqlite")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rollups ("
+            " period TEXT NOT NULL,"
+            " bucket TEXT NOT NULL,"
+            " activity_type TEXT NOT NULL,"
+            + "".join(f" {name} REAL NOT NULL DEFAULT 0," for name in SUMS) +
+            " max_hr REAL,"
+            " PRIMARY KEY (period, bucket, activity_type))"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS rollup_state (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+
+    def _state(self) -> Dict[str, Any]:
+        row = self._conn.execute("SELECT value FROM rollup_state WHERE key = 'columnar'").fetchone()
+        return json.loads(row[0]) if row else {"generation": None, "rows": 0}
+
+    def update(self, columnar: ColumnarActivityStore) -> int:
+        """
+        Brings the rollups up to date with the columnar store.
+
+        Args:
+            columnar (ColumnarActivityStore): The columnar activity store.
+
+        Returns:
+            int: The number of activities aggregated, 0 if the rollups were current.
+        """
+        columns = ", ".join(SUMS)
+        updates = ", ".join(f"{name} = {name} + excluded.{name}" for name in SUMS)
+        with self._lock:
+            # Other stores on the same file (one per ActivitySync) may update concurrently. Reading
+            # the state, aggregating and writing under one write lock keeps every row counted once.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                state = self._state()
+                generation, rows = columnar.generation, len(columnar)
+                rebuild = state["generation"] != generation or state["rows"] > rows
+                offset = 0 if rebuild else state["rows"]
+                if not rebuild and offset == rows:
+                    self._conn.rollback()
+                    return 0
+                aggregated = self._aggregate(columnar, offset, rows)
+                if rebuild:
+                    self._conn.execute("DELETE FROM rollups")
+                self._conn.executemany(
+                    f"INSERT INTO rollups (period, bucket, activity_type, {columns}, max_hr)"
+                    f" VALUES ({', '.join('?' * (len(SUMS) + 4))})"
+                    f" ON CONFLICT (period, bucket, activity_type) DO UPDATE SET {updates},"
+                    " max_hr = MAX(COALESCE(max_hr, excluded.max_hr), COALESCE(excluded.max_hr, max_hr))",
+                    aggregated,
+                )
+                self._conn.execute("INSERT OR REPLACE INTO rollup_state (key, value) VALUES ('columnar', ?)",
+                                   (json.dumps({"generation": generation, "rows": rows}),))
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        logger.info(f"{'Rebuilt' if rebuild else 'Updated'} rollups with {rows - offset} activities.")
+        return rows - offset
+
+    @staticmethod
+    def _aggregate(columnar: ColumnarActivityStore, offset: int, rows: int) -> List[tuple]:
+        import pandas as pd
+
+        arrays = {name: np.asarray(values[offset:rows]) for name, values in columnar.read([
+            "start_time_local", "activity_type", "distance", "duration", "moving_duration",
+            "elevation_gain", "calories", "average_hr", "max_hr"]).items()}
+        valid = arrays["start_time_local"] >= 0
+        arrays = {name: values[valid] for name, values in arrays.items()}
+        if not len(arrays["start_time_local"]):
+            return []
+
+        types = np.array(columnar.activity_types + [OTHER_TYPE], dtype=object)
+        codes = arrays["activity_type"]
+        days = (arrays["start_time_local"] // 86400).astype("datetime64[D]")
+        duration = arrays["duration"]
+        with_hr = ~np.isnan(arrays["average_hr"]) & ~np.isnan(duration)
+        frame = pd.DataFrame({
+            "type": types[np.where(codes >= 0, codes, len(types) - 1)],
+            "count": np.ones(len(days)),
+            "distance": arrays["distance"],
+            "duration": duration,
+            "moving_duration": arrays["moving_duration"],
+            "elevation_gain": arrays["elevation_gain"],
+            "calories": arrays["calories"],
+            "hr_weighted": np.where(with_hr, arrays["average_hr"] * np.where(with_hr, duration, 0), 0.0),
+            "hr_duration": np.where(with_hr, duration, 0.0),
+            "max_hr": arrays["max_hr"],
+        })
+        buckets = {
+            "day": days,
+            # 1970-01-01 was a Thursday, so (days + 3) % 7 is the weekday with Monday as 0.
+            "week": days - (days.astype(np.int64) + 3) % 7,
+            "month": days.astype("datetime64[M]").astype("datetime64[D]"),
+        }
+        aggregated = []
+        for period in PERIODS:
+            frame["bucket"] = buckets[period]
+            grouped = frame.groupby(["bucket", "type"], sort=False)
+            totals = grouped[list(SUMS)].sum()
+            totals["max_hr"] = grouped["max_hr"].max()
+            labels = np.datetime_as_string(totals.index.get_level_values(0).values.astype("datetime64[D]"))
+            for label, activity_type, values in zip(labels, totals.index.get_level_values(1), totals.itertuples(index=False)):
+                values = list(values)
+                max_hr = values[-1]
+                aggregated.append((period, label, activity_type, *values[:-1], None if np.isnan(max_hr) else max_hr))
+        return aggregated
+
+    def query(self, period: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+              activity_type: Optional[str] = None, by_type: bool = False) -> List[Dict[str, Any]]:
+        """
+        Returns the rollups of a period, oldest bucket first.
+
+        Buckets are not clipped: the first and last bucket cover whole weeks or months, also
+        before `start_date` and after `end_date`. `bucket_end` gives the last day of a bucket.
+
+        Args:
+            period (str): "day", "week" or "month".
+            start_date (str, optional): Only buckets containing or following this date (YYYY-MM-DD).
+            end_date (str, optional): Only buckets starting on or before this date (YYYY-MM-DD).
+            activity_type (str, optional): Only activities of this typeKey.
+            by_type (bool, optional): One row per bucket and activity type instead of one per bucket.
+
+        Returns:
+            List[Dict[str, Any]]: Rows with start, count, distance, duration, movingDuration,
+                elevationGain, calories, averageHR, maxHR and averageSpeed, plus activityType if `by_type`.
+        """
+        group_by = "bucket, activity_type" if by_type else "bucket"
+        results = []
+        for bucket, row_type, *measures in self._select(period, start_date, end_date, activity_type, group_by):
+            result = {"start": bucket}
+            if by_type:
+                result["activityType"] = row_type
+            result.update(_measures(*measures))
+            results.append(result)
+        return results
+
+    def total(self, period: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+              activity_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns the totals over the buckets `query` returns for the same arguments.
+
+        The averages are derived from the summed measures, so the average heart rate is weighted
+        by the duration of the activities with heart rate only.
+
+        Args:
+            period (str): "day", "week" or "month".
+            start_date (str, optional): Only buckets containing or following this date (YYYY-MM-DD).
+            end_date (str, optional): Only buckets starting on or before this date (YYYY-MM-DD).
+            activity_type (str, optional): Only activities of this typeKey.
+
+        Returns:
+            Dict[str, Any]: The measures of `query` rows without start, or None if no bucket matches.
+        """
+        rows = self._select(period, start_date, end_date, activity_type, None)
+        if not rows or rows[0][2] is None:
+            return None
+        return _measures(*rows[0][2:])
+
+    def _select(self, period: str, start_date: Optional[str], end_date: Optional[str],
+                activity_type: Optional[str], group_by: Optional[str]) -> List[tuple]:
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period {period}, expected one of {', '.join(PERIODS)}.")
+        query = ("SELECT bucket, activity_type, " + ", ".join(f"SUM({name})" for name in SUMS)
+                 + ", MAX(max_hr) FROM rollups WHERE period = ?")
+        params: List[Any] = [period]
+        if start_date:
+            query += " AND bucket >= ?"
+            params.append(bucket_start(period, start_date))
+        if end_date:
+            query += " AND bucket <= ?"
+            params.append(end_date)
+        if activity_type:
+            query += " AND activity_type = ?"
+            params.append(activity_type)
+        if group_by:
+            query += f" GROUP BY {group_by} ORDER BY bucket"
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def activity_types(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT DISTINCT activity_type FROM rollups WHERE period = 'month' ORDER BY activity_type")]
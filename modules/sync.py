@@ -0,0 +1,184 @@
+import contextlib
+import datetime
+import logging
+import time
+from typing import Dict, Optional
+
+from modules.activity_fetch import fetch_activities_by_date
+from modules.activity_store import ActivityStore
+from modules.columnar_store import ColumnarActivityStore
+from modules.rollups import RollupStore
+
+logger = logging.getLogger(__name__)
+
+
+class ActivitySync:
+    """
+    Keeps an `ActivityStore` up to date with Garmin Connect using a high-water mark.
+
+    An incremental sync pages `get_activities(start, limit)` (newest first) and stops at the
+    first activity that is already stored, so a typical sync costs a single small request.
+    The first sync pages until the list is exhausted and marks the store as complete.
+
+    Activities edited or deleted on Garmin Connect after they were synced are reconciled by a
+    deep pass, which re-fetches a lookback window and replaces the stored rows for it. A deep
+    pass runs automatically when the previous one is older than `deep_interval_days`.
+
+    New activities are also appended to a `ColumnarActivityStore` for vectorized scans; it is
+    rewritten from the activity store after a deep pass. The training rollups are brought up to
+    date from the columnar copy after every sync.
+
+    Args:
+        api: The Garmin API object (or a proxy of it).
+        store (ActivityStore, optional): The local store. A default store is opened if None.
+        columnar (ColumnarActivityStore, optional): The columnar copy. A default store is opened if None.
+        rollups (RollupStore, optional): The training rollups. A default store is opened if None.
+        page_size (int, optional): The number of activities per `get_activities` request. Defaults to 20.
+        min_interval (float, optional): Seconds during which a finished sync is not repeated. Defaults to 300.
+        deep_interval_days (int, optional): Days between automatic deep passes. Defaults to 7.
+        deep_lookback_days (int, optional): How far back a deep pass reconciles. Defaults to 90.
+    """
+
+    def __init__(
+        self,
+        api,
+        store: Optional[ActivityStore] = None,
+        columnar: Optional[ColumnarActivityStore] = None,
+        rollups: Optional[RollupStore] = None,
+        page_size: int = 20,
+        min_interval: float = 300,
+        deep_interval_days: int = 7,
+        deep_lookback_days: int = 90,
+    ):
+        self.api = api
+        self.store = store or ActivityStore()
+        self.columnar = columnar or ColumnarActivityStore()
+        self.rollups = rollups or RollupStore()
+        self.page_size = page_size
+        self.min_interval = min_interval
+        self.deep_interval_days = deep_interval_days
+        self.deep_lookback_days = deep_lookback_days
+
+    @property
+    def is_complete(self) -> bool:
+        """True once the store holds the full activity history."""
+        return bool(self.store.get_state("complete", False))
+
+    def _fresh(self):
+        # Sync requests must see the server state, not a cached page.
+        refreshing = getattr(self.api, "refreshing", None)
+        return refreshing() if refreshing else contextlib.nullcontext()
+
+    def sync(self, force: bool = False) -> int:
+        """
+        Fetches activities newer than the high-water mark and stores them.
+
+        Every page is stored as soon as it arrives. While the first sync walks the history, the
+        offset of the next page is kept in the sync state, so an interrupted walk resumes there
+        instead of starting over.
+
+        Args:
+            force (bool, optional): Sync even if the last sync finished less than `min_interval` ago.
+
+        Returns:
+            int: The number of newly stored activities.
+        """
+        last_sync = self.store.get_state("last_sync", 0)
+        if not force and time.time() - last_sync < self.min_interval:
+            self.rollups.update(self.columnar)
+            return 0
+
+        resume = self.store.get_state("history_offset")
+        with self._fresh():
+            stored, exhausted = self._walk(0, stop_at_known=True, track=resume is None and not self.is_complete)
+            if not exhausted and resume is not None:
+                # Activities added since the interrupted walk shift the list by `stored`. Step back
+                # one page in case some were deleted, already stored ones are skipped.
+                more, exhausted = self._walk(max(0, resume + stored - self.page_size), stop_at_known=False, track=True)
+                stored += more
+        if exhausted:
+            # The list was exhausted, so everything the account has is now stored.
+            self.store.set_state("complete", True)
+            self.store.set_state("history_offset", None)
+            self.store.set_state("last_deep_sync", time.time())
+        self.store.set_state("last_sync", time.time())
+        logger.info(f"Synced {stored} new activities.")
+
+        if self._deep_pass_due():
+            self.deep_sync()
+        elif len(self.columnar) != self.store.count():
+            self.columnar.rewrite(self.store.iter_all())
+        self.rollups.update(self.columnar)
+        return stored
+
+    def _walk(self, start: int, stop_at_known: bool, track: bool):
+        """
+        Pages `get_activities` from offset `start`, storing new activities page by page.
+
+        Args:
+            start (int): The offset of the first page.
+            stop_at_known (bool): Stop at the first stored activity instead of skipping it.
+            track (bool): Save the offset of the next page as the resume point of the history walk.
+
+        Returns:
+            tuple: The number of stored activities and whether the list was exhausted.
+        """
+        stored = 0
+        while True:
+            page = self.api.get_activities(start, self.page_size) or []
+            new_activities = []
+            reached_known = False
+            for activity in page:
+                if self.store.contains(activity.get("activityId")):
+                    if stop_at_known:
+                        reached_known = True
+                        break
+                    continue
+                new_activities.append(activity)
+            if new_activities:
+                self.store.upsert(new_activities)
+                self.columnar.append(new_activities)
+                if start == 0 and stored == 0:
+                    newest = new_activities[0]
+                    self.store.set_state("high_water", {
+                        "activityId": newest.get("activityId"),
+                        "startTimeGMT": newest.get("startTimeGMT"),
+                    })
+                stored += len(new_activities)
+            if reached_known:
+                return stored, False
+            if len(page) < self.page_size:
+                return stored, True
+            start += self.page_size
+            if track:
+                self.store.set_state("history_offset", start)
+
+    def _deep_pass_due(self) -> bool:
+        last_deep = self.store.get_state("last_deep_sync", 0)
+        return time.time() - last_deep > self.deep_interval_days * 86400
+
+    def deep_sync(self, lookback_days: Optional[int] = None) -> Dict[str, int]:
+        """
+        Reconciles edits and deletions within a lookback window.
+
+        Args:
+            lookback_days (int, optional): The window to reconcile. Defaults to `deep_lookback_days`.
+
+        Returns:
+            Dict[str, int]: Counts of "updated" and "deleted" activities.
+        """
+        lookback_days = lookback_days or self.deep_lookback_days
+        end_date = datetime.date.today()
+        start_date = end_date - datetime.timedelta(days=lookback_days)
+        with self._fresh():
+            remote = fetch_activities_by_date(self.api, start_date.isoformat(), end_date.isoformat())
+
+        remote_ids = {activity["activityId"] for activity in remote if activity.get("activityId") is not None}
+        stale_ids = self.store.ids_between(start_date.isoformat(), end_date.isoformat()) - remote_ids
+        self.store.upsert(remote)
+        self.store.delete(stale_ids)
+        self.columnar.rewrite(self.store.iter_all())
+        self.rollups.update(self.columnar)
+        self.store.set_state("last_deep_sync", time.time())
+        logger.info(f"Deep sync reconciled {len(remote)} activities, removed {len(stale_ids)}.")
+        return {"updated": len(remote), "deleted": len(stale_ids)}
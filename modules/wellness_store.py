@@ -0,0 +1,123 @@
+import datetime
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from modules.paths import data_path
+
+# Days before today whose cells are not final yet. A watch that syncs late still changes
+# the summaries, sleep and HRV of the last days.
+GRACE_DAYS = 2
+
+
+class WellnessStore:
+    """
+    A local SQLite store of daily wellness responses, one cell per endpoint and day.
+
+    A cell for a day more than GRACE_DAYS in the past is final: its data no longer changes and
+    it is never fetched again, so the store doubles as the checkpoint of a backfill. Cells for
+    today and the GRACE_DAYS before it are stored but not final, and are fetched again by the
+    next backfill.
+
+    Args:
+        path (str, optional): The SQLite database file. Defaults to `wellness.sqlite` in the data directory.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or data_path("wellness.sqlite")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS wellness ("
+            " endpoint TEXT NOT NULL,"
+            " day TEXT NOT NULL,"
+            " data TEXT,"
+            " final INTEGER NOT NULL,"
+            " fetched REAL NOT NULL,"
+            " PRIMARY KEY (endpoint, day))"
+        )
+        # Stores written before the grace period marked recent days final already.
+        self._conn.execute("UPDATE wellness SET final = 0 WHERE final = 1 AND day >= ?", (self._cutoff(),))
+        self._conn.commit()
+
+    @staticmethod
+    def _cutoff() -> str:
+        """The first day whose cells are not final."""
+        return (datetime.date.today() - datetime.timedelta(days=GRACE_DAYS)).isoformat()
+
+    def put_many(self, cells: Iterable[Tuple[str, str, Any]]) -> int:
+        """
+        Stores cells in one transaction, replacing earlier versions.
+
+        Args:
+            cells (Iterable[Tuple[str, str, Any]]): (endpoint, day, response) triples. Empty responses
+                are stored as well, so days without data are not fetched again.
+
+        Returns:
+            int: The number of cells stored.
+        """
+        cutoff = self._cutoff()
+        now = time.time()
+        rows = [(endpoint, day, json.dumps(value, separators=(",", ":")), int(day < cutoff), now)
+                for endpoint, day, value in cells]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO wellness (endpoint, day, data, final, fetched) VALUES (?, ?, ?, ?, ?)", rows
+                )
+        return len(rows)
+
+    def missing(self, endpoint: str, days: List[str]) -> List[str]:
+        """
+        Returns the days of `days` without a final cell for `endpoint`, in the given order.
+        """
+        if not days:
+            return []
+        with self._lock:
+            done = {row[0] for row in self._conn.execute(
+                "SELECT day FROM wellness WHERE endpoint = ? AND final = 1 AND day BETWEEN ? AND ?",
+                (endpoint, min(days), max(days)),
+            )}
+        return [day for day in days if day not in done]
+
+    def get(self, endpoint: str, day: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM wellness WHERE endpoint = ? AND day = ?", (endpoint, day)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_endpoint(self, endpoint: str, start_date: Optional[str] = None,
+                      end_date: Optional[str] = None) -> Iterator[Tuple[str, Any]]:
+        """
+        Yields (day, response) of an endpoint, oldest first.
+
+        Args:
+            endpoint (str): The endpoint name, e.g. "summary".
+            start_date (str, optional): The first day to include (YYYY-MM-DD).
+            end_date (str, optional): The last day to include (YYYY-MM-DD).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day, data FROM wellness WHERE endpoint = ? AND day BETWEEN ? AND ? ORDER BY day",
+                (endpoint, start_date or "0000-00-00", end_date or "9999-99-99"),
+            ).fetchall()
+        for day, data in rows:
+            yield day, json.loads(data)
+
+    def counts(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the number of cells and the first and last day per endpoint.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT endpoint, COUNT(*), MIN(day), MAX(day) FROM wellness GROUP BY endpoint ORDER BY endpoint"
+            ).fetchall()
+        return {endpoint: {"cells": count, "first": first, "last": last} for endpoint, count, first, last in rows}
+
+    def version(self) -> Tuple[int, float]:
+        """
+        Returns the number of cells and the time of the newest one, to detect changes.
+        """
+        with self._lock:
+            return tuple(self._conn.execute("SELECT COUNT(*), COALESCE(MAX(fetched), 0) FROM wellness").fetchone())
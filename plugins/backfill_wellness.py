@@ -0,0 +1,89 @@
+from plugins.base_plugin import BasePlugin
+from rich.console import Console
+from rich.prompt import Prompt, IntPrompt
+from rich.progress import Progress
+from rich.table import Table
+from datetime import date, datetime, timedelta
+from modules.backfill import DEFAULT_CONCURRENCY, ENDPOINTS, WellnessBackfill
+from plugins.plugin_types import PluginType
+from enum import Enum
+
+console = Console()
+
+
+class BackfillWellnessPlugin(BasePlugin):
+    @property
+    def command_key(self) -> str:
+        return "B"
+
+    @property
+    def description(self) -> str:
+        return "Backfill daily stats, summaries, HRV and body composition for a date range"
+
+    @property
+    def plugin_type(self) -> Enum:
+        return PluginType.DATA_RETRIEVAL
+
+    def prompt_params(self):
+        def get_valid_date(prompt_text: str, default: str) -> str:
+            while True:
+                date_str = Prompt.ask(prompt_text, default=default)
+                try:
+                    datetime.strptime(date_str, "%Y-%m-%d")
+                    return date_str
+                except ValueError:
+                    console.print("Invalid date format. Please enter the date in YYYY-MM-DD format.", style="bold red")
+
+        today = date.today()
+        start_date = get_valid_date("Enter start date (YYYY-MM-DD)", (today - timedelta(days=365)).isoformat())
+        end_date = get_valid_date("Enter end date (YYYY-MM-DD)", today.isoformat())
+        while True:
+            endpoints = Prompt.ask(f"Endpoints (comma separated: {', '.join(ENDPOINTS)})", default=",".join(ENDPOINTS))
+            endpoints = [name.strip() for name in endpoints.split(",") if name.strip()]
+            if endpoints and all(name in ENDPOINTS for name in endpoints):
+                break
+            console.print(f"Please choose from {', '.join(ENDPOINTS)}.", style="bold red")
+        concurrency = IntPrompt.ask("Concurrent requests", default=DEFAULT_CONCURRENCY)
+        return {"start_date": start_date, "end_date": end_date, "endpoints": endpoints, "concurrency": concurrency}
+
+    def fetch(self, api, start_date: str, end_date: str = None, endpoints=None, concurrency: int = None, on_progress=None):
+        if isinstance(endpoints, str):
+            endpoints = [name.strip() for name in endpoints.split(",") if name.strip()]
+        backfill = WellnessBackfill(api, concurrency=concurrency or DEFAULT_CONCURRENCY)
+        summary = backfill.run(start_date, end_date or date.today().isoformat(), endpoints, on_progress)
+        summary["stored_cells"] = backfill.store.counts()
+        return summary
+
+    def render(self, summary):
+        table = Table(title=f"Wellness backfill {summary['start_date']} to {summary['end_date']}")
+        table.add_column("Missing", style="cyan", justify="right")
+        table.add_column("Stored", style="green", justify="right")
+        table.add_column("Failed", style="red", justify="right")
+        table.add_row(str(summary["missing"]), str(summary["stored"]), str(summary["failed"]))
+        console.print(table)
+
+        cells = Table(title="Wellness store")
+        cells.add_column("Endpoint", style="magenta")
+        cells.add_column("Days", style="green", justify="right")
+        cells.add_column("First", style="yellow")
+        cells.add_column("Last", style="yellow")
+        for endpoint, entry in summary["stored_cells"].items():
+            cells.add_row(endpoint, str(entry["cells"]), entry["first"], entry["last"])
+        console.print(cells)
+        if summary["rate_limited"]:
+            console.print("Stopped because Garmin Connect is rate limiting. Run the backfill again later to resume.", style="bold yellow")
+        elif summary["failed"]:
+            console.print("Some days failed. Run the backfill again to retry them.", style="bold yellow")
+
+    def execute(self, api, params=None):
+        if params is None:
+            params = self.prompt_params()
+        with Progress(console=console, transient=True) as progress:
+            task = progress.add_task("Backfilling", total=None)
+
+            def on_progress(done, total):
+                progress.update(task, completed=done, total=total)
+
+            summary = self.fetch(api, **params, on_progress=on_progress)
+        self.render(summary)
+        return summary
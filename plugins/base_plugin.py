@@ -1,22 +1,114 @@
-from abc import ABC, abstractmethod
-from enum import Enum
-
-class BasePlugin(ABC):
-    @property
-    @abstractmethod
-    def command_key(self) -> str:
-        pass
-
-    @property
-    @abstractmethod
-    def description(self) -> str:
-        pass
-    
-    @property
-    @abstractmethod
-    def plugin_type(self) -> Enum:
-        pass
-
-    @abstractmethod
-    def execute(self, api):
-        pass
+import asyncio
+import functools
+import logging
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BasePlugin(ABC):
+    @property
+    @abstractmethod
+    def command_key(self) -> str:
+        pass
+
+    @property
+    @abstractmethod
+    def description(self) -> str:
+        pass
+
+    @property
+    @abstractmethod
+    def plugin_type(self) -> Enum:
+        pass
+
+    @property
+    def depends_on(self) -> Optional[str]:
+        """
+        The command key of the retrieval plugin whose result a processing plugin consumes.
+        """
+        return None
+
+    @property
+    def input_optional(self) -> bool:
+        """
+        Whether a processing plugin can run without a result of `depends_on`. It then receives None
+        instead of the retrieval plugin being run first.
+        """
+        return False
+
+    def prompt_params(self) -> Dict[str, Any]:
+        """
+        Asks the user for the keyword arguments of `fetch`. Plugins without arguments return an empty dict.
+        """
+        return {}
+
+    @property
+    def supports_fetch(self) -> bool:
+        """
+        Whether the plugin implements `fetch`. Plugins without it only run interactively through `execute`.
+        """
+        return type(self).fetch is not BasePlugin.fetch
+
+    def fetch(self, api, **params) -> Any:
+        """
+        Retrieves the plugin's data without rendering it. Used by `execute` and by headless runners.
+        """
+        raise NotImplementedError(f"Plugin '{self.command_key}' does not support headless execution.")
+
+    async def fetch_async(self, api, **params) -> Any:
+        """
+        Retrieves the plugin's data on an event loop, `api` being an `AsyncGarminConnectClient`.
+
+        Plugins with native async requests override this. By default `fetch` runs with the
+        synchronous API in the loop's executor, so every plugin can be awaited.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.fetch, api.sync_api, **params))
+
+    def iter_records(self, api, **params) -> Iterator[Any]:
+        """
+        Yields the plugin's data one record at a time. Lists are yielded item by item.
+
+        Plugins returning large results override this to stream without holding them in memory.
+        """
+        data = self.fetch(api, **params)
+        if isinstance(data, list):
+            yield from data
+        else:
+            yield data
+
+    def render(self, data: Any) -> None:
+        """
+        Displays the data returned by `fetch`.
+        """
+        pass
+
+    def _interactive_only(self) -> None:
+        # Plugins without fetch override execute; reaching the default one means neither is implemented.
+        logger.error(f"Plugin '{self.command_key}' has no fetch, so it is interactive only, but it does not override execute.")
+
+    def execute(self, api, params: Dict[str, Any] = None):
+        if not self.supports_fetch:
+            self._interactive_only()
+            return None
+        if params is None:
+            params = self.prompt_params()
+        data = self.fetch(api, **params)
+        self.render(data)
+        return data
+
+    async def execute_async(self, api, params: Dict[str, Any] = None):
+        """
+        Awaitable counterpart of `execute`, `api` being an `AsyncGarminConnectClient`.
+        """
+        if not self.supports_fetch:
+            self._interactive_only()
+            return None
+        if params is None:
+            params = self.prompt_params()
+        data = await self.fetch_async(api, **params)
+        self.render(data)
+        return data
@@ -0,0 +1,86 @@
+from plugins.base_plugin import BasePlugin
+from rich.console import Console
+from rich.prompt import Prompt, IntPrompt
+from rich.progress import Progress
+from rich.table import Table
+from datetime import datetime
+from modules.activity_store import ActivityStore
+from modules.fit_export import FitExporter, DEFAULT_MAX_WORKERS
+from plugins.plugin_types import PluginType
+from enum import Enum
+
+console = Console()
+
+
+class ExportFitFilesPlugin(BasePlugin):
+    @property
+    def command_key(self) -> str:
+        return "F"
+
+    @property
+    def description(self) -> str:
+        return "Bulk export the original FIT files of activities and decode their records"
+
+    @property
+    def plugin_type(self) -> Enum:
+        return PluginType.DATA_PROCESSING
+
+    @property
+    def depends_on(self) -> str:
+        return "R"
+
+    @property
+    def input_optional(self) -> bool:
+        # Without retrieved activities the export reads them from the local store.
+        return True
+
+    def _from_store(self):
+        def get_valid_date(prompt_text: str) -> str:
+            while True:
+                date_str = Prompt.ask(prompt_text)
+                try:
+                    datetime.strptime(date_str, "%Y-%m-%d")
+                    return date_str
+                except ValueError:
+                    console.print("Invalid date format. Please enter the date in YYYY-MM-DD format.", style="bold red")
+
+        start_date = get_valid_date("Enter start date (YYYY-MM-DD)")
+        end_date = get_valid_date("Enter end date (YYYY-MM-DD)")
+        activity_type = Prompt.ask("Enter activity type (optional)", default=None)
+        return ActivityStore().between(start_date, end_date, activity_type or None)
+
+    def execute(self, activities, api=None):
+        if api is None:
+            console.print("Exporting needs API access to download the original files.", style="bold red")
+            return None
+        source = "store"
+        if activities:
+            source = Prompt.ask(f"Export the {len(activities)} retrieved activities or activities from the local store",
+                                choices=["retrieved", "store"], default="retrieved")
+        if source == "store":
+            activities = self._from_store()
+        if not activities:
+            console.print("No activities to export.", style="bold yellow")
+            return None
+
+        workers = IntPrompt.ask("Concurrent downloads", default=DEFAULT_MAX_WORKERS)
+        exporter = FitExporter(api, max_workers=max(1, workers))
+        with Progress(console=console, transient=True) as progress:
+            task = progress.add_task("Exporting original files", total=len(activities))
+            results = exporter.export(activities, on_result=lambda result: progress.advance(task))
+
+        exported = [r for r in results if "records" in r]
+        failed = [r for r in results if "error" in r]
+        table = Table(title="FIT export")
+        table.add_column("Exported", style="green", justify="right")
+        table.add_column("Already exported", style="cyan", justify="right")
+        table.add_column("Failed", style="red", justify="right")
+        table.add_column("Records", style="magenta", justify="right")
+        table.add_column("Downloaded", style="yellow", justify="right")
+        table.add_row(str(len(exported)), str(sum(1 for r in results if r.get("skipped"))), str(len(failed)),
+                      str(sum(r["records"] for r in exported)), f"{sum(r['bytes'] for r in exported) / 2 ** 20:.1f} MB")
+        console.print(table)
+        for result in failed:
+            console.print(f"Activity {result['activityId']}: {result['error']}", style="bold red")
+        console.print(f"Files written to {exporter.directory}", style="bold green")
+        return results
@@ -1,50 +1,82 @@
-from plugins.base_plugin import BasePlugin
-from modules.data_viewer import DataViewer
-from rich.console import Console
-from rich.prompt import Prompt
-from datetime import datetime
-from plugins.plugin_types import PluginType
-from enum import Enum
-
-console = Console()
-
-class GetActivityForRangePlugin(BasePlugin):
-    @property
-    def command_key(self) -> str:
-        return "R"
-
-    @property
-    def description(self) -> str:
-        return "Get activity data for a date range"
-
-    @property
-    def plugin_type(self) -> Enum:
-        return PluginType.DATA_RETRIEVAL
-    
-    def execute(self, api):
-        def get_valid_date(prompt_text: str) -> str:
-            while True:
-                date_str = Prompt.ask(prompt_text)
-                try:
-                    datetime.strptime(date_str, "%Y-%m-%d")
-                    return date_str
-                except ValueError:
-                    console.print("Invalid date format. Please enter the date in YYYY-MM-DD format.", style="bold red")
-
-        start_date = get_valid_date("Enter start date (YYYY-MM-DD)")
-        end_date = get_valid_date("Enter end date (YYYY-MM-DD)")
-        activity_type = Prompt.ask("Enter activity type (optional)", default=None)
-
-        if activity_type is None:
-            activities = api.get_activities_by_date(start_date, end_date)            
-        else:
-            activities = api.get_activities_by_date(start_date, end_date, activity_type)
-
-
-        if activities:
-            viewer = DataViewer(activities)
-            viewer.view_data()
-        else:
-            console.print(f"No activities found between {start_date} and {end_date}.", style="bold yellow")
-    
-        return activities
\ No newline at end of file
+from plugins.base_plugin import BasePlugin
+from modules.data_viewer import DataViewer
+from rich.console import Console
+from rich.prompt import Prompt
+from rich.progress import Progress
+from datetime import datetime
+from plugins.plugin_types import PluginType
+from enum import Enum
+from modules.activity_record import to_records
+from modules.activity_fetch import fetch_activities_by_date, iter_activities_by_date, split_date_range
+from modules.sync import ActivitySync
+
+console = Console()
+
+class GetActivityForRangePlugin(BasePlugin):
+    @property
+    def command_key(self) -> str:
+        return "R"
+
+    @property
+    def description(self) -> str:
+        return "Get activity data for a date range"
+
+    @property
+    def plugin_type(self) -> Enum:
+        return PluginType.DATA_RETRIEVAL
+
+    def prompt_params(self):
+        def get_valid_date(prompt_text: str) -> str:
+            while True:
+                date_str = Prompt.ask(prompt_text)
+                try:
+                    datetime.strptime(date_str, "%Y-%m-%d")
+                    return date_str
+                except ValueError:
+                    console.print("Invalid date format. Please enter the date in YYYY-MM-DD format.", style="bold red")
+
+        start_date = get_valid_date("Enter start date (YYYY-MM-DD)")
+        end_date = get_valid_date("Enter end date (YYYY-MM-DD)")
+        activity_type = Prompt.ask("Enter activity type (optional)", default=None)
+        return {"start_date": start_date, "end_date": end_date, "activity_type": activity_type or None}
+
+    def fetch(self, api, start_date: str, end_date: str, activity_type: str = None, on_chunk=None):
+        sync = ActivitySync(api)
+        sync.sync()
+        if sync.is_complete:
+            # The local store holds the full history, answer without further requests.
+            return sync.store.between(start_date, end_date, activity_type)
+        return to_records(fetch_activities_by_date(api, start_date, end_date, activity_type, on_chunk=on_chunk))
+
+    def iter_records(self, api, start_date: str, end_date: str, activity_type: str = None):
+        sync = ActivitySync(api)
+        sync.sync()
+        if sync.is_complete:
+            return sync.store.iter_between(start_date, end_date, activity_type)
+        return iter_activities_by_date(api, start_date, end_date, activity_type)
+
+    def render(self, activities):
+        if activities:
+            viewer = DataViewer(activities)
+            viewer.view_data()
+        else:
+            console.print("No activities found for the selected range.", style="bold yellow")
+
+    def execute(self, api, params=None):
+        if params is None:
+            params = self.prompt_params()
+        windows = split_date_range(params["start_date"], params["end_date"])
+        with Progress(console=console, transient=True) as progress:
+            task = progress.add_task("Fetching activities", total=len(windows))
+
+            def on_chunk(window, chunk):
+                progress.console.print(f"{window[0]} to {window[1]}: {len(chunk)} activities")
+                progress.advance(task)
+
+            activities = self.fetch(api, **params, on_chunk=on_chunk)
+
+        if activities:
+            self.render(activities)
+        else:
+            console.print(f"No activities found between {params['start_date']} and {params['end_date']}.", style="bold yellow")
+        return activities
@@ -1,25 +1,30 @@
-# plugins/get_body_composition.py
-
-from plugins.base_plugin import BasePlugin
-from modules.data_viewer import DataViewer
-import datetime
-from plugins.plugin_types import PluginType
-from enum import Enum
-
-class GetBodyCompositionPlugin(BasePlugin):
-    @property
-    def command_key(self) -> str:
-        return "5"
-
-    @property
-    def description(self) -> str:
-        return "Get body composition data for today"
-    @property
-    def plugin_type(self) -> Enum:
-        return PluginType.DATA_RETRIEVAL
-    
-    def execute(self, api):
-        today = datetime.date.today()
-        body_composition = api.get_body_composition(today.isoformat())
-        DataViewer.display_rich_output("Body Composition:", body_composition)
-        return body_composition
\ No newline at end of file
+# plugins/get_body_composition.py
+
+from plugins.base_plugin import BasePlugin
+from modules.data_viewer import DataViewer
+import datetime
+from plugins.plugin_types import PluginType
+from enum import Enum
+
+class GetBodyCompositionPlugin(BasePlugin):
+    @property
+    def command_key(self) -> str:
+        return "5"
+
+    @property
+    def description(self) -> str:
+        return "Get body composition data for today"
+    @property
+    def plugin_type(self) -> Enum:
+        return PluginType.DATA_RETRIEVAL
+    
+    def fetch(self, api, date: str = None):
+        date = date or datetime.date.today().isoformat()
+        return api.get_body_composition(date)
+
+    async def fetch_async(self, api, date: str = None):
+        date = date or datetime.date.today().isoformat()
+        return await api.get_body_composition(date)
+
+    def render(self, body_composition):
+        DataViewer.display_rich_output("Body Composition:", body_composition)
\ No newline at end of file
@@ -1,25 +1,30 @@
-from plugins.base_plugin import BasePlugin
-from modules.data_viewer import DataViewer
-import datetime
-from plugins.plugin_types import PluginType
-from enum import Enum
-
-class GetHRVDataPlugin(BasePlugin):
-    @property
-    def command_key(self) -> str:
-        return "8"
-
-    @property
-    def description(self) -> str:
-        return "Get HRV data for today"
-
-    @property
-    def plugin_type(self) -> Enum:
-        return PluginType.DATA_RETRIEVAL
-    
-    def execute(self, api):
-        today = datetime.date.today()
-        hrv_data = api.get_hrv_data(today.isoformat())
-        DataViewer.display_rich_output("HRV Data:", hrv_data)
-        return hrv_data
-    
+from plugins.base_plugin import BasePlugin
+from modules.data_viewer import DataViewer
+import datetime
+from plugins.plugin_types import PluginType
+from enum import Enum
+
+class GetHRVDataPlugin(BasePlugin):
+    @property
+    def command_key(self) -> str:
+        return "8"
+
+    @property
+    def description(self) -> str:
+        return "Get HRV data for today"
+
+    @property
+    def plugin_type(self) -> Enum:
+        return PluginType.DATA_RETRIEVAL
+    
+    def fetch(self, api, date: str = None):
+        date = date or datetime.date.today().isoformat()
+        return api.get_hrv_data(date)
+
+    async def fetch_async(self, api, date: str = None):
+        date = date or datetime.date.today().isoformat()
+        return await api.get_hrv_data(date)
+
+    def render(self, hrv_data):
+        DataViewer.display_rich_output("HRV Data:", hrv_data)
+    
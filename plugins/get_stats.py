@@ -1,25 +1,30 @@
-from plugins.base_plugin import BasePlugin
-from modules.data_viewer import DataViewer
-import datetime
-from plugins.plugin_types import PluginType
-from enum import Enum  
-
-class GetStatsPlugin(BasePlugin):
-    @property
-    def command_key(self) -> str:
-        return "3"
-
-    @property
-    def description(self) -> str:
-        return "Get activity data for today"
-
-    @property
-    def plugin_type(self) -> Enum:
-        return PluginType.DATA_RETRIEVAL
-    
-    def execute(self, api):
-        today = datetime.date.today()
-        stats = api.get_stats(today.isoformat())
-        DataViewer.display_rich_output("Stats:", stats)
-        return stats
-    
+from plugins.base_plugin import BasePlugin
+from modules.data_viewer import DataViewer
+import datetime
+from plugins.plugin_types import PluginType
+from enum import Enum  
+
+class GetStatsPlugin(BasePlugin):
+    @property
+    def command_key(self) -> str:
+        return "3"
+
+    @property
+    def description(self) -> str:
+        return "Get activity data for today"
+
+    @property
+    def plugin_type(self) -> Enum:
+        return PluginType.DATA_RETRIEVAL
+    
+    def fetch(self, api, date: str = None):
+        date = date or datetime.date.today().isoformat()
+        return api.get_stats(date)
+
+    async def fetch_async(self, api, date: str = None):
+        date = date or datetime.date.today().isoformat()
+        return await api.get_stats(date)
+
+    def render(self, stats):
+        DataViewer.display_rich_output("Stats:", stats)
+    
@@ -1,25 +1,30 @@
-
-from plugins.base_plugin import BasePlugin
-from modules.data_viewer import DataViewer
-import datetime
-from plugins.plugin_types import PluginType
-from enum import Enum
-
-class GetUserSummaryPlugin(BasePlugin):
-    @property
-    def command_key(self) -> str:
-        return "4"
-
-    @property
-    def description(self) -> str:
-        return "Get User Summary"
-
-    @property
-    def plugin_type(self) -> Enum:
-        return PluginType.DATA_RETRIEVAL
-    
-    def execute(self, api):
-        today = datetime.date.today()
-        user_summary = api.get_user_summary(today.isoformat())
-        DataViewer.display_rich_output("User Summary:", user_summary)
-        return user_summary
\ No newline at end of file
+
+from plugins.base_plugin import BasePlugin
+from modules.data_viewer import DataViewer
+import datetime
+from plugins.plugin_types import PluginType
+from enum import Enum
+
+class GetUserSummaryPlugin(BasePlugin):
+    @property
+    def command_key(self) -> str:
+        return "4"
+
+    @property
+    def description(self) -> str:
+        return "Get User Summary"
+
+    @property
+    def plugin_type(self) -> Enum:
+        return PluginType.DATA_RETRIEVAL
+    
+    def fetch(self, api, date: str = None):
+        date = date or datetime.date.today().isoformat()
+        return api.get_user_summary(date)
+
+    async def fetch_async(self, api, date: str = None):
+        date = date or datetime.date.today().isoformat()
+        return await api.get_user_summary(date)
+
+    def render(self, user_summary):
+        DataViewer.display_rich_output("User Summary:", user_summary)
\ No newline at end of file
@@ -1,24 +1,91 @@
-from plugins.base_plugin import BasePlugin
-from rich.console import Console
-from modules.data_viewer import DataViewer
-from plugins.plugin_types import PluginType
-from enum import Enum
-
-console = Console()
-
-
-class MergeActivitiesPlugin(BasePlugin):
-    @property
-    def command_key(self) -> str:
-        return "M"
-
-    @property
-    def description(self) -> str:
-        return "Merge activities. (Type of activities need to be same in the current implementation)"
-    @property
-    def plugin_type(self) -> Enum:
-        return PluginType.DATA_PROCESSING
-    
-    def execute(self, activities):
-        # DataViewer.display_rich_output("Merging Activities", activities)
-        console.print("Merging activities is not implemented yet.", style="bold red")
+from plugins.base_plugin import BasePlugin
+from rich.console import Console
+from rich.prompt import Prompt
+from rich.table import Table
+from modules.data_viewer import DataViewer
+from modules.detail_decoder import DetailCache
+from modules.merge import merge_activities
+from modules.paths import data_path
+from plugins.plugin_types import PluginType
+from enum import Enum
+import numpy as np
+
+console = Console()
+
+
+class MergeActivitiesPlugin(BasePlugin):
+    @property
+    def command_key(self) -> str:
+        return "M"
+
+    @property
+    def description(self) -> str:
+        return "Merge activities. (Type of activities need to be same in the current implementation)"
+    @property
+    def plugin_type(self) -> Enum:
+        return PluginType.DATA_PROCESSING
+
+    @property
+    def depends_on(self) -> str:
+        return "R"
+
+    def _select(self, activities):
+        table = Table(title="Activities")
+        table.add_column("#", style="cyan")
+        table.add_column("Name", style="magenta")
+        table.add_column("Type", style="green")
+        table.add_column("Start Time", style="yellow")
+        for i, activity in enumerate(activities, 1):
+            table.add_row(
+                str(i),
+                str(activity.get('activityName', 'N/A')),
+                str(activity.get('activityType', {}).get('typeKey', 'N/A')),
+                str(activity.get('startTimeLocal', 'N/A')),
+            )
+        console.print(table)
+
+        while True:
+            selection = Prompt.ask("Enter the numbers of the activities to merge (comma separated)")
+            try:
+                indices = sorted({int(part) for part in selection.split(",") if part.strip()})
+                if len(indices) >= 2 and all(1 <= i <= len(activities) for i in indices):
+                    return [activities[i - 1] for i in indices]
+            except ValueError:
+                pass
+            console.print("Please enter at least two valid activity numbers, e.g. 1,2.", style="bold red")
+
+    def execute(self, activities, api=None):
+        if not activities or len(activities) < 2:
+            console.print("At least two activities are needed for a merge.", style="bold yellow")
+            return None
+        if api is None:
+            console.print("Merging needs API access to fetch the activity details.", style="bold red")
+            return None
+
+        selected = self._select(activities)
+        details = []
+        cache = DetailCache()
+        with console.status("Fetching activity details..."):
+            for activity in selected:
+                # Full resolution streams, decoded once and then read from disk.
+                details.append(cache.load(api, activity))
+
+        try:
+            merged = merge_activities(selected, details)
+        except ValueError as err:
+            console.print(str(err), style="bold red")
+            return None
+
+        streams = merged.pop("streams")
+        DataViewer([merged]).view_data()
+        DataViewer.display_rich_output("Laps:", merged["laps"])
+        DataViewer.display_rich_output("Splits:", merged["splits"])
+
+        if streams:
+            ids = "_".join(str(i) for i in merged["mergedActivityIds"])
+            path = data_path("merged", f"{ids}.csv")
+            np.savetxt(path, np.column_stack(list(streams.values())), delimiter=",",
+                       header=",".join(streams.keys()), comments="")
+            console.print(f"Merged streams written to {path}", style="bold green")
+        merged["streams"] = streams
+        return merged
@@ -0,0 +1,31 @@
+from plugins.base_plugin import BasePlugin
+from rich.console import Console
+from plugins.plugin_types import PluginType
+from enum import Enum
+import os
+import webbrowser
+
+console = Console()
+
+class OpenDashboardPlugin(BasePlugin):
+    @property
+    def command_key(self) -> str:
+        return "D"
+
+    @property
+    def description(self) -> str:
+        return "Open the analytics dashboard of locally stored data in the browser"
+
+    @property
+    def plugin_type(self) -> Enum:
+        return PluginType.DATA_RETRIEVAL
+
+    def execute(self, api, params=None):
+        # The dashboard reads the local stores only, so the API is not used.
+        from modules.dashboard import serve_in_background
+
+        port = int(os.getenv("GARMIN_DASHBOARD_PORT", "8050"))
+        url = serve_in_background(port)
+        console.print(f"Dashboard running at {url} (stops when the application exits)", style="bold green")
+        webbrowser.open(url)
+        return url
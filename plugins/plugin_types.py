@@ -1,6 +1,6 @@
-from enum import Enum
-
-class PluginType(Enum):
-    DATA_RETRIEVAL = 0
-    DATA_PROCESSING = 1
-    GENERIC = 3
+from enum import Enum
+
+class PluginType(Enum):
+    DATA_RETRIEVAL = 0
+    DATA_PROCESSING = 1
+    GENERIC = 3
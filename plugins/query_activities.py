@@ -0,0 +1,116 @@
+from plugins.base_plugin import BasePlugin
+from rich.console import Console
+from rich.prompt import Prompt
+from rich.table import Table
+import datetime
+import time
+from modules.activity_query import parse_query
+from modules.activity_store import ActivityStore
+from modules.sync import ActivitySync
+from plugins.plugin_types import PluginType
+from enum import Enum
+
+console = Console()
+
+EXAMPLE = "running, distance > 20km, 2023, top 10 by pace"
+
+
+def _device_resolver(api):
+    """
+    Returns a function mapping a device name to device ids, using devices fetched earlier.
+    """
+    cache = getattr(api, "cache", None)
+
+    def resolve(name):
+        if cache is None:
+            return []
+        ids = set()
+        for _, devices in cache.iter_method("get_devices"):
+            for device in devices or []:
+                names = (device.get("productDisplayName"), device.get("displayName"), device.get("deviceName"))
+                if any(name in (value or "").lower() for value in names) and device.get("deviceId") is not None:
+                    ids.add(int(device["deviceId"]))
+        return sorted(ids)
+
+    return resolve
+
+
+def _pace(activity):
+    distance, duration = activity.get("distance"), activity.get("duration")
+    if not distance or not duration:
+        return "-"
+    seconds = round(duration * 1000 / distance)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+class QueryActivitiesPlugin(BasePlugin):
+    @property
+    def command_key(self) -> str:
+        return "A"
+
+    @property
+    def description(self) -> str:
+        return "Query stored activities, e.g. '" + EXAMPLE + "'"
+
+    @property
+    def plugin_type(self) -> Enum:
+        return PluginType.DATA_RETRIEVAL
+
+    def prompt_params(self):
+        return {"query": Prompt.ask("Query", default=EXAMPLE)}
+
+    def _store(self, api):
+        store = ActivityStore()
+        # The first query loads the activity history, later ones fetch the newest page at most
+        # once per sync interval.
+        ActivitySync(api, store=store).sync()
+        return store
+
+    def fetch(self, api, query: str = ""):
+        store = self._store(api)
+        parsed = parse_query(query, store.activity_types(), _device_resolver(api))
+        return store.select(parsed.where(), parsed.order_by, parsed.descending, parsed.limit)
+
+    def render(self, activities):
+        if not activities:
+            console.print("No stored activities match the query.", style="bold yellow")
+            return
+        table = Table(title=f"{len(activities)} activities")
+        table.add_column("#", style="cyan", justify="right")
+        table.add_column("Start Time", style="yellow", no_wrap=True)
+        table.add_column("Name", style="magenta", no_wrap=True, max_width=30)
+        table.add_column("Type", style="magenta")
+        for column in ("Km", "Duration", "Pace /km", "Avg HR"):
+            table.add_column(column, style="green", justify="right")
+        for i, activity in enumerate(activities, 1):
+            duration = activity.get("duration") or 0
+            table.add_row(
+                str(i),
+                str(activity.get("startTimeLocal") or "N/A"),
+                str(activity.get("activityName") or "N/A"),
+                str((activity.get("activityType") or {}).get("typeKey", "N/A")),
+                f"{(activity.get('distance') or 0) / 1000:.2f}",
+                f"{int(duration // 3600)}:{int(duration % 3600 // 60):02d}:{int(duration % 60):02d}",
+                _pace(activity),
+                str(activity.get("averageHR") or "-"),
+            )
+        console.print(table)
+
+    def execute(self, api, params=None):
+        if params is None:
+            params = self.prompt_params()
+        store = self._store(api)
+        try:
+            parsed = parse_query(params["query"], store.activity_types(), _device_resolver(api))
+        except ValueError as err:
+            console.print(str(err), style="bold red")
+            return None
+        console.print(", ".join(f"{key}: {value}" for key, value in parsed.describe().items()), style="cyan")
+        started = time.perf_counter()
+        activities = store.select(parsed.where(), parsed.order_by, parsed.descending, parsed.limit)
+        elapsed = time.perf_counter() - started
+        self.render(activities)
+        last_sync = datetime.datetime.fromtimestamp(store.get_state("last_sync", 0))
+        console.print(f"Answered from the local store in {elapsed * 1000:.1f} ms, "
+                      f"last synced {last_sync:%Y-%m-%d %H:%M}.", style="dim")
+        return activities
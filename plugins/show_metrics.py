@@ -0,0 +1,71 @@
+from plugins.base_plugin import BasePlugin
+from modules.metrics import metrics
+from modules.paths import data_path
+from rich.console import Console
+from rich.prompt import Prompt
+from rich.table import Table
+from plugins.plugin_types import PluginType
+from datetime import datetime
+from enum import Enum
+
+console = Console()
+
+class ShowMetricsPlugin(BasePlugin):
+    @property
+    def command_key(self) -> str:
+        return "S"
+
+    @property
+    def description(self) -> str:
+        return "(Dev options) Show timing, traffic and cache statistics of this session"
+
+    @property
+    def plugin_type(self) -> Enum:
+        return PluginType.DATA_RETRIEVAL
+
+    def fetch(self, api):
+        return metrics().snapshot()
+
+    def render(self, snapshot):
+        table = Table(title=f"Timings (session uptime {snapshot['uptime'] / 60:.1f} min)")
+        table.add_column("Metric", style="cyan")
+        table.add_column("Labels", style="magenta")
+        for column in ("Count", "Total s", "p50 ms", "p95 ms", "Max ms"):
+            table.add_column(column, style="green", justify="right")
+        for series in snapshot["timings"]:
+            table.add_row(
+                series["name"],
+                ", ".join(f"{key}={value}" for key, value in series["labels"].items()),
+                str(series["count"]),
+                f"{series['sum']:.3f}",
+                f"{series['p50'] * 1000:.1f}",
+                f"{series['p95'] * 1000:.1f}",
+                f"{series['max'] * 1000:.1f}",
+            )
+        console.print(table)
+
+        counters = Table(title="Counters")
+        counters.add_column("Metric", style="cyan")
+        counters.add_column("Labels", style="magenta")
+        counters.add_column("Value", style="green", justify="right")
+        for series in snapshot["counters"]:
+            total = series["value"]
+            counters.add_row(
+                series["name"],
+                ", ".join(f"{key}={value}" for key, value in series["labels"].items()),
+                f"{total / 1024:.1f} KB" if series["name"].endswith("_bytes") else f"{total:g}",
+            )
+        console.print(counters)
+
+    def execute(self, api, params=None):
+        snapshot = self.fetch(api)
+        self.render(snapshot)
+        choice = Prompt.ask("Export metrics", choices=["none", "json", "prometheus"], default="none")
+        if choice != "none":
+            registry = metrics()
+            extension, text = ("json", registry.to_json()) if choice == "json" else ("prom", registry.to_prometheus())
+            path = data_path("metrics", f"metrics_{datetime.now():%Y%m%d_%H%M%S}.{extension}")
+            with open(path, "w") as f:
+                f.write(text)
+            console.print(f"Metrics written to {path}", style="bold green")
+        return snapshot
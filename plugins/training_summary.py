@@ -0,0 +1,112 @@
+from plugins.base_plugin import BasePlugin
+from rich.console import Console
+from rich.prompt import Prompt
+from rich.table import Table
+from datetime import date, datetime
+from modules.rollups import PERIODS, RollupStore, bucket_end
+from modules.sync import ActivitySync
+from plugins.plugin_types import PluginType
+from enum import Enum
+
+console = Console()
+
+
+def _hours(seconds):
+    return f"{seconds / 3600:.1f}" if seconds else "-"
+
+
+class TrainingSummaryPlugin(BasePlugin):
+    @property
+    def command_key(self) -> str:
+        return "W"
+
+    @property
+    def description(self) -> str:
+        return "Training summary: totals per day, week or month"
+
+    @property
+    def plugin_type(self) -> Enum:
+        return PluginType.DATA_RETRIEVAL
+
+    def prompt_params(self):
+        def get_valid_date(prompt_text: str, default: str) -> str:
+            while True:
+                date_str = Prompt.ask(prompt_text, default=default)
+                try:
+                    datetime.strptime(date_str, "%Y-%m-%d")
+                    return date_str
+                except ValueError:
+                    console.print("Invalid date format. Please enter the date in YYYY-MM-DD format.", style="bold red")
+
+        period = Prompt.ask("Period", choices=list(PERIODS), default="week")
+        today = date.today()
+        start_date = get_valid_date("Enter start date (YYYY-MM-DD)", today.replace(month=1, day=1).isoformat())
+        end_date = get_valid_date("Enter end date (YYYY-MM-DD)", today.isoformat())
+        activity_type = Prompt.ask("Enter activity type (optional)", default=None)
+        return {"period": period, "start_date": start_date, "end_date": end_date, "activity_type": activity_type or None}
+
+    def fetch(self, api, period: str = "week", start_date: str = None, end_date: str = None, activity_type: str = None):
+        # Syncing costs a single small request when nothing is new and keeps the rollups current.
+        sync = ActivitySync(api)
+        sync.sync()
+        rows = sync.rollups.query(period, start_date, end_date, activity_type)
+        for row in rows:
+            row["period"] = period
+            if activity_type:
+                row["activityType"] = activity_type
+        return rows
+
+    def render(self, rows):
+        if not rows:
+            console.print("No activities in the selected range.", style="bold yellow")
+            return
+        period = rows[0]["period"]
+        # Weeks and months are whole buckets, the title shows the days they actually cover.
+        table = Table(title=f"Training per {period}, {rows[0]['start']} to {bucket_end(period, rows[-1]['start'])}")
+        table.add_column("Start", style="cyan", no_wrap=True)
+        for column in ("Activities", "Distance km", "Duration h", "Elevation m", "Calories", "Avg HR", "Max HR", "Avg km/h"):
+            table.add_column(column, style="green", justify="right")
+
+        def add(label, row, style=None):
+            table.add_row(
+                label,
+                str(row["count"]),
+                f"{row['distance'] / 1000:.1f}",
+                _hours(row["duration"]),
+                f"{row['elevationGain']:.0f}",
+                f"{row['calories']:.0f}",
+                f"{row['averageHR']:.0f}" if row["averageHR"] else "-",
+                f"{row['maxHR']:.0f}" if row["maxHR"] else "-",
+                f"{row['averageSpeed'] * 3.6:.1f}" if row["averageSpeed"] else "-",
+                style=style,
+            )
+
+        for row in rows:
+            add(row["start"], row)
+        total = RollupStore().total(period, rows[0]["start"], rows[-1]["start"], rows[0].get("activityType"))
+        if total:
+            table.add_section()
+            add("Total", total, style="bold")
+        console.print(table)
+
+    def execute(self, api, params=None):
+        if params is None:
+            params = self.prompt_params()
+        rows = self.fetch(api, **params)
+        self.render(rows)
+        if rows and not params.get("activity_type"):
+            by_type = RollupStore().query(params["period"], params["start_date"], params["end_date"], by_type=True)
+            types = Table(title="By activity type")
+            types.add_column("Type", style="magenta")
+            for column in ("Activities", "Distance km", "Duration h"):
+                types.add_column(column, style="green", justify="right")
+            totals = {}
+            for row in by_type:
+                entry = totals.setdefault(row["activityType"], [0, 0.0, 0.0])
+                entry[0] += row["count"]
+                entry[1] += row["distance"]
+                entry[2] += row["duration"]
+            for activity_type, (count, distance, duration) in sorted(totals.items(), key=lambda item: -item[1][2]):
+                types.add_row(activity_type, str(count), f"{distance / 1000:.1f}", _hours(duration))
+            console.print(types)
+        return rows
@@ -0,0 +1,99 @@
+import struct
+
+import numpy as np
+import pytest
+
+from modules.fit_decoder import FIT_EPOCH, FitDecoder, FitError
+
+# (field number, size, base type) of a record definition with timestamp, position_lat, heart_rate,
+# speed and enhanced_altitude.
+RECORD_FIELDS = [(253, 4, 0x86), (0, 4, 0x85), (3, 1, 0x02), (6, 2, 0x84), (78, 4, 0x86)]
+
+
+def _definition(local, global_number, fields, developer_fields=()):
+    header = 0x40 | local | (0x20 if developer_fields else 0)
+    data = struct.pack("<BBBHB", header, 0, 0, global_number, len(fields))
+    data += b"".join(struct.pack("<BBB", *field) for field in fields)
+    if developer_fields:
+        data += struct.pack("<B", len(developer_fields))
+        data += b"".join(struct.pack("<BBB", *field) for field in developer_fields)
+    return data
+
+
+def _record(timestamp, latitude, heart_rate, speed, altitude, developer=b""):
+    return struct.pack("<BIiBHI", 0, timestamp, latitude, heart_rate, speed, altitude) + developer
+
+
+def _fit(body):
+    header = struct.pack("<BBHI", 12, 0x10, 2132, len(body)) + b".FIT"
+    return header + body + b"\x00\x00"
+
+
+def _first_file():
+    return [
+        _definition(0, 0, [(0, 1, 0x00)]),  # file_id, not a record
+        b"\x00\x04",
+        _definition(0, 20, RECORD_FIELDS, developer_fields=[(0, 2, 0)]),
+        _record(1000, 2 ** 30, 120, 2500, 3000, developer=b"\x01\x02"),
+        # Invalid heart rate, position and speed.
+        _record(1001, 0x7FFFFFFF, 0xFF, 0xFFFF, 3005, developer=b"\x01\x02"),
+        # Compressed timestamp headers: local message 1 holds only the heart rate.
+        _definition(1, 20, [(3, 1, 0x02)]),
+        bytes([0x80 | 1 << 5 | 12, 130]),
+        bytes([0x80 | 1 << 5 | 3, 131]),
+    ]
+
+
+def _second_file():
+    return [
+        _definition(0, 20, RECORD_FIELDS),
+        _record(2000, -(2 ** 29), 140, 3000, 2600),
+    ]
+
+
+def test_decodes_records():
+    columns = FitDecoder().decode(_fit(b"".join(_first_file())))
+    assert list(columns["timestamp"] - FIT_EPOCH) == [1000, 1001, 1004, 1027]
+    assert list(columns["heart_rate"][[0, 2, 3]]) == [120, 130, 131]
+    assert np.isnan(columns["heart_rate"][1])
+    assert columns["latitude"][0] == pytest.approx(90.0)
+    assert np.isnan(columns["latitude"][1:]).all()
+    assert columns["speed"][0] == pytest.approx(2.5)
+    assert np.isnan(columns["speed"][1])
+    assert list(columns["altitude"][:2]) == pytest.approx([100.0, 101.0])
+    assert np.isnan(columns["cadence"]).all()
+
+
+def test_decodes_chained_files():
+    data = _fit(b"".join(_first_file())) + _fit(b"".join(_second_file()))
+    columns = FitDecoder().decode(data)
+    assert list(columns["timestamp"] - FIT_EPOCH) == [1000, 1001, 1004, 1027, 2000]
+    assert columns["heart_rate"][-1] == 140
+    assert columns["latitude"][-1] == pytest.approx(-45.0)
+    assert columns["altitude"][-1] == pytest.approx(20.0)
+
+
+def test_truncation_keeps_complete_records():
+    first = _fit(b"".join(_first_file()))
+    second = _fit(b"".join(_second_file()))
+    # Every cut before the end of the second file's record, headers and definitions included.
+    for cut in range(1, len(second) - 2):
+        columns = FitDecoder().decode(first + second[:cut])
+        assert list(columns["timestamp"] - FIT_EPOCH) == [1000, 1001, 1004, 1027], cut
+
+
+def test_truncated_definition_keeps_earlier_records():
+    parts = _first_file()
+    body = b"".join(parts[:4])
+    for cut in range(1, len(parts[4]) + len(parts[5])):
+        data = _fit(body + (parts[4] + parts[5])[:cut])
+        columns = FitDecoder().decode(data)
+        expected = [1000, 1001] if cut >= len(parts[4]) else [1000]
+        assert list(columns["timestamp"] - FIT_EPOCH) == expected
+
+
+def test_rejects_other_data():
+    with pytest.raises(FitError):
+        FitDecoder().decode(b"not a fit file at all")
+    with pytest.raises(FitError):
+        FitDecoder().decode(_fit(b"\x05" + b"\x00" * 8))
@@ -0,0 +1,95 @@
+import datetime
+import random
+
+import pytest
+
+from modules.columnar_store import ColumnarActivityStore
+from modules.rollups import PERIODS, RollupStore, bucket_end
+
+
+def _activities(count, seed=0):
+    rng = random.Random(seed)
+    start = datetime.datetime(2023, 12, 20, 7, 0)
+    activities = []
+    for i in range(count):
+        duration = rng.uniform(600, 7200)
+        has_hr = rng.random() > 0.3
+        activities.append({
+            "activityId": 1000 + i,
+            "startTimeLocal": (start + datetime.timedelta(hours=13 * i)).isoformat(sep=" "),
+            "activityType": {"typeKey": rng.choice(["running", "cycling", "swimming"])},
+            "distance": duration * rng.uniform(2, 8),
+            "duration": duration,
+            "movingDuration": duration * 0.9,
+            "elevationGain": rng.uniform(0, 300),
+            "calories": rng.uniform(100, 900),
+            "averageHR": rng.uniform(110, 170) if has_hr else None,
+            "maxHR": rng.uniform(170, 195) if has_hr else None,
+        })
+    return activities
+
+
+def _rows(store):
+    return {(period, by_type): store.query(period, by_type=by_type) for period in PERIODS for by_type in (False, True)}
+
+
+def _assert_same(left, right):
+    assert left.keys() == right.keys()
+    for key in left:
+        assert len(left[key]) == len(right[key]), key
+        for a, b in zip(left[key], right[key]):
+            assert a.keys() == b.keys()
+            for field in a:
+                if isinstance(a[field], float):
+                    assert a[field] == pytest.approx(b[field]), (key, field)
+                else:
+                    assert a[field] == b[field], (key, field)
+
+
+def test_incremental_update_equals_rebuild(tmp_path):
+    activities = _activities(120)
+    columnar = ColumnarActivityStore(str(tmp_path / "incremental"))
+    incremental = RollupStore(str(tmp_path / "incremental.sqlite"))
+    for start in range(0, len(activities), 25):
+        columnar.append(activities[start:start + 25])
+        assert incremental.update(columnar) == len(activities[start:start + 25])
+    assert incremental.update(columnar) == 0
+
+    full = ColumnarActivityStore(str(tmp_path / "full"))
+    full.append(activities)
+    rebuilt = RollupStore(str(tmp_path / "rebuilt.sqlite"))
+    rebuilt.update(full)
+    _assert_same(_rows(incremental), _rows(rebuilt))
+
+    # A rewrite of the columnar store rebuilds the rollups instead of adding to them.
+    columnar.rewrite(activities)
+    assert incremental.update(columnar) == len(activities)
+    _assert_same(_rows(incremental), _rows(rebuilt))
+
+
+def test_total_weights_heart_rate_by_covered_duration(tmp_path):
+    activities = _activities(60, seed=1)
+    columnar = ColumnarActivityStore(str(tmp_path / "columnar"))
+    columnar.append(activities)
+    store = RollupStore(str(tmp_path / "rollups.sqlite"))
+    store.update(columnar)
+
+    total = store.total("week")
+    with_hr = [a for a in activities if a["averageHR"] is not None]
+    expected_hr = sum(a["averageHR"] * a["duration"] for a in with_hr) / sum(a["duration"] for a in with_hr)
+    assert total["count"] == len(activities)
+    assert total["duration"] == pytest.approx(sum(a["duration"] for a in activities))
+    assert total["averageHR"] == pytest.approx(expected_hr)
+    assert total["maxHR"] == pytest.approx(max(a["maxHR"] for a in with_hr))
+
+    rows = store.query("month", "2024-01-01", "2024-01-31", "running")
+    month_total = store.total("month", "2024-01-01", "2024-01-31", "running")
+    assert month_total["count"] == sum(row["count"] for row in rows)
+    assert store.total("month", "2030-01-01") is None
+
+
+def test_bucket_end():
+    assert bucket_end("day", "2024-02-10") == "2024-02-10"
+    assert bucket_end("week", "2023-12-25") == "2023-12-31"
+    assert bucket_end("month", "2024-02-01") == "2024-02-29"
+    assert bucket_end("month", "2023-12-01") == "2023-12-31"